@@ -0,0 +1,229 @@
+"""
+Daily Forecast Aggregation Module
+=================================
+This module rolls the 3-hour entries of 5-Day Forecast API responses up
+into one summary per local calendar day: min/max temperature, mean
+humidity, max wind speed, max precipitation chance, and the icon and
+description of the entry closest to local noon.
+
+The entries are converted to NumPy columns once, and every day of every
+city is then summarised in a single vectorized pass (group keys, sorts and
+ufunc reductions) instead of a Python loop building datetimes per entry.
+Batch jobs can pass many responses to daily_forecasts() at once. The
+output is identical to the original Python loop, which is kept as the
+fallback when NumPy is not installed. NumPy is imported on the first
+rollup rather than with the module, keeping it out of ``import app``.
+
+Functions:
+    - daily_forecasts(): Daily summaries for one or many forecasts
+    - daily_forecast(): Daily summaries for one forecast
+    - daily_forecast_python(): Reference implementation without NumPy
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+# NumPy module, imported on the first rollup (None until then, False if it
+# is not installed)
+_np = None
+
+SECONDS_PER_DAY = 86400
+NOON = 12 * 3600
+
+
+def _numpy():
+    """
+    Import NumPy on first use.
+
+    Importing it takes tens of milliseconds, which would otherwise be paid
+    by every worker at ``import app`` even if it never serves a forecast.
+
+    Returns:
+        module: numpy, or None if it is not installed
+    """
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:  # pragma: no cover - numpy ships with matplotlib
+            _np = False
+    return _np or None
+
+
+def _naive_timestamp(local_seconds):
+    """
+    Timestamp the original loop reported for a representative entry.
+
+    It called .timestamp() on a naive local datetime, which Python reads in
+    the server's time zone; this reproduces that for identical output.
+    """
+    return int((datetime(1970, 1, 1) + timedelta(seconds=local_seconds)).timestamp())
+
+
+def daily_forecasts(forecasts):
+    """
+    Summarise the entries of several forecasts by local day, in one pass.
+
+    Args:
+        forecasts (list): (entries, timezone_offset) pairs, where entries is
+            the "list" of a forecast response and timezone_offset its
+            city's UTC offset in seconds
+
+    Returns:
+        list: One list of daily forecast dicts per forecast, days in
+              chronological order
+    """
+    np = _numpy()
+    if np is None:
+        return [daily_forecast_python(entries, offset) for entries, offset in forecasts]
+
+    cities, times, temps, pops, humidities, winds, refs = [], [], [], [], [], [], []
+    for city, (entries, offset) in enumerate(forecasts):
+        for item in entries:
+            main = item.get("main", {})
+            cities.append(city)
+            times.append(item.get("dt") + offset)
+            temps.append(main.get("temp", 0))
+            pops.append(item.get("pop", 0))
+            humidities.append(main.get("humidity", 0))
+            winds.append(item.get("wind", {}).get("speed", 0))
+            refs.append(item)
+
+    results = [[] for _ in forecasts]
+    if not refs:
+        return results
+
+    city = np.array(cities, dtype=np.int64)
+    local = np.array(times, dtype=np.int64)
+    day = local // SECONDS_PER_DAY
+    noon_distance = np.abs(local % SECONDS_PER_DAY - NOON)
+
+    # Group entries by (city, local day); within a group, the entry closest
+    # to noon (the earliest on ties) comes first
+    order = np.lexsort((np.arange(len(refs)), noon_distance, day, city))
+    group_city, group_day = city[order], day[order]
+    starts = np.flatnonzero(np.r_[True, (group_city[1:] != group_city[:-1]) | (group_day[1:] != group_day[:-1])])
+    counts = np.diff(np.r_[starts, len(order)])
+
+    temp = np.array(temps, dtype=np.float64)[order]  # None becomes NaN
+    temp_max = np.fmax.reduceat(temp, starts)
+    temp_min = np.fmin.reduceat(temp, starts)
+    humidity = np.add.reduceat(np.array(humidities, dtype=np.float64)[order], starts) / counts
+    wind = np.maximum.reduceat(np.array(winds, dtype=np.float64)[order], starts)
+    precipitation = np.maximum.reduceat(np.array(pops, dtype=np.float64)[order] * 100, starts)
+
+    if any(type(t) is int for t in temps):
+        # max()/min() in the Python loop return the first extreme entry as
+        # parsed, so integer temperatures stay ints
+        temp_max = _first_extremes(temp, temp_max, order, starts, counts, temps)
+        temp_min = _first_extremes(temp, temp_min, order, starts, counts, temps)
+    else:
+        temp_max = [None if np.isnan(value) else value for value in temp_max.tolist()]
+        temp_min = [None if np.isnan(value) else value for value in temp_min.tolist()]
+
+    representative = order[starts]
+    for g, index in enumerate(representative.tolist()):
+        weather = refs[index]["weather"][0]
+        results[cities[index]].append({
+            "time": _naive_timestamp(times[index]),
+            "temp_max": temp_max[g],
+            "temp_min": temp_min[g],
+            "icon": weather.get("icon"),
+            "description": weather.get("description"),
+            "humidity": int(humidity[g]),
+            "wind_speed": wind[g].item(),
+            "precipitation": precipitation[g].item(),
+        })
+    return results
+
+
+def _first_extremes(values, extremes, order, starts, counts, originals):
+    """
+    Per group, the original value of the first entry (in input order) equal
+    to the group's extreme, or None if the group has no values.
+    """
+    np = _numpy()
+    # Original indices of the entries matching their group's extreme; the
+    # smallest one per group is the first in input order
+    positions = np.where(values == np.repeat(extremes, counts), order, len(order))
+    return [originals[index] if index < len(order) else None
+            for index in np.minimum.reduceat(positions, starts).tolist()]
+
+
+def daily_forecast(entries, timezone_offset):
+    """
+    Summarise one forecast's entries by local day.
+
+    Args:
+        entries (list): The "list" of a 5-Day Forecast API response
+        timezone_offset (int): The city's UTC offset in seconds
+
+    Returns:
+        list: Daily forecast dicts in chronological order
+    """
+    return daily_forecasts([(entries, timezone_offset)])[0]
+
+
+def daily_forecast_python(entries, timezone_offset):
+    """Summarise one forecast by local day with a plain Python loop (no NumPy)."""
+    daily_buckets = defaultdict(list)
+
+    for item in entries:
+        ts = item.get('dt')
+        # Convert to location-local date using timezone offset
+        utc_dt = datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
+        local_dt = utc_dt + timedelta(seconds=timezone_offset)
+        daily_buckets[local_dt.date()].append((local_dt, item))
+
+    daily_forecast = []
+    for local_date in sorted(daily_buckets.keys()):
+        entries = daily_buckets[local_date]
+        temps = []
+        pops = []
+        humidities = []
+        wind_speeds = []
+        # pick a representative entry (closest to local noon if possible)
+        rep_entry = None
+        rep_dt = None
+        best_noon_diff = None
+
+        for local_dt, item in entries:
+            main = item.get('main', {})
+            temps.append(main.get('temp', 0))
+            pops.append(item.get('pop', 0) * 100)
+            humidities.append(main.get('humidity', 0))
+            wind_speeds.append(item.get('wind', {}).get('speed', 0))
+
+            # prefer entry at 12:00 local time
+            noon = local_dt.replace(hour=12, minute=0, second=0, microsecond=0)
+            diff = abs((local_dt - noon).total_seconds())
+            if best_noon_diff is None or diff < best_noon_diff:
+                best_noon_diff = diff
+                rep_entry = item
+                rep_dt = local_dt
+
+        try:
+            temp_max_val = max([t for t in temps if t is not None])
+        except ValueError:
+            temp_max_val = None
+        try:
+            temp_min_val = min([t for t in temps if t is not None])
+        except ValueError:
+            temp_min_val = None
+
+        daily_forecast.append({
+            "time": int(rep_dt.timestamp()),
+            "temp_max": temp_max_val,
+            "temp_min": temp_min_val,
+            "icon": rep_entry["weather"][0].get("icon"),
+            "description": rep_entry["weather"][0].get("description"),
+            "humidity": int(sum(humidities)/len(humidities)) if humidities else None,
+            "wind_speed": float(max(wind_speeds)) if wind_speeds else 0,
+            "precipitation": float(max(pops)) if pops else 0
+        })
+
+    return daily_forecast
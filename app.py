@@ -11,29 +11,128 @@ Date: January 2026
 
 from dataclasses import asdict
 import os
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+import re
+import threading
+import time
+from concurrent.futures import BrokenExecutor
 from datetime import datetime, timedelta
 from weather import main as get_weather_data
-from flask import Flask, render_template, request, jsonify
+from cache import get_response_cache
+from fragments import data_version, get_fragment_cache
+from geocache import make_key
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS_ENABLED, render_metrics, span
+from plotcache import get_plot_cache
+from profiling import profile_view
+from prefetch import record_lookup
+from svgchart import write_svg
+from timefmt import format_local
+from flask import Flask, abort, render_template, request, jsonify, send_from_directory, url_for
+from markupsafe import Markup
+
+# Chart backend: "svg" (fast, default) or "matplotlib" (PNG, imported only when used)
+PLOT_BACKEND = os.getenv("PLOT_BACKEND", "svg")
+# Processes rendering matplotlib charts off the request path (0 renders inline)
+PLOT_WORKERS = int(os.getenv("PLOT_WORKERS", "2"))
+# How long the chart image route waits for a queued render (seconds)
+PLOT_WAIT_TIMEOUT = float(os.getenv("PLOT_WAIT_TIMEOUT", "5"))
+
+PLOT_NAME_PATTERN = re.compile(r"^[0-9a-f]{32}\.(svg|png)$")
+
+# Dashboard sections rendered once per location and data version:
+# name → (partial template, WeatherData fields it is drawn from)
+DASHBOARD_FRAGMENTS = {
+    "metrics": ("partials/metrics.html", ("wind_speed", "visibility", "humidity", "pressure")),
+    "sun": ("partials/sun.html", ("sunrise", "sunset", "timezone", "timezone_offset")),
+    "hourly": ("partials/hourly.html", ("hourly_forecast",)),
+    "daily": ("partials/daily.html", ("daily_forecast",)),
+}
+
+_plot_executor = None
+_plot_executor_lock = threading.Lock()
 
 # Initialize Flask application
 app = Flask(__name__)
 
 def generate_plot(hourly_data, timezone_offset):
     """
-    Generates a plot of temperature vs. time from hourly forecast data.
+    Returns a plot of temperature vs. time for the hourly forecast data.
+
+    The chart is drawn as SVG (svgchart.py) unless PLOT_BACKEND is
+    "matplotlib". The image is stored under a hash of its data, so an
+    unchanged forecast reuses the image rendered earlier (see plotcache.py).
+
+    SVG charts take well under a millisecond and are drawn inline.
+    matplotlib charts are queued to a process pool and the name is returned
+    straight away; the plot_image() route waits for the file.
 
     Args:
         hourly_data (list): A list of dictionaries, where each dictionary represents an hourly forecast.
         timezone_offset (int): The timezone offset in seconds.
 
     Returns:
-        str: The path to the generated plot image.
+        str: The plot image file name (e.g. "<hash>.svg"), or None if no chart is available.
     """
     if not hourly_data:
         return None
+    cache = get_plot_cache()
+    if PLOT_BACKEND != "matplotlib":
+        return cache.get_or_render(hourly_data, timezone_offset, write_svg, extension="svg")
+
+    executor = _get_plot_executor()
+    if executor is not None:
+        try:
+            return cache.submit(hourly_data, timezone_offset, render_plot, executor, extension="png")
+        except BrokenExecutor:
+            _discard_plot_executor(executor)
+    return cache.get_or_render(hourly_data, timezone_offset, render_plot, extension="png")
+
+
+def _get_plot_executor():
+    """Return the process pool for matplotlib renders (None if PLOT_WORKERS is 0)."""
+    global _plot_executor
+    if PLOT_WORKERS <= 0:
+        return None
+    if _plot_executor is None:
+        with _plot_executor_lock:
+            if _plot_executor is None:
+                # Imported here: multiprocessing is not needed unless matplotlib charts are
+                from concurrent.futures import ProcessPoolExecutor
+                _plot_executor = ProcessPoolExecutor(max_workers=PLOT_WORKERS, initializer=_init_plot_worker)
+    return _plot_executor
+
+
+def _discard_plot_executor(executor):
+    """Drop a broken pool (e.g. a worker was killed) so the next call starts a new one."""
+    global _plot_executor
+    with _plot_executor_lock:
+        if _plot_executor is executor:
+            _plot_executor = None
+    executor.shutdown(wait=False)
+
+
+def _init_plot_worker():
+    """Import matplotlib once per pool process rather than on its first chart."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot  # noqa: F401
+
+
+def render_plot(hourly_data, timezone_offset, plot_path):
+    """
+    Draws the hourly temperature chart with matplotlib and saves it as a PNG.
+
+    This is the optional high-fidelity backend; matplotlib is imported on
+    first use so workers serving SVG charts never load it.
+
+    Args:
+        hourly_data (list): A list of dictionaries, where each dictionary represents an hourly forecast.
+        timezone_offset (int): The timezone offset in seconds.
+        plot_path (str): Where to write the image.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
 
     # Extract time and temperature data
     times = [datetime.utcfromtimestamp(hour['time']) + timedelta(seconds=timezone_offset) for hour in hourly_data]
@@ -63,20 +162,36 @@ def generate_plot(hourly_data, timezone_offset):
     plt.setp(ax.spines.values(), color='black')
     
     # Improve date formatting on the x-axis
-    import matplotlib.dates as mdates
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
     fig.autofmt_xdate()
 
-    # Create static directory if it doesn't exist
-    if not os.path.exists('static'):
-        os.makedirs('static')
+    # Save the plot (via the figure, so concurrent renders don't share pyplot's current figure)
+    fig.savefig(plot_path, format='png', bbox_inches='tight', transparent=True)
+    plt.close(fig)
 
-    # Save the plot
-    plot_path = 'static/forecast_plot.png'
-    plt.savefig(plot_path, bbox_inches='tight', transparent=True)
-    plt.close()
-    
-    return plot_path
+def render_fragments(location, weather_data):
+    """
+    Render the cacheable dashboard sections for a location.
+
+    Each section in DASHBOARD_FRAGMENTS is served from the fragment cache
+    while the fields it is drawn from are unchanged (see fragments.py).
+
+    Args:
+        location (str): Normalized location key (geocache.make_key())
+        weather_data (dict): WeatherData as a dict
+
+    Returns:
+        dict: Section name → rendered HTML (Markup)
+    """
+    cache = get_fragment_cache()
+    rendered = {}
+    for name, (template, fields) in DASHBOARD_FRAGMENTS.items():
+        render = lambda template=template: render_template(template, weather_data=weather_data)
+        if cache is None:
+            rendered[name] = Markup(render())
+        else:
+            rendered[name] = Markup(cache.get_or_render(location, name, data_version(weather_data, fields), render))
+    return rendered
 
 # ============================================================================
 # CUSTOM JINJA2 FILTERS
@@ -106,22 +221,11 @@ def strftime_filter(timestamp, format_string, timezone_offset=None):
         {{ timestamp | strftime('%H:%M') }} → "14:30"
     """
     try:
-        # Convert Unix timestamp to datetime object
         if timezone_offset is not None:
-            dt = datetime.utcfromtimestamp(timestamp) + timedelta(seconds=timezone_offset)
-        else:
-            dt = datetime.fromtimestamp(timestamp)
-        
-        # Map custom format strings to Python strftime format codes
-        format_map = {
-            '%a, %b %d': '%a, %b %d',
-            '%H:%M': '%H:%M',
-            '%Y-%m-%d %H:%M': '%Y-%m-%d %H:%M'
-        }
-        actual_format = format_map.get(format_string, format_string)
-        
-        return dt.strftime(actual_format)
-    except (ValueError, TypeError):
+            # Memoized: a forecast's timestamps repeat on every render
+            return format_local(int(timestamp), timezone_offset, format_string)
+        return datetime.fromtimestamp(timestamp).strftime(format_string)
+    except (ValueError, TypeError, OverflowError):
         # Return original timestamp if conversion fails
         return str(timestamp)
 
@@ -139,11 +243,9 @@ def format_time_filter(timestamp=None, timezone_offset=0):
         str: Formatted time string (e.g., "2:30 PM")
     """
     if timestamp is None:
-        dt = datetime.now()
-    else:
-        # Use UTC-based calculation for accurate location time
-        dt = datetime.utcfromtimestamp(timestamp) + timedelta(seconds=timezone_offset)
-    return dt.strftime('%I:%M %p')
+        return datetime.now().strftime('%I:%M %p')
+    # UTC-based calculation for accurate location time
+    return format_local(int(timestamp), timezone_offset, '%I:%M %p')
 
 
 @app.template_filter('format_date_long')
@@ -159,11 +261,9 @@ def format_date_long_filter(timestamp=None, timezone_offset=0):
         str: Formatted date string (e.g., "Saturday, January 11, 2026")
     """
     if timestamp is None:
-        dt = datetime.now()
-    else:
-        # Use UTC-based calculation for accurate location time
-        dt = datetime.utcfromtimestamp(timestamp) + timedelta(seconds=timezone_offset)
-    return dt.strftime('%A, %B %d, %Y')
+        return datetime.now().strftime('%A, %B %d, %Y')
+    # UTC-based calculation for accurate location time
+    return format_local(int(timestamp), timezone_offset, '%A, %B %d, %Y')
 
 
 @app.template_filter('format_24h')
@@ -244,9 +344,7 @@ def location_time_filter(timestamp, timezone_offset=0):
     """
     if timestamp == 0:
         return "N/A"
-    # Create datetime from timestamp and adjust by timezone offset
-    dt = datetime.utcfromtimestamp(timestamp) + timedelta(seconds=timezone_offset)
-    return dt.strftime('%I:%M %p')
+    return format_local(timestamp, timezone_offset, '%I:%M %p')
 
 
 @app.template_filter('location_date_time')
@@ -263,8 +361,7 @@ def location_date_time_filter(timestamp, timezone_offset=0):
     """
     if timestamp == 0:
         return "N/A"
-    dt = datetime.utcfromtimestamp(timestamp) + timedelta(seconds=timezone_offset)
-    return dt.strftime('%A, %B %d, %Y at %I:%M %p')
+    return format_local(timestamp, timezone_offset, '%A, %B %d, %Y at %I:%M %p')
 
 
 @app.template_filter('timezone_display')
@@ -297,6 +394,7 @@ def timezone_display_filter(timezone_code):
 # ============================================================================
 
 @app.route("/", methods=["GET", "POST"])
+@profile_view
 def index():
     """
     Main route handler for the weather dashboard.
@@ -319,10 +417,13 @@ def index():
     
     Returns:
         Rendered HTML template with weather data (if POST) or empty form (if GET)
+
+    Requests with a valid X-Profile-Token header (or a sampled fraction) are
+    profiled end to end; see profiling.py.
     """
     # Get current timestamp for UI display
     current_time = datetime.now().timestamp()
-    plot_path = None
+    plot_url = None
     
     if request.method == "POST":
         # Extract form data from user input
@@ -341,16 +442,102 @@ def index():
             # Return form with error message if API call failed
             return render_template("index.html", current_time=current_time, timezone_offset=0, error="Could not fetch weather data. Please check the city name and try again.")
         
-        # Generate plot if weather data is available
+        # Count the lookup so popular locations are kept warm (prefetch.py)
+        record_lookup(city_name, state_name, country_code)
+        
+        # Generate plot if weather data is available (the image may still be rendering)
         if weather_data and weather_data.hourly_forecast:
-            plot_path = generate_plot(weather_data.hourly_forecast, weather_data.timezone_offset)
+            with span("plot"):
+                plot_name = generate_plot(weather_data.hourly_forecast, weather_data.timezone_offset)
+            if plot_name:
+                plot_url = url_for("plot_image", name=plot_name)
         
-        # Render template with weather data and current time (adjusted to location timezone)
-        return render_template("index.html", weather_data=asdict(weather_data), current_time=current_time, timezone_offset=weather_data.timezone_offset, plot_path=plot_path)
+        # Render template with weather data and current time (adjusted to location timezone);
+        # the heavy sections come from the fragment cache
+        with span("template"):
+            weather_dict = asdict(weather_data)
+            fragments = render_fragments(make_key(city_name, state_name, country_code), weather_dict)
+            return render_template("index.html", weather_data=weather_dict, fragments=fragments, current_time=current_time, timezone_offset=weather_data.timezone_offset, plot_url=plot_url)
     
     # GET request: show empty form with current time
     return render_template("index.html", current_time=current_time, timezone_offset=0)
 
+@app.route("/api/weather", methods=["GET"])
+def api_weather():
+    """
+    Return the weather for a location as JSON.
+
+    Responses carry a strong ETag (a hash of the body, which only changes
+    when fresh upstream data is fetched) and a Cache-Control max-age equal
+    to the time left before the current-weather cache entry goes stale, so
+    browsers and CDNs can reuse them. A matching If-None-Match gets an
+    empty 304.
+
+    Query Parameters:
+        - city (str): City name (required)
+        - state (str): State/province code (optional)
+        - country (str): Country code (optional)
+
+    Returns:
+        JSON WeatherData, 304 Not Modified, 400 without a city, or 404 if
+        the weather could not be fetched
+    """
+    city_name = request.args.get("city", "").strip()
+    if not city_name:
+        return jsonify({"error": "The 'city' query parameter is required."}), 400
+
+    weather_data = get_weather_data(city_name, request.args.get("state", ""), request.args.get("country", ""))
+    if weather_data is None:
+        return jsonify({"error": "Could not fetch weather data. Please check the city name and try again."}), 404
+    record_lookup(city_name, request.args.get("state", ""), request.args.get("country", ""))
+
+    response = jsonify(asdict(weather_data))
+    response.add_etag()
+    response.cache_control.public = True
+    cache = get_response_cache()
+    if cache is None:
+        response.cache_control.no_cache = True
+    else:
+        # Age of the data, by when its current conditions were fetched
+        age = max(0, int(time.time()) - weather_data.last_updated)
+        response.cache_control.max_age = max(0, cache.ttls["current"] - age)
+        response.cache_control.stale_while_revalidate = cache.max_stale
+    return response.make_conditional(request)
+
+@app.route("/plots/<name>")
+def plot_image(name):
+    """
+    Serve a forecast chart, waiting briefly if it is still being rendered.
+
+    Chart names are content hashes, so responses are cacheable indefinitely.
+    Renders queued by another worker process are waited for as well.
+
+    Returns:
+        The image, 503 with Retry-After if the render is still running after
+        PLOT_WAIT_TIMEOUT seconds, or 404 for charts nobody is rendering
+    """
+    if not PLOT_NAME_PATTERN.match(name):
+        abort(404)
+    cache = get_plot_cache()
+    if not cache.wait(name, PLOT_WAIT_TIMEOUT):
+        if cache.is_pending(name):
+            return "Chart is still rendering", 503, {"Retry-After": "1"}
+        abort(404)
+    return send_from_directory(cache.directory, name, max_age=31536000)
+
+@app.route("/metrics")
+def metrics_export():
+    """
+    Export request timings, upstream latencies and cache counters of this
+    process for Prometheus (see metrics.py).
+
+    Returns:
+        Prometheus text exposition, or 404 if METRICS_ENABLED is "0"
+    """
+    if not METRICS_ENABLED:
+        abort(404)
+    return render_metrics(), 200, {"Content-Type": METRICS_CONTENT_TYPE}
+
 @app.route("/share", methods=["POST"])
 def share_report():
     """
@@ -385,5 +572,7 @@ if __name__ == "__main__":
     # Start Flask development server
     # For production, use a WSGI server like gunicorn
     import os
+    import warmup
     debug_mode = os.getenv("FLASK_ENV") == "development"
+    warmup.boot()
     app.run(debug=debug_mode, host="0.0.0.0", port=int(os.getenv("PORT", 5000)))
@@ -0,0 +1,508 @@
+"""
+Async Weather Fetching Module
+=============================
+Asyncio counterparts of the fetch functions in weather.py, built on aiohttp
+so that a single event loop can drive thousands of lookups at once.
+
+The async functions return the same WeatherData objects as weather.py and
+share its parsing code, geocoding cache, response cache, rate limiter and
+retry / circuit-breaker policies; only the transport is non-blocking.
+
+Classes:
+    - AsyncWeatherHTTPClient: Pooled aiohttp session with retries and breakers
+
+Functions:
+    - get_lat_lon(): Convert city name to coordinates
+    - get_current_weather(): Fetch current weather conditions
+    - get_forecast(): Fetch hourly and daily forecasts
+    - get_uv_index(): Fetch the UV index
+    - get_forecast_data(): Fetch forecasts plus UV index
+    - fetch_weather_concurrently(): Fetch current, forecast and UV together
+    - main(): Orchestrate all weather data collection for one location
+    - main_batch(): Fetch weather for many locations concurrently
+    - close_client(): Close the event loop's shared client
+
+Every function accepts an optional ``client``. main() and main_batch()
+otherwise open a client for the call and close it when done; the other
+functions use one shared client per event loop, which close_client()
+closes.
+
+The geocoding and response caches may be SQLite files, so their lookups
+and writes run in worker threads (asyncio.to_thread) rather than on the
+event loop.
+
+Example:
+    >>> import asyncio, async_weather
+    >>> weather = asyncio.run(async_weather.main("London", "", "GB"))
+
+Configuration (environment variables):
+    - ASYNC_HTTP_LIMIT: Total open connections per client (default 200)
+    - ASYNC_HTTP_LIMIT_PER_HOST: Open connections per host (default 100)
+    - ASYNC_BATCH_CONCURRENCY: Lookups in flight in main_batch() (default 100)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import asyncio
+import contextlib
+import copy
+import os
+import time
+import weakref
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+import weather
+from cache import EXPIRED, FRESH, REFRESH_LEASE, STALE, get_response_cache
+from geocache import get_geocache
+from http_client import DEFAULT_BASE_URL, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, normalize_url
+from metrics import observe_upstream
+from ratelimit import BACKGROUND, get_limiter, priority
+from resilience import CircuitBreaker, RetryPolicy
+from weather import BatchResult, parse_current_weather, parse_forecast
+
+ASYNC_HTTP_LIMIT = int(os.getenv("ASYNC_HTTP_LIMIT", "200"))
+ASYNC_HTTP_LIMIT_PER_HOST = int(os.getenv("ASYNC_HTTP_LIMIT_PER_HOST", "100"))
+ASYNC_BATCH_CONCURRENCY = int(os.getenv("ASYNC_BATCH_CONCURRENCY", "100"))
+
+# aiohttp counterparts of the transport errors RetryPolicy.is_retryable()
+# retries (connection failures and timeouts)
+TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+# ============================================================================
+# HTTP CLIENT
+# ============================================================================
+
+class AsyncWeatherHTTPClient:
+    """
+    Non-blocking HTTP client for OpenWeatherMap, one per event loop.
+
+    Mirrors http_client.WeatherHTTPClient: keep-alive connection pooling,
+    connect/read timeouts, the shared rate limiter, jittered retries and a
+    circuit breaker per endpoint.
+
+    Args:
+        base_url (str): API base URL
+        limit (int): Maximum open connections
+        limit_per_host (int): Maximum open connections per host
+        connect_timeout (float): Connect timeout in seconds
+        read_timeout (float): Read timeout in seconds
+        limiter (ratelimit.RateLimiter, optional): Shared rate limiter
+        retry_policy (resilience.RetryPolicy, optional): Retry settings
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, limit=ASYNC_HTTP_LIMIT,
+                 limit_per_host=ASYNC_HTTP_LIMIT_PER_HOST, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, limiter=None, retry_policy=None):
+        self.base_url = normalize_url(base_url.rstrip("/"))
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.limiter = limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.requests = 0
+        self._breakers = {}
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def breaker_for(self, url):
+        """Return the circuit breaker for the endpoint (URL path) of ``url``."""
+        endpoint = urlsplit(url).path
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+    def breaker_states(self):
+        """Return the circuit breaker state of every endpoint called so far."""
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+    async def get_json(self, path, params=None):
+        """
+        Issue a GET request and decode the JSON body.
+
+        Args:
+            path (str): API path such as "/data/2.5/weather", or a full URL
+            params (dict, optional): Query string parameters
+
+        Returns:
+            tuple: (status_code, decoded JSON or None)
+
+        Raises:
+            resilience.CircuitOpenError: If the endpoint's breaker is open
+            ratelimit.RateLimitExceeded: If no quota became available in time
+            aiohttp.ClientError | asyncio.TimeoutError: If every attempt
+                failed to connect or timed out, or the request failed in a
+                way retrying would not fix
+        """
+        url = normalize_url(path) if "://" in path else f"{self.base_url}/{path.lstrip('/')}"
+        params = {key: str(value) for key, value in (params or {}).items()}
+        breaker = self.breaker_for(url)
+        breaker.before_call()
+
+        attempt = 0
+        try:
+            while True:
+                status, payload, error, headers, started = None, None, None, {}, None
+                try:
+                    if self.limiter is not None:
+                        await self.limiter.acquire_async()
+                    self.requests += 1
+                    started = time.perf_counter()
+                    async with self._get_session().get(url, params=params) as response:
+                        status, headers = response.status, response.headers
+                        if status == 200:
+                            payload = await response.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+                if started is not None:
+                    # Includes reading the body, unlike the sync client's timing
+                    observe_upstream(breaker.name, status if status is not None else "error",
+                                     time.perf_counter() - started)
+
+                if error is None and not self.retry_policy.is_retryable_status(status):
+                    breaker.record_success()
+                    return status, payload
+                retryable = isinstance(error, TRANSIENT_ERRORS) if error is not None else True
+                if attempt >= self.retry_policy.retries or not retryable:
+                    break
+                await asyncio.sleep(self.retry_policy.backoff(attempt, headers.get("Retry-After")))
+                attempt += 1
+        except BaseException:
+            # Cancelled, or refused by the rate limiter: nothing to record
+            # against the endpoint, but a half-open trial must give up its slot
+            breaker.release()
+            raise
+
+        breaker.record_failure()
+        if error is not None:
+            raise error
+        return status, payload
+
+    async def close(self):
+        """Close the underlying aiohttp session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    """
+    Return the shared AsyncWeatherHTTPClient for the running event loop.
+
+    Returns:
+        AsyncWeatherHTTPClient: Client bound to the current loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = AsyncWeatherHTTPClient(limiter=get_limiter())
+    return client
+
+
+async def close_client():
+    """Close the shared client of the running event loop, if one was opened."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+@contextlib.asynccontextmanager
+async def _client_scope(client):
+    """Yield ``client``, or a new client that is closed on exit if it is None."""
+    if client is not None:
+        yield client
+        return
+    async with AsyncWeatherHTTPClient(limiter=get_limiter()) as owned:
+        yield owned
+
+
+async def _request(client, path, params, label):
+    """GET a JSON endpoint, returning (status, payload) or (None, None) on error."""
+    try:
+        return await (client or get_client()).get_json(path, params)
+    except (aiohttp.ClientError, asyncio.TimeoutError, requests.exceptions.RequestException) as e:
+        print(f"❌ Error: {label} request failed: {e!r}")
+        return None, None
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+_refreshing = set()
+
+
+async def _cached(endpoint, lat, lon, fetch):
+    """
+    Serve an endpoint from the shared response cache (async version).
+
+    Follows ResponseCache.get_or_fetch(): fresh entries are returned,
+    stale entries are returned while a background task refreshes them, and
+    expired entries are returned only if the refetch fails.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return await fetch()
+
+    value, state = await asyncio.to_thread(cache.lookup, endpoint, lat, lon)
+    if state == FRESH:
+        return value
+    if state == STALE:
+        key = cache.make_key(endpoint, lat, lon)
+        if key not in _refreshing:
+            _refreshing.add(key)
+            if await asyncio.to_thread(cache.backend.claim_refresh, key, REFRESH_LEASE):
+                asyncio.get_running_loop().create_task(_refresh(cache, key, endpoint, lat, lon, fetch))
+            else:
+                _refreshing.discard(key)
+        return value
+
+    fetched = await fetch()
+    if fetched is not None:
+        await asyncio.to_thread(cache.store, endpoint, lat, lon, fetched)
+        return copy.copy(fetched)
+    if state == EXPIRED:
+        cache.count("expired_hits")
+        return value
+    return None
+
+
+async def _refresh(cache, key, endpoint, lat, lon, fetch):
+    try:
+        with priority(BACKGROUND):
+            value = await fetch()
+        if value is not None:
+            await asyncio.to_thread(cache.store, endpoint, lat, lon, value)
+            cache.count("refreshes")
+    except Exception as e:
+        print(f"❌ Error: background refresh of {key} failed: {e}")
+    finally:
+        _refreshing.discard(key)
+
+# ============================================================================
+# API FUNCTIONS
+# ============================================================================
+
+async def get_lat_lon(city_name, state_code="", country_code="", api_key=None, client=None):
+    """
+    Convert city name to geographic coordinates (async).
+
+    See weather.get_lat_lon(); results are shared with the same
+    persistent geocoding cache.
+
+    Returns:
+        tuple: (latitude, longitude) if successful, (None, None) if failed
+    """
+    if api_key is None:
+        api_key = weather.api_key
+
+    geocache = get_geocache()
+    if geocache is not None:
+        cached = await asyncio.to_thread(geocache.get, city_name, state_code, country_code)
+        if cached is not None:
+            return cached
+
+    location = ",".join(part for part in (city_name, state_code, country_code) if part)
+    status, data = await _request(client, "/geo/1.0/direct", {"q": location, "appid": api_key}, "Geocoding")
+    if status == 200:
+        if data:
+            lat, lon = data[0]["lat"], data[0]["lon"]
+            if geocache is not None:
+                await asyncio.to_thread(geocache.set, city_name, state_code, country_code, lat, lon)
+            return lat, lon
+        if geocache is not None:
+            await asyncio.to_thread(geocache.set_not_found, city_name, state_code, country_code)
+    return None, None
+
+
+async def get_current_weather(lat, lon, api_key, client=None):
+    """
+    Fetch current weather conditions (async).
+
+    Returns:
+        WeatherData: Object containing current weather information
+        None: If API request fails
+    """
+    async def fetch():
+        status, data = await _request(client, "/data/2.5/weather", {
+            "lat": lat, "lon": lon, "appid": api_key, "units": "metric"
+        }, "Current weather")
+        return parse_current_weather(data) if status == 200 else None
+    return await _cached("current", lat, lon, fetch)
+
+
+async def get_forecast(lat, lon, api_key, client=None):
+    """
+    Fetch hourly and daily forecasts (async).
+
+    Returns:
+        tuple: (hourly_forecast, daily_forecast), or None if the request fails
+    """
+    async def fetch():
+        status, data = await _request(client, "/data/2.5/forecast", {
+            "lat": lat, "lon": lon, "appid": api_key, "units": "metric"
+        }, "Forecast")
+        return parse_forecast(data) if status == 200 else None
+    return await _cached("forecast", lat, lon, fetch)
+
+
+async def get_uv_index(lat, lon, api_key, client=None):
+    """
+    Fetch the UV index (async).
+
+    Returns:
+        float: UV index value
+        None: If API request fails
+    """
+    async def fetch():
+        status, data = await _request(client, "/data/2.5/uvi", {
+            "lat": lat, "lon": lon, "dt": int(datetime.now().timestamp()), "appid": api_key
+        }, "UV index")
+        return data.get("value", 0) if status == 200 else None
+    return await _cached("uv", lat, lon, fetch)
+
+
+async def get_forecast_data(lat, lon, api_key, client=None):
+    """
+    Fetch hourly and daily forecasts plus the UV index (async).
+
+    Returns:
+        tuple: (hourly_forecast, daily_forecast, uv_index, alerts), with the
+               same failure values as weather.get_forecast_data()
+    """
+    forecast = await get_forecast(lat, lon, api_key, client)
+    if forecast is None:
+        return [], [], 0, []
+    hourly_forecast, daily_forecast = forecast
+    uv_index = await get_uv_index(lat, lon, api_key, client)
+    return hourly_forecast, daily_forecast, uv_index if uv_index is not None else 0, []
+
+
+async def fetch_weather_concurrently(lat, lon, api_key, deadline=None, client=None):
+    """
+    Fetch current weather, forecast and UV index at the same time (async).
+
+    Behaves like weather.fetch_weather_concurrently(): calls still pending
+    at the deadline are cancelled and degrade to empty forecasts / UV 0.
+
+    Returns:
+        WeatherData: Complete weather information object
+        None: If current weather could not be fetched within the deadline
+    """
+    if deadline is None:
+        deadline = weather.FANOUT_DEADLINE
+    current = asyncio.ensure_future(get_current_weather(lat, lon, api_key, client))
+    forecast = asyncio.ensure_future(get_forecast(lat, lon, api_key, client))
+    uv = asyncio.ensure_future(get_uv_index(lat, lon, api_key, client))
+    tasks = (current, forecast, uv)
+
+    _, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    weather_datas = _task_result(current)
+    if weather_datas is None:
+        return None
+    forecast_result = _task_result(forecast)
+    if forecast_result is not None:
+        weather_datas.hourly_forecast, weather_datas.daily_forecast = forecast_result
+    uv_index = _task_result(uv)
+    weather_datas.uv_index = uv_index if uv_index is not None else 0
+    weather_datas.alerts = []
+    return weather_datas
+
+
+def _task_result(task):
+    """Return a finished task's result, or None if it is pending, cancelled or failed."""
+    if not task.done() or task.cancelled():
+        return None
+    if task.exception() is not None:
+        print(f"❌ Error: upstream request failed: {task.exception()!r}")
+        return None
+    return task.result()
+
+
+async def main(city_name, state_name="", country_code="", deadline=None, client=None):
+    """
+    Orchestrate the complete weather data collection process (async).
+
+    Geocodes the location, then fetches current weather, forecast and UV
+    index concurrently.
+
+    Args:
+        city_name (str): Name of the city to get weather for (required)
+        state_name (str, optional): State/province code. Defaults to "".
+        country_code (str, optional): Country code. Defaults to "".
+        deadline (float, optional): Overall budget in seconds for the
+            post-geocode fetches. Defaults to weather.FANOUT_DEADLINE.
+        client (AsyncWeatherHTTPClient, optional): Client to use. By
+            default one is opened for this call and closed afterwards.
+
+    Returns:
+        WeatherData: Complete weather information object, or None
+    """
+    async with _client_scope(client) as client:
+        lat, lon = await get_lat_lon(city_name, state_name, country_code, weather.api_key, client)
+        if lat is None or lon is None:
+            print(f"❌ Error: Could not find coordinates for '{city_name}'")
+            return None
+        return await fetch_weather_concurrently(lat, lon, weather.api_key, deadline, client)
+
+
+async def main_batch(locations, max_concurrency=ASYNC_BATCH_CONCURRENCY, deadline=None, client=None):
+    """
+    Fetch weather for many locations from one event loop.
+
+    Lookups run at background rate-limit priority with at most
+    ``max_concurrency`` in flight; failures are isolated per location as
+    in weather.main_batch().
+
+    Args:
+        locations (iterable): Location tuples (city[, state[, country]])
+        max_concurrency (int, optional): Maximum lookups in flight at once
+        deadline (float, optional): Passed through to main()
+        client (AsyncWeatherHTTPClient, optional): Client to use. By
+            default one is opened for the batch and closed afterwards.
+
+    Returns:
+        list: BatchResult objects in the same order as ``locations``
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def lookup(location):
+        city_name, state_name, country_code = (tuple(location) + ("", ""))[:3]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                with priority(BACKGROUND):
+                    weather_datas = await main(city_name, state_name, country_code, deadline, client)
+                error = None if weather_datas is not None else "Could not fetch weather data"
+            except Exception as e:
+                weather_datas, error = None, f"{type(e).__name__}: {e}"
+            return BatchResult(
+                location=(city_name, state_name, country_code),
+                weather=weather_datas,
+                error=error,
+                elapsed=time.perf_counter() - start,
+            )
+
+    async with _client_scope(client) as client:
+        return list(await asyncio.gather(*(lookup(location) for location in locations)))
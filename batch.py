@@ -0,0 +1,101 @@
+"""
+Batch Weather Refresh
+=====================
+Command-line entry point that fetches weather for a list of locations and
+writes one JSON object per line (JSON Lines).
+
+Input file format (one location per line, blank lines and # comments are
+ignored):
+
+    London,,GB
+    New York,NY,US
+    Lagos
+
+Usage:
+    python batch.py locations.txt -o results.jsonl --workers 16
+
+Each output line holds the requested location, the elapsed seconds, an
+error message (or null) and the WeatherData fields (or null). Throughput is
+printed to stderr when the run finishes.
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+
+from weather import BATCH_WORKERS, main_batch
+
+
+def read_locations(path):
+    """
+    Read locations from a text file.
+
+    Args:
+        path (str): File with one "city[,state[,country]]" per line
+
+    Returns:
+        list: (city, state, country) tuples
+    """
+    locations = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = [part.strip() for part in line.split(",")] + ["", ""]
+            locations.append(tuple(parts[:3]))
+    return locations
+
+
+def result_to_json(result):
+    """Serialize a BatchResult as a single JSON line."""
+    return json.dumps({
+        "location": dict(zip(("city", "state", "country"), result.location)),
+        "elapsed": round(result.elapsed, 4),
+        "error": result.error,
+        "weather": asdict(result.weather) if result.weather is not None else None,
+    }, ensure_ascii=False)
+
+
+def run(argv=None):
+    """
+    Parse arguments, run the batch and write results.
+
+    Returns:
+        int: Process exit code (0 if every location succeeded, 1 otherwise)
+    """
+    parser = argparse.ArgumentParser(description="Fetch weather for many locations.")
+    parser.add_argument("locations", help="file with one city[,state[,country]] per line")
+    parser.add_argument("-o", "--output", default="-", help="JSON Lines output file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=BATCH_WORKERS,
+                        help=f"locations fetched at once (default: {BATCH_WORKERS})")
+    args = parser.parse_args(argv)
+
+    locations = read_locations(args.locations)
+
+    start = time.perf_counter()
+    results = main_batch(locations, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for result in results:
+            out.write(result_to_json(result) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    failed = sum(1 for result in results if result.error)
+    rate = len(results) / elapsed if elapsed > 0 else 0.0
+    print(f"Fetched {len(results) - failed}/{len(results)} locations in {elapsed:.2f}s "
+          f"({rate:.1f} cities/second, {args.workers} workers)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
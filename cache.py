@@ -0,0 +1,459 @@
+"""
+Weather Response Cache Module
+=============================
+This module caches OpenWeatherMap responses for current weather, forecasts
+and UV index, keyed by endpoint and rounded coordinates.
+
+Each endpoint has its own freshness TTL. Once an entry is older than its
+TTL it is still served immediately ("stale-while-revalidate") while a
+background thread refreshes it, so popular locations almost never wait on
+the upstream API. Entries older than TTL + max-stale are refetched inline,
+and are still returned if that refetch fails.
+
+Concurrent cache misses for the same key are coalesced by SingleFlight, so
+only one upstream call is made and every waiter receives its result.
+
+Entries are kept in the worker's memory by default. With
+WEATHER_CACHE_BACKEND=sqlite they are kept in a database shared by every
+worker on the host instead (see cachestore.py), so each location is fetched
+once per host rather than once per worker.
+
+Classes:
+    - ResponseCache: TTL cache with background refresh
+    - SingleFlight: Deduplicates identical in-flight calls
+
+Functions:
+    - cached_endpoint(): Decorator that routes a fetcher through the cache
+    - get_response_cache(): Return the process-wide cache
+
+Configuration (environment variables):
+    - WEATHER_CACHE: "0" disables response caching (default "1")
+    - WEATHER_CACHE_TTL_CURRENT: Fresh lifetime of current weather (default 600)
+    - WEATHER_CACHE_TTL_FORECAST: Fresh lifetime of forecasts (default 1800)
+    - WEATHER_CACHE_TTL_UV: Fresh lifetime of UV index (default 3600)
+    - WEATHER_CACHE_MAX_STALE: Extra seconds stale data may be served
+      while refreshing (default 3600)
+    - WEATHER_CACHE_PRECISION: Decimal places coordinates are rounded to
+      (default 2, roughly 1 km)
+    - WEATHER_CACHE_MAX_ENTRIES: Entries kept before the least recently
+      used are evicted (default 10000)
+    - WEATHER_CACHE_BACKEND: "memory" (per process, default) or "sqlite"
+      (shared by all workers on the host)
+    - WEATHER_CACHE_PATH: Database file of the sqlite backend (default
+      "data/weather_cache.sqlite3")
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import copy
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cachestore import MemoryBackend, SQLiteBackend
+from ratelimit import BACKGROUND, priority
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CACHE_ENABLED = os.getenv("WEATHER_CACHE", "1") != "0"
+DEFAULT_TTLS = {
+    "current": int(os.getenv("WEATHER_CACHE_TTL_CURRENT", "600")),
+    "forecast": int(os.getenv("WEATHER_CACHE_TTL_FORECAST", "1800")),
+    "uv": int(os.getenv("WEATHER_CACHE_TTL_UV", "3600")),
+}
+DEFAULT_MAX_STALE = int(os.getenv("WEATHER_CACHE_MAX_STALE", "3600"))
+DEFAULT_PRECISION = int(os.getenv("WEATHER_CACHE_PRECISION", "2"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "10000"))
+CACHE_BACKEND = os.getenv("WEATHER_CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("WEATHER_CACHE_PATH", os.path.join(BASE_DIR, "data", "weather_cache.sqlite3"))
+
+# How long one worker may hold a shared entry's refresh before another retries
+REFRESH_LEASE = 30
+
+# Entry states reported by ResponseCache.lookup()
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+
+class _Call:
+    """A single in-flight call that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running block until it finishes and receive the same result
+    (or the same exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Run ``fn()`` once for all concurrent callers using ``key``.
+
+        Args:
+            key (hashable): Identifies identical calls
+            fn (callable): Zero-argument function to execute
+
+        Returns:
+            The result of the shared execution
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """
+        Return coalescing counters.
+
+        Returns:
+            dict: executions, coalesced, in_flight
+        """
+        with self._lock:
+            in_flight = len(self._calls)
+        return {"executions": self.executions, "coalesced": self.coalesced, "in_flight": in_flight}
+
+
+# Shared by every cached endpoint so identical concurrent fetches collapse
+endpoint_flight = SingleFlight()
+
+
+class ResponseCache:
+    """
+    Response cache with per-endpoint TTLs and background refresh.
+
+    Cached values are shallow-copied on the way out so callers (such as
+    weather.main(), which fills in forecast fields on the WeatherData) never
+    modify the cached object.
+
+    Args:
+        ttls (dict, optional): Fresh lifetime in seconds per endpoint name
+        max_stale (int): Seconds past the TTL that stale data is still served
+        precision (int): Decimal places used to round coordinates in keys
+        max_entries (int): Maximum entries before LRU eviction
+        backend (optional): Entry store (see cachestore.py); defaults to a
+            MemoryBackend of ``max_entries``
+    """
+
+    def __init__(self, ttls=None, max_stale=DEFAULT_MAX_STALE, precision=DEFAULT_PRECISION,
+                 max_entries=DEFAULT_MAX_ENTRIES, backend=None):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_stale = max_stale
+        self.precision = precision
+        self.max_entries = max_entries
+        self.backend = backend if backend is not None else MemoryBackend(max_entries)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.expired_hits = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = None
+
+    def make_key(self, endpoint, lat, lon):
+        """Build the cache key for an endpoint and (rounded) coordinates."""
+        return (endpoint, round(float(lat), self.precision), round(float(lon), self.precision))
+
+    def get_or_fetch(self, endpoint, lat, lon, fetch):
+        """
+        Return the cached value for an endpoint/location, fetching if needed.
+
+        Args:
+            endpoint (str): Endpoint name ("current", "forecast" or "uv")
+            lat (float): Latitude coordinate
+            lon (float): Longitude coordinate
+            fetch (callable): Zero-argument function that calls the API;
+                a None result is never cached, and an expired entry (if
+                any) is returned in its place
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        value, state = self.lookup(endpoint, lat, lon)
+        if state == FRESH:
+            return value
+        if state == STALE:
+            self._schedule_refresh(self.make_key(endpoint, lat, lon), fetch)
+            return value
+
+        fetched = fetch()
+        if fetched is not None:
+            self.store(endpoint, lat, lon, fetched)
+            return copy.copy(fetched)
+        if state == EXPIRED:
+            # Upstream is failing (or its circuit is open): expired data
+            # beats an error page
+            self.count("expired_hits")
+            return value
+        return None
+
+    def lookup(self, endpoint, lat, lon):
+        """
+        Look up a cached value without fetching.
+
+        Args:
+            endpoint (str): Endpoint name
+            lat (float): Latitude coordinate
+            lon (float): Longitude coordinate
+
+        Returns:
+            tuple: (value, state) where state is FRESH, STALE or EXPIRED,
+                   or (None, None) if nothing is cached
+        """
+        entry = self.backend.get(self.make_key(endpoint, lat, lon))
+        ttl = self.ttls.get(endpoint, 0)
+
+        if entry is None:
+            self.count("misses")
+            return None, None
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age < ttl:
+            self.count("hits")
+            return copy.copy(value), FRESH
+        if age < ttl + self.max_stale:
+            self.count("stale_hits")
+            return copy.copy(value), STALE
+        self.count("misses")
+        return copy.copy(value), EXPIRED
+
+    def count(self, counter):
+        """Increment one of the stats() counters (safe from any thread)."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def expires_in(self, endpoint, lat, lon):
+        """
+        Seconds until an entry goes stale, without counting a hit or miss.
+
+        Returns:
+            float: Remaining fresh lifetime (negative once stale), or None
+                   if nothing is cached
+        """
+        stored_at = self.backend.stored_at(self.make_key(endpoint, lat, lon))
+        if stored_at is None:
+            return None
+        return stored_at + self.ttls.get(endpoint, 0) - time.time()
+
+    def store(self, endpoint, lat, lon, value):
+        """Cache a freshly fetched value for an endpoint/location."""
+        self._store(self.make_key(endpoint, lat, lon), value)
+
+    def _store(self, key, value, stored_at=None):
+        if stored_at is None:
+            stored_at = time.time()
+        expires_at = stored_at + self.ttls.get(key[0], 0) + self.max_stale
+        self.backend.set(key, value, stored_at, expires_at)
+
+    def _schedule_refresh(self, key, fetch):
+        """Start one background refresh per key; later requests keep serving stale data."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        # With a shared backend, another worker may already be refreshing it
+        if not self.backend.claim_refresh(key, REFRESH_LEASE):
+            with self._lock:
+                self._refreshing.discard(key)
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+        self._executor.submit(self._refresh, key, fetch)
+
+    def _refresh(self, key, fetch):
+        try:
+            # Refreshes are never urgent; let interactive lookups go first
+            with priority(BACKGROUND):
+                value = fetch()
+            if value is not None:
+                self._store(key, value)
+                self.count("refreshes")
+        except Exception as e:
+            print(f"❌ Error: background refresh of {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def export_entries(self):
+        """
+        Return every entry for persisting (see warmup.save_snapshot()).
+
+        Returns:
+            list: (key, value, stored_at) tuples, least recently used (or oldest) first
+        """
+        return self.backend.entries()
+
+    def import_entries(self, entries):
+        """
+        Load entries saved by export_entries(), skipping any too old to serve.
+
+        Returns:
+            int: Entries loaded
+        """
+        now = time.time()
+        loaded = 0
+        for key, value, stored_at in entries:
+            if now - stored_at >= self.ttls.get(key[0], 0) + self.max_stale:
+                continue
+            self._store(key, value, stored_at)
+            loaded += 1
+        return loaded
+
+    def _after_fork(self):
+        """Reset locks and the refresh pool, which do not survive a fork."""
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = None
+        self.backend.after_fork()
+
+    def clear(self):
+        """Drop every cached entry."""
+        self.backend.clear()
+
+    def stats(self):
+        """
+        Return cache counters.
+
+        Returns:
+            dict: hits, stale_hits, misses, refreshes, expired_hits, entries
+        """
+        entries = len(self.backend)
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "expired_hits": self.expired_hits,
+                "entries": entries,
+            }
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Return the process-wide ResponseCache, creating it on first use.
+
+    Returns:
+        ResponseCache: Shared cache (stored per WEATHER_CACHE_BACKEND), or
+                       None if WEATHER_CACHE is "0"
+    """
+    global _response_cache
+    if not CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                backend = None
+                if CACHE_BACKEND == "sqlite":
+                    backend = SQLiteBackend(CACHE_PATH, DEFAULT_MAX_ENTRIES)
+                _response_cache = ResponseCache(backend=backend)
+    return _response_cache
+
+
+def _reset_after_fork():
+    """Keep the cached entries in a forked child, but not the parent's threads or locks."""
+    global _response_cache_lock
+    _response_cache_lock = threading.Lock()
+    if _response_cache is not None:
+        _response_cache._after_fork()
+
+
+# A preloaded, pre-warmed app shares its cache with workers copy-on-write
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def cached_endpoint(endpoint):
+    """
+    Decorator that serves a (lat, lon, api_key) fetcher from the response cache.
+
+    Concurrent upstream calls for the same endpoint and (rounded, as in the
+    cache key) coordinates are coalesced through ``endpoint_flight``.
+
+    The undecorated fetcher stays reachable as ``func.__wrapped__``;
+    ``func.refresh(lat, lon, api_key)`` fetches and stores a new value
+    whatever the cached entry's age (used for prefetching), and
+    ``func.endpoint`` is the endpoint name.
+
+    Args:
+        endpoint (str): Endpoint name used for the key and TTL lookup
+
+    Example:
+        >>> @cached_endpoint("uv")
+        ... def get_uv_index(lat, lon, api_key): ...
+    """
+    def flight_key(cache, lat, lon):
+        # The cache's rounded key, so lookups that share a cache entry also
+        # share one upstream call
+        if cache is not None:
+            return cache.make_key(endpoint, lat, lon)
+        return (endpoint, round(float(lat), DEFAULT_PRECISION), round(float(lon), DEFAULT_PRECISION))
+
+    def decorator(fetch):
+        @functools.wraps(fetch)
+        def wrapper(lat, lon, api_key):
+            cache = get_response_cache()
+
+            def fetch_once():
+                return endpoint_flight.do(flight_key(cache, lat, lon), lambda: fetch(lat, lon, api_key))
+
+            if cache is None:
+                return copy.copy(fetch_once())
+            return cache.get_or_fetch(endpoint, lat, lon, fetch_once)
+
+        def refresh(lat, lon, api_key):
+            cache = get_response_cache()
+            value = endpoint_flight.do(flight_key(cache, lat, lon), lambda: fetch(lat, lon, api_key))
+            if value is not None and cache is not None:
+                cache.store(endpoint, lat, lon, value)
+            return value
+
+        wrapper.refresh = refresh
+        wrapper.endpoint = endpoint
+        return wrapper
+    return decorator
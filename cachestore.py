@@ -0,0 +1,259 @@
+"""
+Response Cache Backends Module
+==============================
+This module holds the storage behind the response cache in cache.py.
+
+The memory backend keeps entries in the worker's own memory (the default,
+and the fastest for a single process). The SQLite backend keeps them in one
+database file in WAL mode that every gunicorn worker on the host reads and
+writes, so a location fetched by one worker is a cache hit in all of them,
+and the cached data survives restarts.
+
+Shared entries are stored as compressed pickles, written with a single
+INSERT OR REPLACE (readers never see a half-written entry). Entries past
+TTL + max-stale are swept out periodically, and the oldest entries beyond
+the size limit are dropped. A stale entry is refreshed by one worker at a
+time: the first to claim its refresh lease.
+
+Classes:
+    - MemoryBackend: In-process LRU store
+    - SQLiteBackend: Host-wide store shared by every worker
+
+Functions:
+    - encode_value(): Serialize a cached value compactly
+    - decode_value(): Restore a value serialized by encode_value()
+
+Configuration (environment variables):
+    - WEATHER_CACHE_SWEEP_INTERVAL: Seconds between sweeps of expired
+      entries from the SQLite backend (default 60)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+SWEEP_INTERVAL = float(os.getenv("WEATHER_CACHE_SWEEP_INTERVAL", "60"))
+
+# Values smaller than this are stored uncompressed
+COMPRESS_MIN_BYTES = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS response_cache (
+    endpoint TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    value BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    refresh_until REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (endpoint, lat, lon)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS response_cache_expires ON response_cache (expires_at);
+CREATE INDEX IF NOT EXISTS response_cache_stored ON response_cache (stored_at);
+"""
+
+
+def encode_value(value):
+    """
+    Serialize a cached value (WeatherData, forecast tuple, UV index).
+
+    Returns:
+        bytes: One flag byte ("p" plain or "z" zlib) followed by the pickle
+    """
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(data, 1)
+    return b"p" + data
+
+
+def decode_value(blob):
+    """Restore a value serialized by encode_value()."""
+    blob = bytes(blob)
+    data = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    return pickle.loads(data)
+
+
+class MemoryBackend:
+    """
+    In-process store with least-recently-used eviction.
+
+    Args:
+        max_entries (int): Entries kept before the least recently used are
+            dropped
+    """
+
+    persistent = False
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (value, stored_at) for a key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def stored_at(self, key):
+        """Return when a key was stored, or None, without counting a use."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key, value, stored_at, expires_at):
+        """Store a value; ``expires_at`` is unused (entries leave by LRU)."""
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def claim_refresh(self, key, lease):
+        """Refreshes are already deduplicated within the process."""
+        return True
+
+    def entries(self):
+        """Return (key, value, stored_at) tuples, least recently used first."""
+        with self._lock:
+            return [(key, value, stored_at) for key, (value, stored_at) in self._entries.items()]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def after_fork(self):
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    Store shared by every process on the host, in an SQLite database.
+
+    Args:
+        path (str): Database file
+        max_entries (int): Entries kept before the oldest are dropped
+        sweep_interval (float): Seconds between sweeps of expired entries
+    """
+
+    persistent = True
+
+    def __init__(self, path, max_entries, sweep_interval=SWEEP_INTERVAL):
+        self.path = path
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self.swept = 0
+        self._last_sweep = time.time()
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        """Return this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            if not self._initialized:
+                with self._init_lock:
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+        return conn
+
+    def get(self, key):
+        """Return (value, stored_at) for a key, or None."""
+        row = self._connect().execute(
+            "SELECT value, stored_at FROM response_cache WHERE endpoint = ? AND lat = ? AND lon = ?", key,
+        ).fetchone()
+        if row is None:
+            return None
+        return decode_value(row[0]), row[1]
+
+    def stored_at(self, key):
+        """Return when a key was stored, or None."""
+        row = self._connect().execute(
+            "SELECT stored_at FROM response_cache WHERE endpoint = ? AND lat = ? AND lon = ?", key,
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def set(self, key, value, stored_at, expires_at):
+        """Store a value, replacing any previous entry (and its refresh lease)."""
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO response_cache (endpoint, lat, lon, value, stored_at, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (*key, encode_value(value), stored_at, expires_at),
+        )
+        if time.time() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def sweep(self):
+        """
+        Delete entries past TTL + max-stale, then the oldest beyond max_entries.
+
+        Returns:
+            int: Entries deleted
+        """
+        now = time.time()
+        self._last_sweep = now
+        conn = self._connect()
+        deleted = conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (now,)).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            deleted += conn.execute(
+                "DELETE FROM response_cache WHERE (endpoint, lat, lon) IN "
+                "(SELECT endpoint, lat, lon FROM response_cache ORDER BY stored_at LIMIT ?)", (excess,),
+            ).rowcount
+        self.swept += deleted
+        return deleted
+
+    def claim_refresh(self, key, lease):
+        """
+        Claim the right to refresh an entry for ``lease`` seconds.
+
+        Returns:
+            bool: True for exactly one caller across all processes until the
+                  entry is stored again or the lease runs out
+        """
+        now = time.time()
+        return self._connect().execute(
+            "UPDATE response_cache SET refresh_until = ? "
+            "WHERE endpoint = ? AND lat = ? AND lon = ? AND refresh_until <= ?",
+            (now + lease, *key, now),
+        ).rowcount == 1
+
+    def entries(self):
+        """Return (key, value, stored_at) tuples, oldest first."""
+        rows = self._connect().execute(
+            "SELECT endpoint, lat, lon, value, stored_at FROM response_cache ORDER BY stored_at"
+        ).fetchall()
+        return [((endpoint, lat, lon), decode_value(value), stored_at)
+                for endpoint, lat, lon, value, stored_at in rows]
+
+    def clear(self):
+        self._connect().execute("DELETE FROM response_cache")
+
+    def after_fork(self):
+        # Connections are reopened by _connect() when the pid changes
+        self._init_lock = threading.Lock()
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
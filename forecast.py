@@ -0,0 +1,176 @@
+"""
+Columnar Forecast Module
+========================
+This module stores parsed forecasts column by column instead of as a list
+of per-entry dicts, which is most of the memory of a cached location.
+
+Each numeric field (time, temperature, precipitation chance, humidity,
+wind) is a packed array, and the repeated strings (icon codes,
+descriptions, time labels) are stored once per process and referenced by
+small integer codes. A ForecastSeries is still a read-only sequence of
+dicts: indexing or iterating it builds the entry dict on the fly, so
+templates and callers keep using ``hour["temp"]`` / ``hour.temp``, and
+``dataclasses.asdict()`` turns it into the usual list of dicts.
+
+Classes:
+    - ForecastSeries: Read-only, column-oriented sequence of forecast entries
+
+Functions:
+    - hourly_series(): Pack hourly forecast dicts
+    - daily_series(): Pack daily forecast dicts
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import math
+import threading
+from array import array
+from collections.abc import Sequence
+
+# Column layouts: (field, array typecode); "s" marks an interned string column
+HOURLY_COLUMNS = (
+    ("time", "q"), ("temp", "d"), ("icon", "s"), ("description", "s"),
+    ("precipitation", "d"), ("humidity", "q"), ("time_label", "s"),
+)
+DAILY_COLUMNS = (
+    ("time", "q"), ("temp_max", "d"), ("temp_min", "d"), ("icon", "s"), ("description", "s"),
+    ("humidity", "q"), ("wind_speed", "d"), ("precipitation", "d"), ("date_label", "s"),
+)
+
+# Process-wide string table; icons, descriptions and labels come from small
+# fixed vocabularies, so it stays small
+_strings = []
+_string_codes = {}
+_strings_lock = threading.Lock()
+
+
+def _intern(value):
+    code = _string_codes.get(value)
+    if code is None:
+        with _strings_lock:
+            code = _string_codes.get(value)
+            if code is None:
+                code = len(_strings)
+                _strings.append(value)
+                _string_codes[value] = code
+    return code
+
+
+class ForecastSeries(Sequence):
+    """
+    Forecast entries stored as columns.
+
+    Args:
+        columns (tuple): (field, typecode) pairs, e.g. HOURLY_COLUMNS
+        rows (iterable): Entry dicts with those fields (missing fields are
+            stored as None / NaN)
+
+    Raises:
+        TypeError, ValueError, OverflowError: If a value does not fit its
+            column (see hourly_series(), which falls back to plain lists)
+    """
+
+    __slots__ = ("_layout", "_data", "_length")
+
+    def __init__(self, columns, rows=()):
+        rows = list(rows)
+        data = []
+        for name, typecode in columns:
+            values = [row.get(name) for row in rows]
+            if typecode == "s":
+                # None is interned like any other string
+                data.append(array("I", [_intern(value) for value in values]))
+            elif typecode == "d":
+                data.append(array("d", [math.nan if value is None else value for value in values]))
+            else:
+                data.append(array(typecode, values))
+        self._layout = columns
+        self._data = data
+        self._length = len(rows)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("forecast index out of range")
+        row = {}
+        for (name, typecode), column in zip(self._layout, self._data):
+            value = column[index]
+            if typecode == "s":
+                value = _strings[value]
+            elif typecode == "d" and math.isnan(value):
+                value = None
+            row[name] = value
+        return row
+
+    def __iter__(self):
+        names = [name for name, _ in self._layout]
+        columns = [self._decode(typecode, column) for (_, typecode), column in zip(self._layout, self._data)]
+        for values in zip(*columns):
+            yield dict(zip(names, values))
+
+    @staticmethod
+    def _decode(typecode, column):
+        if typecode == "s":
+            return [_strings[code] for code in column]
+        if typecode == "d":
+            return [None if math.isnan(value) else value for value in column]
+        return column.tolist()
+
+    def column(self, name):
+        """
+        Return one field for every entry, without building entry dicts.
+
+        Example:
+            >>> temps = series.column("temp")
+        """
+        for (field, typecode), column in zip(self._layout, self._data):
+            if field == name:
+                return self._decode(typecode, column)
+        raise KeyError(name)
+
+    def to_list(self):
+        """Return the entries as a list of dicts."""
+        return list(self)
+
+    def __eq__(self, other):
+        if isinstance(other, (ForecastSeries, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ForecastSeries({self.to_list()!r})"
+
+    def __deepcopy__(self, memo):
+        # dataclasses.asdict() deep-copies field values it does not know:
+        # produce the plain list of dicts it would have seen before
+        return self.to_list()
+
+    def __reduce__(self):
+        # String codes are per process, so pickles (shared cache, chart
+        # workers) carry the entries themselves
+        return (ForecastSeries, (self._layout, self.to_list()))
+
+
+def _pack(columns, rows):
+    try:
+        return ForecastSeries(columns, rows)
+    except (TypeError, ValueError, OverflowError):
+        # Unexpected value types (e.g. missing timestamps): keep the dicts
+        return list(rows)
+
+
+def hourly_series(rows):
+    """Pack hourly forecast dicts into a ForecastSeries (or keep the list if they do not fit)."""
+    return _pack(HOURLY_COLUMNS, rows)
+
+
+def daily_series(rows):
+    """Pack daily forecast dicts into a ForecastSeries (or keep the list if they do not fit)."""
+    return _pack(DAILY_COLUMNS, rows)
@@ -0,0 +1,247 @@
+"""
+Streaming Forecast Parser Module
+================================
+This module parses a 5-Day Forecast API response while it is downloaded,
+one forecast entry at a time, instead of decoding the whole body with
+response.json() and walking the decoded tree afterwards.
+
+Each entry is decoded on its own and immediately reduced to the fields the
+dashboard uses (time, temperature, humidity, precipitation chance, wind
+speed, icon and description); "clouds", "sys", "visibility", "dt_txt" and
+the rest are dropped straight away. Neither the response body nor the full
+decoded entries are ever held in memory at once. When the body ends, the
+slim entries are handed to weather.parse_forecasts(), so the result is
+exactly what parse_forecast() returns for the same response. (The daily
+rollup has to wait for the end of the body: the city's UTC offset comes
+after the entry list.)
+
+Classes:
+    - ForecastStreamParser: Incremental parser fed with body chunks
+
+Functions:
+    - slim_entry(): Keep only the fields the dashboard uses
+    - parse_forecast_stream(): Parse an iterable of body chunks
+
+Configuration (environment variables):
+    - FORECAST_STREAMING: "0" decodes forecast responses in one piece with
+      response.json() (default "1")
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import codecs
+import json
+import os
+import re
+
+FORECAST_STREAMING = os.getenv("FORECAST_STREAMING", "1") != "0"
+
+# Bytes read from the connection at a time
+CHUNK_SIZE = 8192
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Parser states
+_START, _KEY, _COLON, _VALUE, _AFTER_VALUE, _ITEM, _AFTER_ITEM, _DONE = range(8)
+
+
+def slim_entry(item):
+    """
+    Reduce a forecast entry to the fields the dashboard uses.
+
+    Missing fields stay missing, so defaults apply exactly as for the full
+    entry.
+    """
+    slim = {}
+    if "dt" in item:
+        slim["dt"] = item["dt"]
+    if "pop" in item:
+        slim["pop"] = item["pop"]
+    main = item.get("main")
+    if main is not None:
+        slim["main"] = {key: main[key] for key in ("temp", "humidity") if key in main}
+    wind = item.get("wind")
+    if wind is not None:
+        slim["wind"] = {"speed": wind["speed"]} if "speed" in wind else {}
+    weather = item.get("weather")
+    if weather:
+        slim["weather"] = [{key: weather[0][key] for key in ("icon", "description") if key in weather[0]}]
+    return slim
+
+
+class ForecastStreamParser:
+    """
+    Incremental parser for a forecast response body.
+
+    Feed body chunks (bytes or str) with feed(), then call close() for the
+    parsed forecast.
+
+    Example:
+        >>> parser = ForecastStreamParser()
+        >>> for chunk in response.iter_content(8192):
+        ...     parser.feed(chunk)
+        >>> hourly_forecast, daily_forecast = parser.close()
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.fields = {}
+        # The C scanner behind json.loads(), called once per value
+        self._scan = json.JSONDecoder().scan_once
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._key = None
+
+    def feed(self, chunk):
+        """Parse as much of the body as has arrived."""
+        if isinstance(chunk, bytes):
+            chunk = self._text.decode(chunk)
+        # Drop what has been parsed so the buffer stays about one chunk long
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        self._parse(final=False)
+
+    def close(self):
+        """
+        Finish parsing.
+
+        Returns:
+            tuple: (hourly_forecast, daily_forecast), as parse_forecast()
+
+        Raises:
+            ValueError: If the body is not a complete JSON object
+        """
+        self.feed(self._text.decode(b"", final=True))
+        self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError("incomplete forecast response")
+        from weather import parse_forecasts
+
+        data = dict(self.fields, list=self.entries)
+        return parse_forecasts([data])[0]
+
+    def _skip_whitespace(self):
+        buffer = self._buffer
+        pos = self._pos = _WHITESPACE.match(buffer, self._pos).end()
+        return buffer[pos] if pos < len(buffer) else None
+
+    def _decode_value(self, final):
+        """Decode the JSON value at the current position, or None if more data is needed."""
+        try:
+            value, end = self._scan(self._buffer, self._pos)
+        except (StopIteration, json.JSONDecodeError):
+            if final:
+                raise ValueError("invalid JSON in forecast response")
+            return None
+        # A number at the very end of the buffer may continue in the next chunk
+        if end == len(self._buffer) and not final:
+            return None
+        self._pos = end
+        return (value,)
+
+    def _expect(self, char, expected):
+        if char not in expected:
+            raise ValueError(f"unexpected {char!r} at offset {self._pos} of forecast response")
+
+    def _parse(self, final):
+        while self._state != _DONE:
+            char = self._skip_whitespace()
+            if char is None:
+                return
+            state = self._state
+            if state == _START:
+                self._expect(char, "{")
+                self._pos += 1
+                self._state = _KEY
+            elif state == _KEY:
+                if char == "}":
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                self._expect(char, '"')
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    return
+                self._key = decoded[0]
+                self._state = _COLON
+            elif state == _COLON:
+                self._expect(char, ":")
+                self._pos += 1
+                self._state = _VALUE
+            elif state == _VALUE:
+                if self._key == "list" and char == "[":
+                    # Stream the entries instead of decoding the whole array
+                    self._pos += 1
+                    self._state = _ITEM
+                    continue
+                decoded = self._decode_value(final)
+                if decoded is None:
+                    return
+                self.fields[self._key] = decoded[0]
+                self._state = _AFTER_VALUE
+            elif state == _AFTER_VALUE:
+                self._expect(char, ",}")
+                self._pos += 1
+                self._state = _KEY if char == "," else _DONE
+            elif state == _ITEM:
+                if char == "]":
+                    self._pos += 1
+                    self._state = _AFTER_VALUE
+                    continue
+                if not self._parse_items():
+                    return
+            elif state == _AFTER_ITEM:
+                self._expect(char, ",]")
+                self._pos += 1
+                self._state = _ITEM if char == "," else _AFTER_VALUE
+
+    def _parse_items(self):
+        """
+        Decode the complete entries in the buffer (the hot loop).
+
+        Returns:
+            bool: False if more data is needed for the next entry
+        """
+        buffer, scan, entries = self._buffer, self._scan, self.entries
+        match_whitespace = _WHITESPACE.match
+        pos = self._pos
+        while True:
+            try:
+                item, end = scan(buffer, pos)
+            except (StopIteration, json.JSONDecodeError):
+                # Incomplete entry: wait for the next chunk (close() reports
+                # a truncated body)
+                self._pos = pos
+                return False
+            end = match_whitespace(buffer, end).end()
+            if end >= len(buffer):
+                self._pos = pos
+                return False
+            if not isinstance(item, dict):
+                raise ValueError(f"unexpected forecast entry at offset {pos} of forecast response")
+            entries.append(slim_entry(item))
+            if buffer[end] != ",":
+                self._pos = end
+                self._state = _AFTER_ITEM
+                return True
+            pos = match_whitespace(buffer, end + 1).end()
+
+
+def parse_forecast_stream(chunks):
+    """
+    Parse a forecast response body given as an iterable of chunks.
+
+    Args:
+        chunks (iterable): Body chunks (bytes or str), e.g.
+            response.iter_content(CHUNK_SIZE)
+
+    Returns:
+        tuple: (hourly_forecast, daily_forecast), as parse_forecast()
+    """
+    parser = ForecastStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
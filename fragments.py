@@ -0,0 +1,161 @@
+"""
+Template Fragment Cache Module
+==============================
+This module caches the rendered HTML of the dashboard sections that are the
+same for every visitor of a location (key metrics, sunrise/sunset, hourly
+and daily forecast cards), so a page for cached weather only renders the
+per-request parts around them.
+
+Fragments are keyed by location and fragment name, and tagged with a data
+version: a hash of the weather fields the fragment is drawn from. Only the
+latest version is kept per location and fragment. When the response cache
+refreshes a forecast, the next page load sees a new version and replaces
+the stale HTML. Memory is bounded by PAGE_FRAGMENT_CACHE_MAX_BYTES, with
+least recently used fragments evicted first.
+
+Classes:
+    - FragmentCache: Size-bounded LRU of rendered HTML fragments
+
+Functions:
+    - data_version(): Hash of the weather fields a fragment depends on
+    - get_fragment_cache(): Return the process-wide fragment cache
+
+Configuration (environment variables):
+    - PAGE_FRAGMENT_CACHE_MAX_BYTES: Characters of HTML kept (default 8 MB,
+      0 disables the cache)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+PAGE_FRAGMENT_CACHE_MAX_BYTES = int(os.getenv("PAGE_FRAGMENT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+
+def data_version(weather_data, fields):
+    """
+    Hash the given fields of a weather data dict.
+
+    Args:
+        weather_data (dict): WeatherData as a dict (dataclasses.asdict)
+        fields (tuple): Field names the fragment is rendered from
+
+    Returns:
+        str: 32 hexadecimal characters
+    """
+    payload = json.dumps([weather_data.get(field) for field in fields], sort_keys=True,
+                         separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class FragmentCache:
+    """
+    Rendered HTML fragments with least-recently-used eviction.
+
+    Args:
+        max_bytes (int): Total fragment size (in characters) kept
+    """
+
+    def __init__(self, max_bytes=PAGE_FRAGMENT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get_or_render(self, location, name, version, render):
+        """
+        Return the cached fragment, rendering it if missing or outdated.
+
+        Args:
+            location (str): Normalized location key
+            name (str): Fragment name
+            version (str): Data version (see data_version())
+            render (callable): Zero-argument function returning the HTML
+
+        Returns:
+            str: Rendered HTML
+        """
+        key = (location, name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        html = render()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+                if old[0] != version:
+                    self.invalidations += 1
+            self._entries[key] = (version, html)
+            self._bytes += len(html)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+        return html
+
+    def invalidate(self, location):
+        """Drop every fragment of a location."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == location]:
+                self._bytes -= len(self._entries.pop(key)[1])
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every cached fragment."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Return cache counters.
+
+        Returns:
+            dict: hits, misses, invalidations (outdated versions replaced or
+                  dropped), evictions, entries, bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+_fragment_cache = None
+_fragment_cache_lock = threading.Lock()
+
+
+def get_fragment_cache():
+    """
+    Return the process-wide FragmentCache, creating it on first use.
+
+    Returns:
+        FragmentCache: Shared cache, or None if PAGE_FRAGMENT_CACHE_MAX_BYTES is 0
+    """
+    global _fragment_cache
+    if PAGE_FRAGMENT_CACHE_MAX_BYTES <= 0:
+        return None
+    if _fragment_cache is None:
+        with _fragment_cache_lock:
+            if _fragment_cache is None:
+                _fragment_cache = FragmentCache()
+    return _fragment_cache
@@ -0,0 +1,234 @@
+"""
+Geocoding Cache Module
+======================
+This module keeps a persistent, disk-backed cache of city → coordinate
+lookups so that get_lat_lon() only calls the Geocoding API the first time
+a location is seen.
+
+The cache is a single SQLite database in WAL mode, so it survives restarts
+and is shared safely by every gunicorn worker on the host. Locations that
+the API reports as "not found" are cached too (for a limited time) so that
+repeated typos do not cost an API round trip each.
+
+Classes:
+    - GeocodeCache: SQLite-backed geocoding cache
+
+Functions:
+    - make_key(): Normalize city/state/country into a cache key
+    - get_geocache(): Return the process-wide cache (created on first use)
+
+Configuration (environment variables):
+    - GEOCACHE_PATH: Database file (default "data/geocache.sqlite3");
+      set to an empty string to disable the cache
+    - GEOCACHE_NEGATIVE_TTL: Seconds to remember "not found" results
+      (default 86400)
+    - GEOCACHE_CITY_LIST: Bundled CSV used to preload the cache
+      (default "data/cities.csv")
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+GEOCACHE_PATH = os.getenv("GEOCACHE_PATH", os.path.join(BASE_DIR, "data", "geocache.sqlite3"))
+GEOCACHE_NEGATIVE_TTL = int(os.getenv("GEOCACHE_NEGATIVE_TTL", "86400"))
+GEOCACHE_CITY_LIST = os.getenv("GEOCACHE_CITY_LIST", os.path.join(BASE_DIR, "data", "cities.csv"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode (
+    key TEXT PRIMARY KEY,
+    lat REAL,
+    lon REAL,
+    found INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def make_key(city_name, state_code="", country_code=""):
+    """
+    Normalize a location into a cache key.
+
+    Case and surrounding/repeated whitespace are ignored, so "  new york"
+    and "New  York" share an entry.
+
+    Args:
+        city_name (str): City name
+        state_code (str, optional): State/province code. Defaults to "".
+        country_code (str, optional): Country code. Defaults to "".
+
+    Returns:
+        str: Key of the form "city,state,country"
+
+    Example:
+        >>> make_key(" London ", "", "gb")
+        'london,,gb'
+    """
+    parts = (city_name or "", state_code or "", country_code or "")
+    return ",".join(" ".join(part.split()).casefold() for part in parts)
+
+
+class GeocodeCache:
+    """
+    Persistent geocoding cache stored in SQLite.
+
+    Each thread (and each forked worker) opens its own connection lazily;
+    SQLite's WAL mode lets all of them read concurrently while one writes.
+
+    Args:
+        path (str): Database file path
+        negative_ttl (int): Seconds a "not found" entry stays valid
+        city_list (str, optional): CSV file (city,state,country,lat,lon)
+            loaded the first time the database is created
+    """
+
+    def __init__(self, path=GEOCACHE_PATH, negative_ttl=GEOCACHE_NEGATIVE_TTL,
+                 city_list=GEOCACHE_CITY_LIST):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.city_list = city_list
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        """Return this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn):
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            conn.executescript(_SCHEMA)
+            preloaded = conn.execute("SELECT value FROM meta WHERE name = 'preloaded'").fetchone()
+            if preloaded is None and self.city_list and os.path.exists(self.city_list):
+                self._preload(conn, self.city_list)
+                conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('preloaded', ?)",
+                             (os.path.basename(self.city_list),))
+            self._initialized = True
+
+    def get(self, city_name, state_code="", country_code=""):
+        """
+        Look up a location.
+
+        Returns:
+            tuple: (lat, lon) for a known location, (None, None) for a
+                   cached "not found" result
+            None: If the location is not cached (or its negative entry
+                  has expired)
+        """
+        row = self._connect().execute(
+            "SELECT lat, lon, found, updated_at FROM geocode WHERE key = ?",
+            (make_key(city_name, state_code, country_code),),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        lat, lon, found, updated_at = row
+        if not found:
+            if time.time() - updated_at > self.negative_ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return None, None
+        self.hits += 1
+        return lat, lon
+
+    def set(self, city_name, state_code, country_code, lat, lon):
+        """Store coordinates for a location."""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO geocode (key, lat, lon, found, updated_at) VALUES (?, ?, ?, 1, ?)",
+            (make_key(city_name, state_code, country_code), lat, lon, time.time()),
+        )
+
+    def set_not_found(self, city_name, state_code="", country_code=""):
+        """Remember that the Geocoding API returned no results for a location."""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO geocode (key, lat, lon, found, updated_at) VALUES (?, NULL, NULL, 0, ?)",
+            (make_key(city_name, state_code, country_code), time.time()),
+        )
+
+    def preload(self, csv_path):
+        """
+        Load a city list into the cache without overwriting existing entries.
+
+        Args:
+            csv_path (str): CSV file with columns city,state,country,lat,lon
+
+        Returns:
+            int: Number of rows read from the file
+        """
+        return self._preload(self._connect(), csv_path)
+
+    def _preload(self, conn, csv_path):
+        now = time.time()
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = [
+                (make_key(row["city"], row.get("state", ""), row.get("country", "")),
+                 float(row["lat"]), float(row["lon"]), now)
+                for row in csv.DictReader(f)
+            ]
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT OR IGNORE INTO geocode (key, lat, lon, found, updated_at) VALUES (?, ?, ?, 1, ?)",
+            rows,
+        )
+        conn.execute("COMMIT")
+        return len(rows)
+
+    def stats(self):
+        """
+        Return hit/miss counters for this process.
+
+        Returns:
+            dict: hits, misses, entries
+        """
+        entries = self._connect().execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+_geocache = None
+_geocache_lock = threading.Lock()
+
+
+def get_geocache():
+    """
+    Return the process-wide GeocodeCache, creating it on first use.
+
+    Returns:
+        GeocodeCache: Shared cache, or None if GEOCACHE_PATH is empty
+    """
+    global _geocache
+    if not GEOCACHE_PATH:
+        return None
+    if _geocache is None:
+        with _geocache_lock:
+            if _geocache is None:
+                _geocache = GeocodeCache()
+    return _geocache
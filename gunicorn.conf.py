@@ -0,0 +1,78 @@
+"""
+Gunicorn Configuration
+======================
+Production server settings for the Weather Dashboard (see Procfile).
+
+The app is imported once in the master process (preload) and the caches are
+warmed there before any worker is forked (see warmup.py), so every worker
+starts with the app, the geocoding cache and recent weather already in
+memory, shared copy-on-write. Without preload there is nothing for workers
+to inherit, so the master skips the warmup. Each worker saves its response
+cache when it exits and the master merges the parts into one snapshot at
+shutdown, so the next start is warm as well.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+
+Configuration (environment variables):
+    - GUNICORN_PRELOAD: "0" imports the app in each worker instead of the
+      master (default "1")
+    - WEB_CONCURRENCY, PORT: Worker count and port (read by gunicorn itself)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import os
+import time
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") != "0"
+
+# Gunicorn reads this file before it imports (and, with preload, loads) the app
+_config_loaded = time.perf_counter()
+
+
+def on_starting(server):
+    """Report the app import time and warm the caches before forking workers."""
+    # Without preload the workers import the app themselves and would not
+    # inherit anything warmed here
+    if not server.cfg.preload_app:
+        return
+    import warmup
+
+    warmup.boot(time.perf_counter() - _config_loaded)
+
+
+def pre_fork(server, worker):
+    worker.boot_started = time.perf_counter()
+
+
+def post_worker_init(worker):
+    """Log how long the worker took to become ready to serve."""
+    elapsed = (time.perf_counter() - worker.boot_started) * 1000
+    worker.log.info("Worker %s ready in %.0f ms", worker.pid, elapsed)
+
+
+def worker_exit(server, worker):
+    """Save the worker's response cache as its part of the next snapshot."""
+    import warmup
+
+    if not warmup.CACHE_SNAPSHOT_PATH:
+        return
+    try:
+        warmup.save_snapshot(f"{warmup.CACHE_SNAPSHOT_PATH}.worker-{worker.pid}")
+    except Exception as e:
+        server.log.warning("Could not save cache snapshot: %r", e)
+
+
+def on_exit(server):
+    """Merge the workers' snapshot parts into the snapshot for the next start."""
+    import warmup
+
+    try:
+        entries = warmup.merge_snapshots()
+    except Exception as e:
+        server.log.warning("Could not merge cache snapshots: %r", e)
+    else:
+        if entries:
+            server.log.info("Saved %d cached responses to %s", entries, warmup.CACHE_SNAPSHOT_PATH)
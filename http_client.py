@@ -0,0 +1,350 @@
+"""
+HTTP Client Module
+==================
+This module provides the shared HTTP layer used by every OpenWeatherMap call
+in weather.py. All fetchers go through a single pooled requests.Session so
+that repeated lookups reuse keep-alive connections instead of paying a new
+TCP/TLS handshake per call. Calls also pass the shared rate limiter from
+ratelimit.py before they are sent, and are retried / circuit-broken per
+endpoint according to resilience.py.
+
+Classes:
+    - ClientStats: Thread-safe request and connection counters
+    - WeatherHTTPClient: Pooled session with timeouts and URL normalization
+
+Functions:
+    - get_client(): Return the process-wide client (created on first use)
+    - configure_client(): Replace the process-wide client with new settings
+    - normalize_url(): Upgrade OpenWeatherMap URLs from HTTP to HTTPS
+
+Configuration (environment variables):
+    - OWM_BASE_URL: API base URL (default "https://api.openweathermap.org")
+    - HTTP_POOL_CONNECTIONS: Number of per-host pools to keep (default 4)
+    - HTTP_POOL_MAXSIZE: Keep-alive connections per host (default 16)
+    - HTTP_CONNECT_TIMEOUT: Connect timeout in seconds (default 3.05)
+    - HTTP_READ_TIMEOUT: Read timeout in seconds (default 10)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from metrics import observe_upstream
+from ratelimit import RateLimitExceeded, get_limiter
+from resilience import CircuitBreaker, RetryPolicy
+
+DEFAULT_BASE_URL = os.getenv("OWM_BASE_URL", "https://api.openweathermap.org")
+DEFAULT_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+DEFAULT_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+DEFAULT_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+
+# Hosts that always support HTTPS and should never be called over plain HTTP
+SECURE_HOSTS = {"api.openweathermap.org", "openweathermap.org"}
+
+# ============================================================================
+# CONNECTION COUNTERS
+# ============================================================================
+
+class ClientStats:
+    """
+    Thread-safe counters for requests sent and connections opened.
+
+    A request that does not open a new connection was served from the
+    keep-alive pool, so ``reused_connections`` is simply the difference.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self):
+        """
+        Return the current counters as a plain dict.
+
+        Returns:
+            dict: requests, new_connections, reused_connections, reuse_ratio
+        """
+        with self._lock:
+            requests_sent = self.requests
+            opened = self.new_connections
+        reused = max(requests_sent - opened, 0)
+        return {
+            "requests": requests_sent,
+            "new_connections": opened,
+            "reused_connections": reused,
+            "reuse_ratio": (reused / requests_sent) if requests_sent else 0.0,
+        }
+
+
+def _counting_pool(base_class, stats):
+    """Build a urllib3 pool class that reports every new connection to stats."""
+    class CountingPool(base_class):
+        def _new_conn(self):
+            stats.record_new_connection()
+            return super()._new_conn()
+    CountingPool.__name__ = f"Counting{base_class.__name__}"
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count the connections they open."""
+
+    def __init__(self, stats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._stats),
+            "https": _counting_pool(HTTPSConnectionPool, self._stats),
+        }
+
+# ============================================================================
+# URL HELPERS
+# ============================================================================
+
+def normalize_url(url):
+    """
+    Upgrade OpenWeatherMap URLs from HTTP to HTTPS.
+
+    URLs pointing at any other host (for example a local test server) are
+    returned unchanged.
+
+    Args:
+        url (str): Absolute URL
+
+    Returns:
+        str: The same URL, using https:// for OpenWeatherMap hosts
+
+    Example:
+        >>> normalize_url("http://api.openweathermap.org/geo/1.0/direct")
+        'https://api.openweathermap.org/geo/1.0/direct'
+    """
+    parts = urlsplit(url)
+    if parts.scheme == "http" and parts.hostname in SECURE_HOSTS:
+        parts = parts._replace(scheme="https")
+    return urlunsplit(parts)
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class WeatherHTTPClient:
+    """
+    Pooled HTTP client shared by all OpenWeatherMap fetchers.
+
+    Args:
+        base_url (str): API base URL; relative paths are resolved against it
+        pool_connections (int): Number of per-host connection pools to cache
+        pool_maxsize (int): Maximum keep-alive connections per host
+        connect_timeout (float): Default connect timeout in seconds
+        read_timeout (float): Default read timeout in seconds
+        limiter (ratelimit.RateLimiter, optional): Rate limiter every call
+            must pass before it is sent
+        retry_policy (resilience.RetryPolicy, optional): Retry settings;
+            defaults to RetryPolicy() built from the environment
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, limiter=None, retry_policy=None):
+        self.base_url = normalize_url(base_url.rstrip("/"))
+        self.timeout = (connect_timeout, read_timeout)
+        self.limiter = limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.stats = ClientStats()
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+        adapter = _CountingAdapter(self.stats, pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url_for(self, path):
+        """
+        Resolve an API path or absolute URL to a normalized absolute URL.
+
+        Args:
+            path (str): Path such as "/data/2.5/weather", or a full URL
+
+        Returns:
+            str: Absolute URL
+        """
+        if "://" in path:
+            return normalize_url(path)
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path, params=None, timeout=None, stream=False):
+        """
+        Issue a GET request through the shared connection pool.
+
+        Transient failures (connection errors, timeouts, 429 and 5xx) are
+        retried with jittered backoff, and each endpoint's circuit breaker
+        is consulted first so a failing upstream is not hammered.
+
+        Args:
+            path (str): API path or absolute URL
+            params (dict, optional): Query string parameters
+            timeout (float | tuple, optional): Overrides the default
+                (connect, read) timeout for this call
+            stream (bool): Return before the body is downloaded (read it
+                with response.iter_content(), then close the response)
+
+        Returns:
+            requests.Response: The HTTP response (the last one, if every
+                attempt failed with a retryable status)
+
+        Raises:
+            resilience.CircuitOpenError: If the endpoint's breaker is open
+            ratelimit.RateLimitExceeded: If the upstream quota stays
+                exhausted for longer than the call may queue
+            requests.RequestException: If every attempt failed to connect
+                or timed out
+        """
+        url = self.url_for(path)
+        breaker = self.breaker_for(url)
+        breaker.before_call()
+
+        attempt = 0
+        try:
+            while True:
+                response, error, started = None, None, None
+                try:
+                    if self.limiter is not None:
+                        self.limiter.acquire()
+                    self.stats.record_request()
+                    started = time.perf_counter()
+                    response = self.session.get(url, params=params, stream=stream,
+                                                timeout=timeout if timeout is not None else self.timeout)
+                except RateLimitExceeded:
+                    # Refused locally before anything was sent: not the endpoint's fault
+                    raise
+                except requests.exceptions.RequestException as e:
+                    error = e
+                if started is not None:
+                    # Every attempt, retries included (not calls refused by the limiter)
+                    observe_upstream(breaker.name, response.status_code if response is not None else "error",
+                                     time.perf_counter() - started)
+
+                if error is None and not self.retry_policy.is_retryable(response):
+                    breaker.record_success()
+                    return response
+                if attempt >= self.retry_policy.retries or not self.retry_policy.is_retryable(response, error):
+                    break
+                retry_after = response.headers.get("Retry-After") if response is not None else None
+                if response is not None:
+                    # Release the connection of a response that is not returned
+                    response.close()
+                time.sleep(self.retry_policy.backoff(attempt, retry_after))
+                attempt += 1
+        except BaseException:
+            # Refused by the rate limiter, interrupted, or a bug: nothing to
+            # record against the endpoint, but a half-open trial must give up
+            # its slot
+            breaker.release()
+            raise
+
+        breaker.record_failure()
+        if error is not None:
+            raise error
+        return response
+
+    def breaker_for(self, url):
+        """Return the circuit breaker for the endpoint (URL path) of ``url``."""
+        endpoint = urlsplit(url).path
+        with self._breakers_lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+    def breaker_states(self):
+        """
+        Return the circuit breaker state of every endpoint called so far.
+
+        Returns:
+            dict: Endpoint path → breaker snapshot (state, failures, ...)
+        """
+        with self._breakers_lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide WeatherHTTPClient, creating it on first use.
+
+    Returns:
+        WeatherHTTPClient: Shared client instance
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = WeatherHTTPClient(limiter=get_limiter())
+    return _client
+
+
+def _reset_after_fork():
+    """
+    Forget the parent's client in a forked child.
+
+    Its pooled keep-alive sockets are shared with the parent, so the child
+    must open its own connections rather than interleave requests on them.
+    """
+    global _client, _client_lock
+    _client = None
+    _client_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def configure_client(**kwargs):
+    """
+    Replace the process-wide client with one built from the given settings.
+
+    Accepts the same keyword arguments as WeatherHTTPClient; the shared rate
+    limiter is used unless ``limiter`` is given. The previous client's
+    connections are closed.
+
+    Returns:
+        WeatherHTTPClient: The new shared client
+    """
+    global _client
+    kwargs.setdefault("limiter", get_limiter())
+    with _client_lock:
+        old, _client = _client, WeatherHTTPClient(**kwargs)
+    if old is not None:
+        old.close()
+    return _client
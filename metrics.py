@@ -0,0 +1,304 @@
+"""
+Request Metrics Module
+======================
+This module records where the time of a dashboard request goes and exports
+it, together with the counters the caches and the HTTP client already keep,
+in the Prometheus text format served by the /metrics route in app.py.
+
+Timing spans cover each stage of a lookup: geocode, current, forecast, uv,
+aggregation (the daily rollup), plot and template. Spans nest: a forecast
+fetched upstream includes its aggregation, and a page includes every stage
+before it. Each upstream call is recorded per endpoint and status code
+("error" when no response arrived), so retries and slow endpoints show up
+separately. Cache hit ratios are read from the caches' own counters when
+/metrics is scraped, so they cost nothing on the request path.
+
+When METRICS_ENABLED is "0", span() returns a shared no-op context manager
+and nothing is recorded, so the instrumentation costs one flag check.
+
+Metrics are kept per process: with several gunicorn workers, each scrape
+reports the worker that answered it.
+
+Classes:
+    - Histogram: Thread-safe labelled histogram with fixed buckets
+
+Functions:
+    - span(): Context manager timing one stage of a request
+    - observe_upstream(): Record one upstream call's status and latency
+    - render_metrics(): All metrics in the Prometheus text format
+
+Configuration (environment variables):
+    - METRICS_ENABLED: "0" disables timing spans and /metrics (default "1")
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# Upper bounds in seconds, from cache hits (well under 1 ms) to slow
+# upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Labelled histogram of durations with fixed buckets.
+
+    Args:
+        name (str): Metric name (e.g. "weather_stage_seconds")
+        documentation (str): HELP text
+        labelnames (tuple): Label names, in the order observe() takes them
+        buckets (tuple): Ascending bucket upper bounds in seconds
+    """
+
+    def __init__(self, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values → [per-bucket counts (last is +Inf), sum, count]
+        self._series = {}
+
+    def observe(self, labels, seconds):
+        """Record one duration for the label values ``labels`` (a tuple)."""
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def snapshot(self):
+        """
+        Return the recorded series.
+
+        Returns:
+            dict: label values → {"buckets": cumulative counts, "sum", "count"}
+        """
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        result = {}
+        for labels, (counts, total, count) in series.items():
+            cumulative, running = [], 0
+            for value in counts:
+                running += value
+                cumulative.append(running)
+            result[labels] = {"buckets": cumulative, "sum": total, "count": count}
+        return result
+
+    def reset(self):
+        """Drop every recorded series."""
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        """Return the histogram in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, series in sorted(self.snapshot().items()):
+            pairs = list(zip(self.labelnames, labels))
+            for bound, count in zip(bounds, series["buckets"]):
+                lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', bound)])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {series['count']}")
+        return lines
+
+
+stage_seconds = Histogram("weather_stage_seconds",
+                          "Time spent in each stage of a weather lookup or page render",
+                          ("stage",))
+upstream_seconds = Histogram("weather_upstream_request_seconds",
+                             "OpenWeatherMap call latency (to the response headers) by endpoint and status",
+                             ("endpoint", "status"))
+
+# ============================================================================
+# RECORDING
+# ============================================================================
+
+class _Span:
+    __slots__ = ("labels", "start")
+
+    def __init__(self, stage):
+        self.labels = (stage,)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        stage_seconds.observe(self.labels, time.perf_counter() - self.start)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(stage):
+    """
+    Time the enclosed block as ``stage`` (recorded even if it raises).
+
+    Example:
+        >>> with span("plot"):
+        ...     plot_name = generate_plot(hourly, offset)
+    """
+    if not METRICS_ENABLED:
+        return _NO_SPAN
+    return _Span(stage)
+
+
+def observe_upstream(endpoint, status, seconds):
+    """
+    Record one upstream call.
+
+    Args:
+        endpoint (str): URL path, e.g. "/data/2.5/weather"
+        status (int | str): HTTP status code, or "error" if the call failed
+            without a response
+        seconds (float): Time until the response headers arrived
+    """
+    if METRICS_ENABLED:
+        upstream_seconds.observe((endpoint, str(status)), seconds)
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _family(name, kind, documentation, samples):
+    """Render a counter/gauge family from (labels, value) samples."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for pairs, value in samples:
+        lines.append(f"{name}{_format_labels(pairs)} {_format_value(value)}")
+    return lines
+
+
+def cache_stats():
+    """
+    Return the counters of every cache in this process.
+
+    Returns:
+        dict: Cache name ("response", "geocode", "fragment", "plot") →
+              {"hits", "misses", "entries"}; disabled caches are omitted
+    """
+    from cache import get_response_cache
+    from fragments import get_fragment_cache
+    from geocache import get_geocache
+    from plotcache import get_plot_cache
+
+    caches = {}
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        stats = response_cache.stats()
+        # Stale entries are served (and refreshed in the background)
+        caches["response"] = {"hits": stats["hits"] + stats["stale_hits"],
+                              "misses": stats["misses"], "entries": stats["entries"]}
+    for name, cache in (("geocode", get_geocache()), ("fragment", get_fragment_cache()),
+                        ("plot", get_plot_cache())):
+        if cache is not None:
+            stats = cache.stats()
+            caches[name] = {"hits": stats["hits"], "misses": stats["misses"],
+                            "entries": stats.get("entries", stats.get("files", 0))}
+    return caches
+
+
+def _collect_caches():
+    caches = cache_stats()
+    requests_total, ratios, entries = [], [], []
+    for name, stats in sorted(caches.items()):
+        lookups = stats["hits"] + stats["misses"]
+        requests_total.append(([("cache", name), ("result", "hit")], stats["hits"]))
+        requests_total.append(([("cache", name), ("result", "miss")], stats["misses"]))
+        ratios.append(([("cache", name)], stats["hits"] / lookups if lookups else 0.0))
+        entries.append(([("cache", name)], stats["entries"]))
+    return (
+        _family("weather_cache_requests_total", "counter", "Cache lookups by cache and result", requests_total)
+        + _family("weather_cache_hit_ratio", "gauge", "Share of cache lookups served from the cache", ratios)
+        + _family("weather_cache_entries", "gauge", "Entries held by each cache", entries)
+    )
+
+
+def _collect_client():
+    from cache import endpoint_flight
+    from http_client import get_client
+
+    client = get_client()
+    stats = client.stats.snapshot()
+    breaker_states = {"closed": 0, "half_open": 1, "open": 2}
+    breakers = [([("endpoint", endpoint)], breaker_states.get(state["state"], 2))
+                for endpoint, state in sorted(client.breaker_states().items())]
+    coalesced = endpoint_flight.stats()
+    return (
+        _family("weather_upstream_attempts_total", "counter", "Upstream HTTP requests sent, retries included",
+                [([], stats["requests"])])
+        + _family("weather_upstream_connections_total", "counter", "New upstream connections opened",
+                  [([], stats["new_connections"])])
+        + _family("weather_circuit_breaker_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+                  breakers)
+        + _family("weather_coalesced_fetches_total", "counter", "Fetches that joined an identical in-flight fetch",
+                  [([], coalesced["coalesced"])])
+    )
+
+
+def _collect_boot():
+    import warmup
+
+    samples = [([("phase", phase)], warmup.boot_stats[key] / 1000)
+               for phase, key in (("load", "load_ms"), ("warm", "warm_ms")) if key in warmup.boot_stats]
+    return _family("weather_boot_seconds", "gauge", "Startup time of this process by phase", samples)
+
+
+def render_metrics():
+    """
+    Return every metric of this process in the Prometheus text format.
+
+    Returns:
+        str: Exposition text (serve it with CONTENT_TYPE)
+    """
+    lines = stage_seconds.render() + upstream_seconds.render()
+    for collect in (_collect_caches, _collect_client, _collect_boot):
+        try:
+            lines += collect()
+        except Exception as e:
+            # One failing source must not break the scrape
+            print(f"❌ Error: Could not collect metrics from {collect.__name__}: {e}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Drop the recorded timings (the caches keep their own counters)."""
+    stage_seconds.reset()
+    upstream_seconds.reset()
@@ -0,0 +1,338 @@
+"""
+Forecast Plot Cache Module
+==========================
+This module stores rendered forecast charts under a hash of the data they
+show, so each request gets its own image (concurrent requests for different
+cities no longer overwrite one shared file) and an unchanged forecast is
+served from disk instead of being drawn again.
+
+Files live in static/plots/<hash>.<ext>. The directory is bounded: once it
+holds more than PLOT_CACHE_MAX_BYTES or PLOT_CACHE_MAX_FILES, the least
+recently used images are deleted. Each process keeps its own index of the
+directory (rebuilt from file modification times at startup); an image
+removed by another worker is simply rendered again.
+
+Slow renderers can run in another process: submit() hands a miss to an
+executor and returns the file name at once, so the page can reference the
+image before it exists; wait() lets the image route block briefly until it
+is written. A queued render leaves a ".<name>.pending" marker in the
+directory, so a worker that did not queue it can wait for it too, while
+names nobody is rendering are refused at once. At most PLOT_QUEUE_SIZE
+renders are queued; beyond that, submit() declines and the page is shown
+without a chart.
+
+Classes:
+    - PlotCache: Content-addressed, size-bounded LRU image store
+
+Functions:
+    - plot_key(): Hash identifying a chart's input data
+    - get_plot_cache(): Return the process-wide plot cache
+
+Configuration (environment variables):
+    - PLOT_CACHE_DIR: Image directory (default "static/plots")
+    - PLOT_CACHE_MAX_BYTES: Total image size kept (default 50 MB)
+    - PLOT_CACHE_MAX_FILES: Number of images kept (default 1000)
+    - PLOT_QUEUE_SIZE: Renders that may be queued in an executor (default 32)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from cache import SingleFlight
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PLOT_CACHE_DIR = os.getenv("PLOT_CACHE_DIR", os.path.join(BASE_DIR, "static", "plots"))
+PLOT_CACHE_MAX_BYTES = int(os.getenv("PLOT_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+PLOT_CACHE_MAX_FILES = int(os.getenv("PLOT_CACHE_MAX_FILES", "1000"))
+PLOT_QUEUE_SIZE = int(os.getenv("PLOT_QUEUE_SIZE", "32"))
+
+# Seconds between checks for an image queued by another worker
+WAIT_POLL_INTERVAL = 0.05
+
+# Age after which a pending marker is taken to be left by a crashed worker
+PENDING_MARKER_TTL = 120
+
+
+def plot_key(hourly_data, timezone_offset):
+    """
+    Return a stable hash of the data a forecast chart is drawn from.
+
+    Returns:
+        str: 32 hexadecimal characters
+    """
+    # list(): hourly forecasts may be ForecastSeries (see forecast.py)
+    payload = json.dumps([list(hourly_data), timezone_offset], sort_keys=True,
+                         separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class PlotCache:
+    """
+    Content-addressed image store with least-recently-used eviction.
+
+    Args:
+        directory (str): Where images are written
+        max_bytes (int): Total size kept before evicting
+        max_files (int): Number of images kept before evicting
+        max_pending (int): Renders that submit() may have queued at once
+    """
+
+    def __init__(self, directory=PLOT_CACHE_DIR, max_bytes=PLOT_CACHE_MAX_BYTES,
+                 max_files=PLOT_CACHE_MAX_FILES, max_pending=PLOT_QUEUE_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+        self._bytes = 0
+        self._flight = SingleFlight()
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+        self.failures = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Index existing images, oldest modification time first."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._bytes += size
+
+    def get_or_render(self, hourly_data, timezone_offset, render, extension="png"):
+        """
+        Return the cached image for this data, rendering it on a miss.
+
+        Concurrent misses for the same data render once.
+
+        Args:
+            hourly_data (list): Hourly forecast entries
+            timezone_offset (int): UTC offset in seconds
+            render (callable): ``render(hourly_data, timezone_offset, path)``
+                writes the image to ``path``
+            extension (str): Image file extension
+
+        Returns:
+            str: Image file name inside ``directory``
+        """
+        name = f"{plot_key(hourly_data, timezone_offset)}.{extension}"
+        if self._hit(name):
+            return name
+        return self._flight.do(name, lambda: self._render(name, hourly_data, timezone_offset, render))
+
+    def submit(self, hourly_data, timezone_offset, render, executor, extension="png"):
+        """
+        Return the image name at once, rendering a miss in ``executor``.
+
+        Args:
+            hourly_data (list): Hourly forecast entries
+            timezone_offset (int): UTC offset in seconds
+            render (callable): Picklable ``render(hourly_data, timezone_offset, path)``
+            executor (concurrent.futures.Executor): Where the render runs
+            extension (str): Image file extension
+
+        Returns:
+            str: Image file name inside ``directory``, or None if the render
+                 queue is full
+        """
+        name = f"{plot_key(hourly_data, timezone_offset)}.{extension}"
+        if self._hit(name):
+            return name
+        with self._lock:
+            if name in self._pending:
+                return name
+            if len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                return None
+            tmp_path = self._temp_path(name)
+            marker = self._marker_path(name)
+            open(marker, "w").close()
+            try:
+                future = executor.submit(render, hourly_data, timezone_offset, tmp_path)
+            except BaseException:
+                os.remove(tmp_path)
+                os.remove(marker)
+                raise
+            pending = self._pending[name] = threading.Event()
+        future.add_done_callback(lambda f: self._finish(name, tmp_path, f, pending))
+        return name
+
+    def wait(self, name, timeout):
+        """
+        Wait up to ``timeout`` seconds for an image to be written.
+
+        A render submitted by this process is waited for directly; one
+        queued by another worker is polled on disk while its marker exists.
+        Names nobody is rendering return at once.
+
+        Returns:
+            bool: True if the image file is available
+        """
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            pending = self._pending.get(name)
+        if pending is not None:
+            pending.wait(timeout)
+            return os.path.exists(path)
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(path):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._marked_pending(name):
+                return os.path.exists(path)
+            time.sleep(min(WAIT_POLL_INTERVAL, remaining))
+        return True
+
+    def is_pending(self, name):
+        """Return True while a render of ``name`` queued by any worker is unfinished."""
+        with self._lock:
+            if name in self._pending:
+                return True
+        return self._marked_pending(name)
+
+    def _marker_path(self, name):
+        return os.path.join(self.directory, f".{name}.pending")
+
+    def _marked_pending(self, name):
+        """Return True if a live pending marker exists for ``name``."""
+        try:
+            return time.time() - os.path.getmtime(self._marker_path(name)) < PENDING_MARKER_TTL
+        except OSError:
+            return False
+
+    def _hit(self, name):
+        """Return True (and refresh recency) if ``name`` is cached on disk."""
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            cached = name in self._files
+            if cached:
+                self._files.move_to_end(name)
+        if not (cached and os.path.exists(path)):
+            return False
+        with self._lock:
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True
+
+    def _temp_path(self, name):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=os.path.splitext(name)[1])
+        os.close(fd)
+        return tmp_path
+
+    def _render(self, name, hourly_data, timezone_offset, render):
+        tmp_path = self._temp_path(name)
+        try:
+            render(hourly_data, timezone_offset, tmp_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._commit(name, tmp_path)
+        return name
+
+    def _finish(self, name, tmp_path, future, pending):
+        """Done-callback for submit(): move the render into place."""
+        try:
+            if future.exception() is None:
+                self._commit(name, tmp_path)
+            else:
+                with self._lock:
+                    self.failures += 1
+        except BaseException:
+            with self._lock:
+                self.failures += 1
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            try:
+                os.remove(self._marker_path(name))
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self._pending.pop(name, None)
+            pending.set()
+
+    def _commit(self, name, tmp_path):
+        """Publish a finished render atomically, then evict over budget."""
+        path = os.path.join(self.directory, name)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self.misses += 1
+            self._bytes += size - self._files.pop(name, 0)
+            self._files[name] = size
+            evicted = self._evict_locked()
+        for old in evicted:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except FileNotFoundError:
+                pass
+
+    def _evict_locked(self):
+        """Drop least recently used entries over budget; keep the newest one."""
+        evicted = []
+        while len(self._files) > 1 and (self._bytes > self.max_bytes or len(self._files) > self.max_files):
+            old, size = self._files.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            evicted.append(old)
+        return evicted
+
+    def stats(self):
+        """
+        Return cache counters for monitoring.
+
+        Returns:
+            dict: hits, misses, evictions, rejected (queue full), failures
+                  (background renders), pending, files, bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "failures": self.failures,
+                "pending": len(self._pending),
+                "files": len(self._files),
+                "bytes": self._bytes,
+            }
+
+
+_plot_cache = None
+_plot_cache_lock = threading.Lock()
+
+
+def get_plot_cache():
+    """
+    Return the process-wide PlotCache, creating it on first use.
+
+    Returns:
+        PlotCache: Shared plot cache
+    """
+    global _plot_cache
+    if _plot_cache is None:
+        with _plot_cache_lock:
+            if _plot_cache is None:
+                _plot_cache = PlotCache()
+    return _plot_cache
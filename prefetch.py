@@ -0,0 +1,265 @@
+"""
+Background Prefetch Module
+==========================
+This module keeps the most requested locations warm in the response cache.
+index() records every lookup in a space-saving heavy-hitters counter (a
+fixed number of counters, however many distinct cities are searched). A
+daemon thread wakes up periodically, takes the top locations and refreshes
+their current weather, forecast and UV index shortly before the cached
+entries go stale, so popular cities never pay for a cold miss.
+
+Prefetching runs at background rate-limit priority (see ratelimit.py) and
+has its own upstream budget on top, so it can never use the quota reserved
+for interactive page loads. Counts are halved every cycle, so popularity
+follows recent traffic. Each process prefetches for its own response cache.
+
+Classes:
+    - SpaceSaving: Approximate top-k counter with bounded memory
+    - Prefetcher: Scheduler refreshing popular locations
+
+Functions:
+    - get_prefetcher(): Return the process-wide prefetcher (None if disabled)
+    - record_lookup(): Count a location lookup, starting the scheduler on
+      first use
+
+Configuration (environment variables):
+    - PREFETCH_ENABLED: "0" disables prefetching (default "1")
+    - PREFETCH_TOP_N: Locations kept warm (default 20)
+    - PREFETCH_TRACKED: Locations counted by the heavy-hitters sketch
+      (default 500)
+    - PREFETCH_INTERVAL: Seconds between scheduler runs (default 60)
+    - PREFETCH_LEAD_TIME: Refresh entries this many seconds before they go
+      stale (default 120)
+    - PREFETCH_BUDGET_PER_MINUTE: Upstream calls prefetching may make per
+      minute (default 10, 0 leaves only the shared rate limit)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import os
+import threading
+
+import weather
+from cache import get_response_cache
+from geocache import make_key
+from ratelimit import BACKGROUND, TokenBucket, priority
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") != "0"
+PREFETCH_TOP_N = int(os.getenv("PREFETCH_TOP_N", "20"))
+PREFETCH_TRACKED = int(os.getenv("PREFETCH_TRACKED", "500"))
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", "60"))
+PREFETCH_LEAD_TIME = float(os.getenv("PREFETCH_LEAD_TIME", "120"))
+PREFETCH_BUDGET_PER_MINUTE = float(os.getenv("PREFETCH_BUDGET_PER_MINUTE", "10"))
+
+
+class SpaceSaving:
+    """
+    Space-saving heavy-hitters counter (Metwally et al.).
+
+    Keeps at most ``capacity`` counters. When a new key arrives and the
+    table is full, it takes over the smallest counter (and its count), so
+    frequent keys are never undercounted and are reliably in the top list.
+
+    Args:
+        capacity (int): Number of counters kept
+    """
+
+    def __init__(self, capacity=PREFETCH_TRACKED):
+        self.capacity = capacity
+        self._counts = {}
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, item=None, count=1):
+        """Count one occurrence of ``key``; ``item`` is returned by top()."""
+        with self._lock:
+            if key in self._counts:
+                self._counts[key] += count
+                return
+            if len(self._counts) >= self.capacity:
+                smallest = min(self._counts, key=self._counts.get)
+                count += self._counts.pop(smallest)
+                del self._items[smallest]
+            self._counts[key] = count
+            self._items[key] = item if item is not None else key
+
+    def top(self, n):
+        """
+        Return the ``n`` most frequent entries.
+
+        Returns:
+            list: (item, estimated count) tuples, most frequent first
+        """
+        with self._lock:
+            ranked = sorted(self._counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+            return [(self._items[key], count) for key, count in ranked]
+
+    def decay(self, factor=0.5):
+        """Scale every count by ``factor``, dropping counters that reach zero."""
+        with self._lock:
+            for key in list(self._counts):
+                self._counts[key] = int(self._counts[key] * factor)
+                if self._counts[key] <= 0:
+                    del self._counts[key]
+                    del self._items[key]
+
+    def __len__(self):
+        return len(self._counts)
+
+
+class Prefetcher:
+    """
+    Refresh the cached data of the most requested locations before it expires.
+
+    Args:
+        tracker (SpaceSaving): Lookup frequency counter
+        top_n (int): Locations kept warm
+        interval (float): Seconds between runs
+        lead_time (float): Refresh entries this long before they go stale
+        budget_per_minute (float): Upstream calls allowed per minute (0 for
+            no prefetch-specific limit; the shared rate limiter still applies)
+    """
+
+    def __init__(self, tracker=None, top_n=PREFETCH_TOP_N, interval=PREFETCH_INTERVAL,
+                 lead_time=PREFETCH_LEAD_TIME, budget_per_minute=PREFETCH_BUDGET_PER_MINUTE):
+        self.tracker = tracker if tracker is not None else SpaceSaving()
+        self.top_n = top_n
+        self.interval = interval
+        self.lead_time = lead_time
+        self.budget = TokenBucket(budget_per_minute / 60.0, budget_per_minute) if budget_per_minute > 0 else None
+        self._coordinates = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.refreshed = 0
+        self.skipped_budget = 0
+        self.errors = 0
+
+    def record(self, city_name, state_name="", country_code=""):
+        """Count a lookup of a location."""
+        self.tracker.add(make_key(city_name, state_name, country_code),
+                         (city_name, state_name, country_code))
+
+    def start(self):
+        """Start the scheduler thread (once)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="weather-prefetch", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread after its current run."""
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Error: prefetch run failed: {e}")
+
+    def run_once(self):
+        """
+        Refresh whatever the top locations need now.
+
+        Returns:
+            int: Upstream refreshes made
+        """
+        cache = get_response_cache()
+        if cache is None:
+            return 0
+        fetchers = (weather.get_current_weather, weather.get_forecast, weather.get_uv_index)
+        refreshed = 0
+        with priority(BACKGROUND):
+            for location, _ in self.tracker.top(self.top_n):
+                coordinates = self._locate(location)
+                if coordinates is None:
+                    continue
+                lat, lon = coordinates
+                for fetcher in fetchers:
+                    remaining = cache.expires_in(fetcher.endpoint, lat, lon)
+                    if remaining is not None and remaining > self.lead_time:
+                        continue
+                    if self.budget is not None and self.budget.take() != 0:
+                        self.skipped_budget += 1
+                        continue
+                    try:
+                        if fetcher.refresh(lat, lon, weather.api_key) is not None:
+                            refreshed += 1
+                    except Exception as e:
+                        self.errors += 1
+                        print(f"❌ Error: prefetch of {location} failed: {e}")
+        self.tracker.decay()
+        self.runs += 1
+        self.refreshed += refreshed
+        return refreshed
+
+    def _locate(self, location):
+        """Return (lat, lon) for a location, remembered between runs."""
+        key = make_key(*location)
+        coordinates = self._coordinates.get(key)
+        if coordinates is None:
+            lat, lon = weather.get_lat_lon(*location, weather.api_key)
+            if lat is None or lon is None:
+                return None
+            coordinates = self._coordinates[key] = (lat, lon)
+            # Keep the memo no larger than the tracker
+            if len(self._coordinates) > 2 * self.tracker.capacity:
+                self._coordinates.clear()
+        return coordinates
+
+    def stats(self):
+        """
+        Return scheduler counters.
+
+        Returns:
+            dict: runs, refreshed, skipped_budget, errors, tracked, top
+                  (the current top locations with their estimated counts)
+        """
+        return {
+            "runs": self.runs,
+            "refreshed": self.refreshed,
+            "skipped_budget": self.skipped_budget,
+            "errors": self.errors,
+            "tracked": len(self.tracker),
+            "top": [{"location": list(item), "count": count} for item, count in self.tracker.top(self.top_n)],
+        }
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher():
+    """
+    Return the process-wide Prefetcher, creating it on first use.
+
+    Returns:
+        Prefetcher: Shared prefetcher, or None if PREFETCH_ENABLED is "0"
+                    or the response cache is disabled
+    """
+    global _prefetcher
+    if not PREFETCH_ENABLED or get_response_cache() is None:
+        return None
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = Prefetcher()
+    return _prefetcher
+
+
+def record_lookup(city_name, state_name="", country_code=""):
+    """
+    Count a location lookup for prefetching.
+
+    The scheduler thread is started on the first call, so importing this
+    module (or the app) never starts threads.
+    """
+    prefetcher = get_prefetcher()
+    if prefetcher is not None:
+        prefetcher.record(city_name, state_name, country_code)
+        prefetcher.start()
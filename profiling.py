@@ -0,0 +1,276 @@
+"""
+Request Profiling Module
+========================
+This module profiles individual dashboard requests on demand, so a latency
+regression can be traced on a live server without restarting it.
+
+A profiled request runs under a call-stack profiler (sys.setprofile) that
+records the wall-clock time of every Python and builtin call. The result
+is written as collapsed stacks, one ``frame;frame;frame microseconds`` line
+per distinct stack, which flamegraph.pl, speedscope or inferno render
+directly. Fan-out threads working for the request (weather.py) are
+profiled into the same file under a ``[thread name]`` root, so the
+current / forecast / UV fetches show up next to the request thread; their
+time overlaps the request thread's wait.
+
+A request is profiled when it carries ``X-Profile-Token: <PROFILE_TOKEN>``
+(the response then names the file in ``X-Profile``), or at random for a
+PROFILE_SAMPLE_RATE fraction of requests. Profiled requests run several
+times slower; other requests only pay for the trigger check. Profiles are
+kept in PROFILE_DIR, oldest deleted beyond PROFILE_MAX_FILES.
+
+Classes:
+    - StackProfiler: Collects collapsed wall-clock stacks from one or more threads
+
+Functions:
+    - profile_view(): Decorator profiling a Flask view when triggered
+    - follow(): Context manager adding a pool thread to the request's profile
+    - save_profile(): Write a profile to PROFILE_DIR and prune old ones
+
+Configuration (environment variables):
+    - PROFILE_TOKEN: Secret enabling the X-Profile-Token header (default
+      empty: header disabled)
+    - PROFILE_SAMPLE_RATE: Fraction of requests profiled at random
+      (default 0)
+    - PROFILE_DIR: Where profiles are written (default "data/profiles")
+    - PROFILE_MAX_FILES: Profiles kept (default 50)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import contextvars
+import functools
+import hmac
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "data", "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+TOKEN_HEADER = "X-Profile-Token"
+
+# Profiler of the request being handled; copied into pool threads with the
+# request's context (contextvars.copy_context() in weather.py)
+_active = contextvars.ContextVar("active_profiler", default=None)
+
+
+class StackProfiler:
+    """
+    Wall-clock call-stack profiler producing collapsed stacks.
+
+    Each thread is traced with its own stack; finished calls are merged into
+    ``stacks`` (path → self time in seconds) when the thread stops tracing.
+
+    Example:
+        >>> profiler = StackProfiler()
+        >>> result = profiler.run(index)
+        >>> print(profiler.collapsed())
+    """
+
+    def __init__(self):
+        self.stacks = defaultdict(float)
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+        self._labels = {}
+
+    def run(self, func, *args, **kwargs):
+        """
+        Call ``func`` while tracing the current thread (and, through
+        follow(), the pool threads it hands work to).
+
+        Returns:
+            The result of ``func(*args, **kwargs)``
+        """
+        previous = sys.getprofile()
+        stacks = defaultdict(float)
+        token = _active.set(self)
+        started = time.perf_counter()
+        sys.setprofile(self._tracer(stacks, ""))
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sys.setprofile(previous)
+            self.elapsed = time.perf_counter() - started
+            _active.reset(token)
+            self._merge(stacks)
+
+    def _merge(self, stacks):
+        with self._lock:
+            for path, seconds in stacks.items():
+                self.stacks[path] += seconds
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _tracer(self, stacks, root):
+        paths, starts, children = [root], [], []
+        clock = time.perf_counter
+        label_for = self._label
+
+        def tracer(frame, event, arg):
+            if event == "call" or event == "c_call":
+                if event == "call":
+                    label = label_for(frame.f_code)
+                else:
+                    module = getattr(arg, "__module__", None)
+                    name = getattr(arg, "__qualname__", "<builtin>")
+                    label = f"{module}.{name}" if module else name
+                parent = paths[-1]
+                paths.append(f"{parent};{label}" if parent else label)
+                children.append(0.0)
+                starts.append(clock())
+            elif starts:
+                # return / c_return / c_exception of a call made while tracing
+                elapsed = clock() - starts.pop()
+                stacks[paths.pop()] += elapsed - children.pop()
+                if children:
+                    children[-1] += elapsed
+
+        return tracer
+
+    def collapsed(self):
+        """
+        Return the profile as collapsed stacks.
+
+        Returns:
+            str: ``frame;frame;frame microseconds`` lines, heaviest first
+        """
+        with self._lock:
+            stacks = sorted(self.stacks.items(), key=lambda item: -item[1])
+        lines = [f"{path} {round(seconds * 1e6)}" for path, seconds in stacks if seconds >= 0.0000005]
+        return "\n".join(lines) + "\n"
+
+
+class _Follow:
+    __slots__ = ("profiler", "previous", "stacks")
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def __enter__(self):
+        self.previous = sys.getprofile()
+        self.stacks = defaultdict(float)
+        name = threading.current_thread().name
+        sys.setprofile(self.profiler._tracer(self.stacks, f"[{name}]"))
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.setprofile(self.previous)
+        self.profiler._merge(self.stacks)
+        return False
+
+
+class _NoFollow:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_FOLLOW = _NoFollow()
+
+
+def follow():
+    """
+    Profile the enclosed block into the current request's profile.
+
+    For work a request hands to a pool thread (run it in a copy of the
+    request's context); a no-op when the request is not profiled or the
+    thread is already traced.
+    """
+    profiler = _active.get()
+    if profiler is None or sys.getprofile() is not None:
+        return _NO_FOLLOW
+    return _Follow(profiler)
+
+
+def save_profile(profiler, name, directory=None, max_files=None):
+    """
+    Write a profile to ``directory`` and delete the oldest beyond ``max_files``.
+
+    Args:
+        profiler (StackProfiler): Finished profile
+        name (str): View name, used in the file name
+        directory (str, optional): Defaults to PROFILE_DIR
+        max_files (int, optional): Defaults to PROFILE_MAX_FILES
+
+    Returns:
+        str: File name, e.g. "20260111T120000.123-index-48ms-4242.collapsed"
+    """
+    directory = directory or PROFILE_DIR
+    max_files = PROFILE_MAX_FILES if max_files is None else max_files
+    os.makedirs(directory, exist_ok=True)
+
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S.%f")[:-3]
+    filename = f"{stamp}-{name}-{profiler.elapsed * 1000:.0f}ms-{os.getpid()}.collapsed"
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(profiler.collapsed())
+    os.replace(tmp_path, os.path.join(directory, filename))
+    _prune(directory, max_files)
+    return filename
+
+
+def _prune(directory, max_files):
+    """Delete the oldest profiles beyond ``max_files`` (other processes may race us)."""
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".collapsed"):
+            try:
+                profiles.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+    profiles.sort()
+    for _, path in profiles[:max(len(profiles) - max_files, 0)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def profile_view(view):
+    """
+    Decorator: profile a Flask view when the request asks for it.
+
+    A request is profiled if its X-Profile-Token header matches
+    PROFILE_TOKEN (the response then carries the file name in X-Profile),
+    or at random for a PROFILE_SAMPLE_RATE fraction of requests.
+    """
+    from flask import make_response, request
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = request.headers.get(TOKEN_HEADER) if PROFILE_TOKEN else None
+        requested = token is not None and hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+        if not requested and not (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE):
+            return view(*args, **kwargs)
+
+        profiler = StackProfiler()
+        response = make_response(profiler.run(view, *args, **kwargs))
+        try:
+            filename = save_profile(profiler, view.__name__)
+        except OSError as e:
+            print(f"❌ Error: Could not save profile: {e}")
+            return response
+        if requested:
+            response.headers["X-Profile"] = filename
+        return response
+
+    return wrapper
@@ -0,0 +1,345 @@
+"""
+Upstream Rate Limiting Module
+=============================
+This module keeps OpenWeatherMap traffic inside the account's per-minute
+quota. Every call made through http_client.WeatherHTTPClient takes a token
+from a shared token bucket first; when the bucket is empty the call waits
+in line (up to a deadline) instead of failing with HTTP 429.
+
+The bucket state lives in a small SQLite file, so all gunicorn workers on
+a host draw from the same quota. Calls carry a priority: interactive page
+loads may use every token, while background work (cache refreshes, batch
+runs, prefetching) leaves a reserve untouched and yields to any interactive
+call waiting in the same process.
+
+Classes:
+    - TokenBucket: Token bucket stored in memory or in a shared SQLite file
+    - RateLimiter: Priority-aware queueing in front of a TokenBucket
+    - RateLimitExceeded: Raised when a call cannot get a token in time
+
+Functions:
+    - priority(): Context manager setting the priority of upstream calls
+    - current_priority(): Priority of the calling context
+    - get_limiter(): Return the process-wide limiter (None if disabled)
+
+Configuration (environment variables):
+    - RATE_LIMIT_PER_MINUTE: Upstream calls allowed per minute (default 60,
+      0 disables limiting)
+    - RATE_LIMIT_BURST: Bucket capacity (default 20)
+    - RATE_LIMIT_PATH: Shared bucket file (default "data/ratelimit.sqlite3");
+      an empty string keeps the bucket in process memory
+    - RATE_LIMIT_BACKGROUND_RESERVE: Fraction of the bucket background
+      calls may not use (default 0.25; they can always use one token)
+    - RATE_LIMIT_MAX_WAIT: Seconds an interactive call may queue (default 5)
+    - RATE_LIMIT_MAX_WAIT_BACKGROUND: Seconds a background call may queue
+      (default 30)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import asyncio
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "20"))
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", os.path.join(BASE_DIR, "data", "ratelimit.sqlite3"))
+RATE_LIMIT_BACKGROUND_RESERVE = float(os.getenv("RATE_LIMIT_BACKGROUND_RESERVE", "0.25"))
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "5"))
+RATE_LIMIT_MAX_WAIT_BACKGROUND = float(os.getenv("RATE_LIMIT_MAX_WAIT_BACKGROUND", "30"))
+
+# Call priorities (lower value wins)
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority = contextvars.ContextVar("upstream_priority", default=INTERACTIVE)
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """No token became available before the call's queueing deadline."""
+
+
+def current_priority():
+    """Return the priority of upstream calls made from the current context."""
+    return _priority.get()
+
+
+@contextmanager
+def priority(level):
+    """
+    Run a block of code with the given upstream call priority.
+
+    Example:
+        >>> with priority(BACKGROUND):
+        ...     refresh_popular_cities()
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+# ============================================================================
+# TOKEN BUCKET
+# ============================================================================
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``rate`` tokens per second.
+
+    Args:
+        rate (float): Tokens added per second
+        capacity (float): Maximum tokens held (burst size)
+        path (str, optional): SQLite file shared between processes. When
+            omitted the bucket lives in this process only.
+    """
+
+    def __init__(self, rate, capacity, path=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.path = path
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated = time.time()
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY, tokens REAL, updated REAL)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _refill_and_take(self, tokens, updated, now, floor):
+        """Return (new_tokens, wait_seconds); wait_seconds is 0 when a token was taken."""
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens - 1 >= floor:
+            return tokens - 1, 0.0
+        return tokens, (1 + floor - tokens) / self.rate
+
+    def take(self, floor=0.0):
+        """
+        Try to take one token without dropping below ``floor`` tokens.
+
+        Args:
+            floor (float): Tokens that must remain afterwards (reserve)
+
+        Returns:
+            float: 0 if a token was taken, otherwise the estimated seconds
+                   until one will be available
+
+        Raises:
+            RateLimitExceeded: If the shared bucket file cannot be used
+        """
+        now = time.time()
+        if self.path is None:
+            with self._lock:
+                self._tokens, wait = self._refill_and_take(self._tokens, self._updated, now, floor)
+                self._updated = now
+            return wait
+
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM bucket WHERE id = 1").fetchone()
+                tokens, updated = row if row is not None else (self.capacity, now)
+                tokens, wait = self._refill_and_take(tokens, updated, now, floor)
+                conn.execute("INSERT OR REPLACE INTO bucket (id, tokens, updated) VALUES (1, ?, ?)",
+                             (tokens, now))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            # e.g. "database is locked" when other workers hold the file past
+            # the timeout; callers already handle a refused call
+            raise RateLimitExceeded(f"shared rate limit bucket unavailable: {e}") from e
+        return wait
+
+# ============================================================================
+# LIMITER
+# ============================================================================
+
+class RateLimiter:
+    """
+    Queue upstream calls for tokens, letting interactive calls go first.
+
+    Args:
+        bucket (TokenBucket): Shared token bucket
+        background_reserve (float): Fraction of bucket capacity that
+            background calls leave for interactive ones
+        max_wait (dict, optional): Queueing deadline in seconds per priority
+    """
+
+    def __init__(self, bucket, background_reserve=RATE_LIMIT_BACKGROUND_RESERVE, max_wait=None):
+        self.bucket = bucket
+        # Always leave background calls at least one token to take, or a
+        # small bucket would refuse them all
+        self.background_floor = max(0.0, min(bucket.capacity * background_reserve, bucket.capacity - 1))
+        self.max_wait = {INTERACTIVE: RATE_LIMIT_MAX_WAIT, BACKGROUND: RATE_LIMIT_MAX_WAIT_BACKGROUND}
+        self.max_wait.update(max_wait or {})
+        self._lock = threading.Lock()
+        self._interactive_waiting = 0
+        self.granted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.queued = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.rejected = {INTERACTIVE: 0, BACKGROUND: 0}
+
+    def acquire(self, level=None, max_wait=None):
+        """
+        Block until a token is available for a call of the given priority.
+
+        Args:
+            level (int, optional): INTERACTIVE or BACKGROUND. Defaults to
+                the priority of the calling context.
+            max_wait (float, optional): Seconds to queue before giving up
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If no token was granted before the deadline
+        """
+        level, max_wait, floor = self._resolve(level, max_wait)
+        start = time.monotonic()
+        waiting = False
+        try:
+            while True:
+                wait = self._poll(level, floor)
+                if wait == 0:
+                    return time.monotonic() - start
+                remaining = self._remaining(level, max_wait, start)
+                if not waiting:
+                    waiting = self._start_waiting(level)
+                time.sleep(min(wait, remaining, 0.25))
+        finally:
+            if waiting:
+                self._stop_waiting(level)
+
+    async def acquire_async(self, level=None, max_wait=None):
+        """
+        Asyncio counterpart of acquire(); waits without blocking the loop.
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If no token was granted before the deadline
+        """
+        level, max_wait, floor = self._resolve(level, max_wait)
+        start = time.monotonic()
+        waiting = False
+        try:
+            while True:
+                if self.bucket.path is None:
+                    wait = self._poll(level, floor)
+                else:
+                    # A shared bucket is a SQLite transaction that may wait
+                    # on other workers' locks; keep it off the event loop
+                    wait = await asyncio.to_thread(self._poll, level, floor)
+                if wait == 0:
+                    return time.monotonic() - start
+                remaining = self._remaining(level, max_wait, start)
+                if not waiting:
+                    waiting = self._start_waiting(level)
+                await asyncio.sleep(min(wait, remaining, 0.25))
+        finally:
+            if waiting:
+                self._stop_waiting(level)
+
+    def _resolve(self, level, max_wait):
+        """Fill in the default priority, deadline and token floor for a call."""
+        if level is None:
+            level = current_priority()
+        if max_wait is None:
+            max_wait = self.max_wait.get(level, RATE_LIMIT_MAX_WAIT)
+        floor = self.background_floor if level == BACKGROUND else 0.0
+        return level, max_wait, floor
+
+    def _poll(self, level, floor):
+        """Try once to take a token; return 0 on success or seconds to wait."""
+        if level == BACKGROUND and self._interactive_waiting:
+            return 0.05
+        wait = self.bucket.take(floor)
+        if wait == 0:
+            with self._lock:
+                self.granted[level] += 1
+        return wait
+
+    def _remaining(self, level, max_wait, start):
+        """Return the time left before the deadline, raising once it has passed."""
+        remaining = max_wait - (time.monotonic() - start)
+        if remaining <= 0:
+            with self._lock:
+                self.rejected[level] += 1
+            raise RateLimitExceeded(f"upstream quota exhausted; waited {max_wait:.1f}s for a token")
+        return remaining
+
+    def _start_waiting(self, level):
+        with self._lock:
+            self.queued[level] += 1
+            if level == INTERACTIVE:
+                self._interactive_waiting += 1
+        return True
+
+    def _stop_waiting(self, level):
+        if level == INTERACTIVE:
+            with self._lock:
+                self._interactive_waiting -= 1
+
+    def stats(self):
+        """
+        Return limiter counters per priority.
+
+        Returns:
+            dict: granted, queued and rejected counts keyed by
+                  "interactive" / "background"
+        """
+        names = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+        with self._lock:
+            return {
+                name: {
+                    "granted": self.granted[level],
+                    "queued": self.queued[level],
+                    "rejected": self.rejected[level],
+                }
+                for level, name in names.items()
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """
+    Return the process-wide RateLimiter, creating it on first use.
+
+    Returns:
+        RateLimiter: Shared limiter, or None if RATE_LIMIT_PER_MINUTE is 0
+    """
+    global _limiter
+    if RATE_LIMIT_PER_MINUTE <= 0:
+        return None
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                bucket = TokenBucket(RATE_LIMIT_PER_MINUTE / 60.0, RATE_LIMIT_BURST,
+                                     path=RATE_LIMIT_PATH or None)
+                _limiter = RateLimiter(bucket)
+    return _limiter
@@ -0,0 +1,178 @@
+"""
+Upstream Resilience Module
+==========================
+This module holds the retry and circuit-breaker policies used by
+http_client.WeatherHTTPClient for every OpenWeatherMap call.
+
+Idempotent GETs that fail with a connection error, a timeout, HTTP 429 or
+a 5xx status are retried with jittered exponential backoff. Each endpoint
+also has its own circuit breaker: after repeated failures it "opens" and
+calls fail immediately with CircuitOpenError (letting the response cache
+serve what it has) instead of tying up workers on a sick upstream. After
+a cool-down a single trial call is let through to test recovery.
+
+Classes:
+    - RetryPolicy: Retry count and jittered exponential backoff
+    - CircuitBreaker: Per-endpoint closed / open / half-open breaker
+    - CircuitOpenError: Raised when a call is rejected by an open breaker
+
+Configuration (environment variables):
+    - HTTP_RETRIES: Retries after the first attempt (default 2)
+    - HTTP_BACKOFF_BASE: First backoff ceiling in seconds (default 0.25)
+    - HTTP_BACKOFF_MAX: Largest backoff in seconds (default 4)
+    - BREAKER_FAILURE_THRESHOLD: Consecutive failures that open a breaker
+      (default 5)
+    - BREAKER_RESET_TIMEOUT: Seconds a breaker stays open before a trial
+      call (default 30)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import os
+import random
+import threading
+import time
+
+import requests
+
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.25"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "4"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+# HTTP statuses worth retrying: rate limited or upstream trouble
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """The endpoint's circuit breaker is open; the call was not sent."""
+
+
+class RetryPolicy:
+    """
+    Decide whether and how long to wait before retrying a call.
+
+    Args:
+        retries (int): Retries after the first attempt
+        backoff_base (float): Backoff ceiling for the first retry
+        backoff_max (float): Largest backoff ceiling
+    """
+
+    def __init__(self, retries=HTTP_RETRIES, backoff_base=HTTP_BACKOFF_BASE,
+                 backoff_max=HTTP_BACKOFF_MAX):
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def is_retryable(self, response=None, error=None):
+        """Return True if a failed attempt is transient and worth retrying."""
+        if error is not None:
+            return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        return response is not None and self.is_retryable_status(response.status_code)
+
+    def is_retryable_status(self, status):
+        """Return True if an HTTP status is transient (429 or a 5xx gateway error)."""
+        return status in RETRYABLE_STATUSES
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Seconds to sleep before retry number ``attempt`` (0-based).
+
+        Uses "full jitter": a random delay up to an exponentially growing
+        ceiling, honouring a Retry-After header value up to ``backoff_max``.
+
+        Args:
+            attempt (int): Retry number, starting at 0
+            retry_after (str, optional): Retry-After header of the failed response
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.backoff_max))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker guarding one upstream endpoint.
+
+    Args:
+        name (str): Endpoint name used in monitoring output
+        failure_threshold (int): Consecutive failures that open the breaker
+        reset_timeout (float): Seconds to stay open before a trial call
+    """
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the breaker is open (or a trial call is
+                already testing a half-open breaker)
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f"circuit for {self.name} is open; failing fast")
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+        Give up a call cleared by before_call() without recording a result,
+        e.g. one refused by the rate limiter before anything was sent. A
+        half-open breaker lets the next call through as its trial.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self):
+        """
+        Return the breaker state for monitoring.
+
+        Returns:
+            dict: state, failures, rejected, open_for (seconds, or None)
+        """
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "open_for": (time.monotonic() - self.opened_at) if self.opened_at is not None else None,
+            }
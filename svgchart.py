@@ -0,0 +1,146 @@
+"""
+SVG Chart Module
+================
+This module draws the hourly temperature chart as a small SVG document
+with plain string formatting. It reproduces the matplotlib chart in app.py
+(line with point markers, a temperature label above each point, dashed
+grid, HH:MM axis in the location's time) in a fraction of the time and
+without loading matplotlib into every worker.
+
+Functions:
+    - render_svg(): Return the chart as an SVG string
+    - write_svg(): Write the chart to a file (plot cache renderer)
+    - nice_ticks(): Evenly spaced, round axis tick values
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import math
+import time
+from xml.sax.saxutils import escape
+
+# Layout in SVG user units (the image scales with the page)
+WIDTH = 1000
+HEIGHT = 500
+MARGIN_LEFT = 80
+MARGIN_RIGHT = 30
+MARGIN_TOP = 60
+MARGIN_BOTTOM = 80
+
+LINE_COLOR = "#00a8a8"
+TEXT_COLOR = "black"
+GRID_COLOR = "gray"
+
+
+def nice_ticks(low, high, target=6):
+    """
+    Return round tick values covering ``low``..``high``.
+
+    Example:
+        >>> nice_ticks(2.5, 9.7)
+        [2.0, 4.0, 6.0, 8.0, 10.0]
+    """
+    if high <= low:
+        low, high = low - 1, high + 1
+    raw_step = (high - low) / max(target - 1, 1)
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw_step)
+    first = math.floor(low / step) * step
+    last = math.ceil(high / step) * step
+    count = int(round((last - first) / step))
+    return [round(first + i * step, 10) for i in range(count + 1)]
+
+
+def _fmt(value):
+    """Format a coordinate compactly."""
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def _tick_label(value):
+    return f"{value:g}"
+
+
+def render_svg(hourly_data, timezone_offset):
+    """
+    Draw the hourly temperature chart.
+
+    Args:
+        hourly_data (list): Hourly forecast dicts with "time" and "temp"
+        timezone_offset (int): UTC offset in seconds for the axis labels
+
+    Returns:
+        str: A standalone SVG document
+    """
+    times = [hour["time"] for hour in hourly_data]
+    temps = [float(hour["temp"]) for hour in hourly_data]
+    y_ticks = nice_ticks(min(temps), max(temps))
+    y_low, y_high = y_ticks[0], y_ticks[-1]
+    t_low, t_high = min(times), max(times)
+
+    plot_left, plot_right = MARGIN_LEFT, WIDTH - MARGIN_RIGHT
+    plot_top, plot_bottom = MARGIN_TOP, HEIGHT - MARGIN_BOTTOM
+    x_pad = (plot_right - plot_left) * 0.04
+
+    def x_at(t):
+        if t_high == t_low:
+            return (plot_left + plot_right) / 2
+        return plot_left + x_pad + (t - t_low) / (t_high - t_low) * (plot_right - plot_left - 2 * x_pad)
+
+    def y_at(value):
+        return plot_bottom - (value - y_low) / (y_high - y_low) * (plot_bottom - plot_top)
+
+    points = [(x_at(t), y_at(v)) for t, v in zip(times, temps)]
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {WIDTH} {HEIGHT}" '
+        f'width="{WIDTH}" height="{HEIGHT}" font-family="DejaVu Sans, Arial, sans-serif">',
+        f'<text x="{WIDTH / 2:g}" y="32" text-anchor="middle" font-size="22" fill="{TEXT_COLOR}">'
+        'Hourly Temperature Forecast (°C)</text>',
+    ]
+
+    # Grid and axis labels
+    grid = f'stroke="{GRID_COLOR}" stroke-width="0.7" stroke-dasharray="5,4"'
+    for value in y_ticks:
+        y = _fmt(y_at(value))
+        parts.append(f'<line x1="{plot_left}" y1="{y}" x2="{plot_right}" y2="{y}" {grid}/>')
+        parts.append(f'<text x="{plot_left - 8}" y="{y}" text-anchor="end" dominant-baseline="middle" '
+                     f'font-size="13" fill="{TEXT_COLOR}">{_tick_label(value)}</text>')
+    for t, (x, _) in zip(times, points):
+        x = _fmt(x)
+        label = time.strftime("%H:%M", time.gmtime(t + timezone_offset))
+        parts.append(f'<line x1="{x}" y1="{plot_top}" x2="{x}" y2="{plot_bottom}" {grid}/>')
+        parts.append(f'<text x="{x}" y="{plot_bottom + 22}" text-anchor="end" font-size="13" '
+                     f'fill="{TEXT_COLOR}" transform="rotate(-30 {x} {plot_bottom + 22})">{label}</text>')
+    parts.append(f'<rect x="{plot_left}" y="{plot_top}" width="{plot_right - plot_left}" '
+                 f'height="{plot_bottom - plot_top}" fill="none" stroke="{TEXT_COLOR}"/>')
+    parts.append(f'<text x="{(plot_left + plot_right) / 2:g}" y="{HEIGHT - 12}" text-anchor="middle" '
+                 f'font-size="16" fill="{TEXT_COLOR}">Time (24-hour format)</text>')
+    parts.append(f'<text x="22" y="{(plot_top + plot_bottom) / 2:g}" text-anchor="middle" font-size="16" '
+                 f'fill="{TEXT_COLOR}" transform="rotate(-90 22 {(plot_top + plot_bottom) / 2:g})">'
+                 'Temperature (°C)</text>')
+
+    # Series, markers and value labels
+    path = " ".join(f"{_fmt(x)},{_fmt(y)}" for x, y in points)
+    parts.append(f'<polyline points="{path}" fill="none" stroke="{LINE_COLOR}" stroke-width="2"/>')
+    for (x, y), value in zip(points, temps):
+        parts.append(f'<circle cx="{_fmt(x)}" cy="{_fmt(y)}" r="5" fill="{LINE_COLOR}"/>')
+        parts.append(f'<text x="{_fmt(x)}" y="{_fmt(y - 12)}" text-anchor="middle" font-size="12" '
+                     f'fill="{TEXT_COLOR}">{escape(f"{value:.1f}°C")}</text>')
+
+    # Legend
+    lx, ly = plot_right - 190, plot_top + 12
+    parts.append(f'<rect x="{lx}" y="{ly}" width="180" height="30" rx="4" fill="white" '
+                 f'fill-opacity="0.8" stroke="{GRID_COLOR}"/>')
+    parts.append(f'<line x1="{lx + 10}" y1="{ly + 15}" x2="{lx + 40}" y2="{ly + 15}" '
+                 f'stroke="{LINE_COLOR}" stroke-width="2"/>')
+    parts.append(f'<circle cx="{lx + 25}" cy="{ly + 15}" r="4" fill="{LINE_COLOR}"/>')
+    parts.append(f'<text x="{lx + 48}" y="{ly + 15}" dominant-baseline="middle" font-size="13" '
+                 f'fill="{TEXT_COLOR}">Temperature (°C)</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def write_svg(hourly_data, timezone_offset, path):
+    """Write the chart to ``path`` (matches the PlotCache renderer signature)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_svg(hourly_data, timezone_offset))
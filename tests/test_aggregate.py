@@ -0,0 +1,82 @@
+"""
+Daily Aggregation Tests
+=======================
+Checks that the vectorized daily rollup in aggregate.py produces exactly
+the output of the original Python loop, for one forecast and for many
+forecasts aggregated together, and that NumPy is only imported on use.
+"""
+
+import os
+import random
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregate import daily_forecast, daily_forecast_python, daily_forecasts
+from tools.mock_owm_server import load_fixtures
+from weather import parse_forecast, parse_forecasts
+
+
+def _random_entries(rng):
+    start = 1768132800 + rng.randint(0, 86400)
+    entries = []
+    for i in range(rng.randint(1, 40)):
+        entry = {
+            "dt": start + i * 10800 + rng.choice([0, 0, 1800]),
+            "main": {"temp": rng.choice([rng.uniform(-20, 40), rng.randint(-5, 30), None]),
+                     "humidity": rng.randint(0, 100)},
+            "pop": rng.random(),
+            "wind": {"speed": rng.uniform(0, 20)},
+            "weather": [{"icon": "01d", "description": f"entry {i}"}],
+        }
+        if rng.random() < 0.1:
+            del entry["wind"]
+        entries.append(entry)
+    return entries
+
+
+def test_matches_python_loop_on_fixture():
+    forecast = load_fixtures()["forecast"]
+    entries, offset = forecast["list"], forecast["city"]["timezone"]
+    assert daily_forecast(entries, offset) == daily_forecast_python(entries, offset)
+
+
+def test_matches_python_loop_on_random_forecasts():
+    rng = random.Random(1234)
+    forecasts = [(_random_entries(rng), rng.choice([-36000, 0, 3600, 19800, 45900]))
+                 for _ in range(100)]
+    expected = [daily_forecast_python(entries, offset) for entries, offset in forecasts]
+    assert daily_forecasts(forecasts) == expected
+    assert daily_forecasts([([], 0)] + forecasts[:1]) == [[]] + expected[:1]
+
+
+def _typed(days):
+    return [{key: (type(value), value) for key, value in day.items()} for day in days]
+
+
+def test_integer_temperatures_keep_their_type():
+    entries = [{"dt": 1768132800 + i * 10800, "main": {"temp": temp, "humidity": 50},
+                "weather": [{"icon": "01d"}]}
+               for i, temp in enumerate([3, 7, 7.0, 2.5, 4, 9, -1, None, 6.0, 6])]
+    assert _typed(daily_forecast(entries, 0)) == _typed(daily_forecast_python(entries, 0))
+
+    rng = random.Random(99)
+    for _ in range(50):
+        entries = _random_entries(rng)
+        assert _typed(daily_forecast(entries, 3600)) == _typed(daily_forecast_python(entries, 3600))
+
+
+def test_parse_many_forecasts_at_once():
+    forecast = load_fixtures()["forecast"]
+    shifted = dict(forecast, city=dict(forecast["city"], timezone=-18000))
+    assert parse_forecasts([forecast, shifted]) == [parse_forecast(forecast), parse_forecast(shifted)]
+
+
+def test_numpy_is_imported_on_first_rollup():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = ("import sys, app, aggregate; loaded = 'numpy' in sys.modules; "
+              "aggregate.daily_forecast([], 0); print(loaded, 'numpy' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True,
+                            check=True, env=dict(os.environ, API_KEY="test"))
+    assert result.stdout.split()[-2:] == ["False", "True"]
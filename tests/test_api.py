@@ -0,0 +1,83 @@
+"""
+JSON API Tests
+==============
+Checks GET /api/weather: JSON body, strong ETag, Cache-Control aligned with
+the response cache TTL, and 304 responses to If-None-Match.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from cache import ResponseCache
+from weather import WeatherData
+
+
+def make_weather(temperature=7, last_updated=None):
+    return WeatherData(
+        name="London", main="Clouds", description="overcast clouds", icon="04d",
+        temperature=temperature, feels_like=4, humidity=83, pressure=1021, wind_speed=4,
+        visibility=10000, uv_index=0.77, hourly_forecast=[{"time": 1768132800, "temp": 7.96}],
+        daily_forecast=[], alerts=[], timezone="GB", timezone_offset=0,
+        last_updated=int(time.time()) if last_updated is None else last_updated,
+    )
+
+
+def client_for(monkeypatch, weather, cache=None):
+    calls = []
+
+    def fake_main(city, state="", country=""):
+        calls.append((city, state, country))
+        return weather
+
+    monkeypatch.setattr(app_module, "get_weather_data", fake_main)
+    monkeypatch.setattr(app_module, "get_response_cache", lambda: cache)
+    return app_module.app.test_client(), calls
+
+
+def test_returns_json_with_etag_and_max_age(monkeypatch):
+    cache = ResponseCache(ttls={"current": 600}, max_stale=3600)
+    client, calls = client_for(monkeypatch, make_weather(last_updated=int(time.time()) - 100), cache)
+    response = client.get("/api/weather?city=London&country=GB")
+
+    assert response.status_code == 200
+    assert response.get_json()["name"] == "London"
+    assert calls == [("London", "", "GB")]
+    etag, weak = response.get_etag()
+    assert etag and not weak
+    assert 495 <= response.cache_control.max_age <= 500
+    assert response.cache_control.public
+    assert response.cache_control.stale_while_revalidate == 3600
+
+
+def test_if_none_match_returns_304(monkeypatch):
+    client, _ = client_for(monkeypatch, make_weather(last_updated=1792296281), ResponseCache())
+    first = client.get("/api/weather?city=London")
+    etag = first.headers["ETag"]
+
+    again = client.get("/api/weather?city=London", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == etag
+
+
+def test_changed_data_changes_etag(monkeypatch):
+    client, _ = client_for(monkeypatch, make_weather(temperature=7, last_updated=1))
+    old = client.get("/api/weather?city=London").headers["ETag"]
+
+    client, _ = client_for(monkeypatch, make_weather(temperature=8, last_updated=2))
+    response = client.get("/api/weather?city=London", headers={"If-None-Match": old})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != old
+    assert response.cache_control.no_cache  # response cache disabled
+
+
+def test_errors(monkeypatch):
+    client, _ = client_for(monkeypatch, None)
+    assert client.get("/api/weather").status_code == 400
+    missing = client.get("/api/weather?city=Atlantis")
+    assert missing.status_code == 404
+    assert "error" in missing.get_json()
@@ -0,0 +1,214 @@
+"""
+Async Client Tests
+==================
+Offline checks for async_weather.py against a small local stand-in for the
+OpenWeatherMap endpoints.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import aiohttp
+import pytest
+import yarl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import async_weather
+import cache
+import geocache
+from async_weather import AsyncWeatherHTTPClient
+from ratelimit import INTERACTIVE, RateLimiter, RateLimitExceeded, TokenBucket
+from resilience import RetryPolicy
+
+PAYLOADS = {
+    "/geo/1.0/direct": [{"name": "London", "lat": 51.5073, "lon": -0.1277}],
+    "/data/2.5/weather": {
+        "name": "London", "weather": [{"main": "Clouds", "description": "overcast clouds", "icon": "04d"}],
+        "main": {"temp": 12.3, "feels_like": 11.1, "humidity": 81, "pressure": 1012},
+        "wind": {"speed": 4.6}, "visibility": 10000, "timezone": 0,
+        "sys": {"country": "GB", "sunrise": 1768118400, "sunset": 1768147200},
+    },
+    "/data/2.5/forecast": {
+        "city": {"timezone": 0},
+        "list": [
+            {"dt": 1768132800 + i * 10800, "pop": 0.1,
+             "main": {"temp": 10 + i, "humidity": 70}, "wind": {"speed": 3},
+             "weather": [{"icon": "04d", "description": "overcast clouds"}]}
+            for i in range(16)
+        ],
+    },
+    "/data/2.5/uvi": {"value": 1.4},
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps(PAYLOADS[urlsplit(self.path).path]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_async_main_matches_sync_parsing(tmp_path, monkeypatch):
+    monkeypatch.setattr(async_weather, "get_geocache",
+                        lambda: geocache.GeocodeCache(path=str(tmp_path / "geo.sqlite3"), city_list=None))
+    monkeypatch.setattr(async_weather, "get_response_cache", lambda: cache.ResponseCache())
+    server = _start_server()
+
+    async def run():
+        async with AsyncWeatherHTTPClient(base_url=f"http://127.0.0.1:{server.server_port}") as client:
+            result = await async_weather.main("London", "", "GB", client=client)
+            return result, client.requests
+
+    try:
+        result, requests_sent = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    hourly, daily = async_weather.parse_forecast(PAYLOADS["/data/2.5/forecast"])
+    assert requests_sent == 4
+    assert result.name == "London" and result.temperature == 12
+    assert result.hourly_forecast == hourly and result.daily_forecast == daily
+    assert result.uv_index == 1.4
+
+
+def test_async_batch_isolates_failures(monkeypatch):
+    async def fake_main(city_name, state_name="", country_code="", deadline=None, client=None):
+        if city_name == "Broken":
+            raise RuntimeError("boom")
+        return None if city_name == "Atlantis" else city_name
+
+    monkeypatch.setattr(async_weather, "main", fake_main)
+    results = asyncio.run(async_weather.main_batch([("London",), ("Atlantis",), ("Broken",)], max_concurrency=2))
+
+    assert [r.weather for r in results] == ["London", None, None]
+    assert results[1].error == "Could not fetch weather data"
+    assert "boom" in results[2].error
+
+
+def test_connection_errors_are_retried_then_reported(monkeypatch):
+    monkeypatch.setattr(async_weather, "get_response_cache", lambda: None)
+
+    async def run():
+        client = AsyncWeatherHTTPClient(base_url="http://127.0.0.1:9",
+                                        retry_policy=RetryPolicy(retries=1, backoff_base=0.01))
+        try:
+            return await async_weather.get_uv_index(1.0, 2.0, "key", client), client.requests
+        finally:
+            await client.close()
+
+    assert asyncio.run(run()) == (None, 2)
+
+
+def test_cancelled_half_open_trial_frees_the_breaker():
+    async def run():
+        bucket = TokenBucket(rate=0.001, capacity=1)
+        bucket.take()
+        limiter = RateLimiter(bucket, max_wait={INTERACTIVE: 30})
+        client = AsyncWeatherHTTPClient(base_url="http://127.0.0.1:9", limiter=limiter)
+        breaker = client.breaker_for(f"{client.base_url}/data/2.5/uvi")
+        breaker.failure_threshold = 1
+        breaker.reset_timeout = 0
+        breaker.record_failure()
+
+        # The trial call queues for quota and is cancelled there
+        trial = asyncio.ensure_future(client.get_json("/data/2.5/uvi"))
+        await asyncio.sleep(0.05)
+        assert breaker.state == "half_open"
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # The next call becomes the trial; refused by the limiter, it frees the slot too
+        limiter.max_wait[INTERACTIVE] = 0
+        with pytest.raises(RateLimitExceeded):
+            await client.get_json("/data/2.5/uvi")
+        breaker.before_call()
+        assert breaker.snapshot()["failures"] == 1
+        await client.close()
+
+    asyncio.run(run())
+
+
+class _FailingSession:
+    """Stands in for aiohttp.ClientSession, raising ``error`` on every request."""
+
+    closed = False
+
+    def __init__(self, error):
+        self.error = error
+
+    def get(self, url, params=None):
+        raise self.error
+
+    async def close(self):
+        self.closed = True
+
+
+def test_only_transient_errors_are_retried():
+    async def attempts(error):
+        client = AsyncWeatherHTTPClient(retry_policy=RetryPolicy(retries=2, backoff_base=0.01))
+        client._session = _FailingSession(error)
+        with pytest.raises(type(error)):
+            await client.get_json("/data/2.5/uvi")
+        return client.requests
+
+    request_info = aiohttp.RequestInfo(yarl.URL("http://127.0.0.1/"), "GET", {}, yarl.URL("http://127.0.0.1/"))
+    assert asyncio.run(attempts(aiohttp.ServerDisconnectedError())) == 3
+    assert asyncio.run(attempts(aiohttp.ClientResponseError(request_info, (), status=400))) == 1
+
+
+def test_main_closes_its_client_and_keeps_caches_off_the_loop(tmp_path, monkeypatch):
+    server = _start_server()
+    geo = geocache.GeocodeCache(path=str(tmp_path / "geo.sqlite3"), city_list=None)
+    responses = cache.ResponseCache()
+    cache_threads, clients = [], []
+
+    def recording(func):
+        def call(*args):
+            cache_threads.append(threading.get_ident())
+            return func(*args)
+        return call
+
+    monkeypatch.setattr(geo, "get", recording(geo.get))
+    monkeypatch.setattr(responses, "lookup", recording(responses.lookup))
+    monkeypatch.setattr(async_weather, "get_geocache", lambda: geo)
+    monkeypatch.setattr(async_weather, "get_response_cache", lambda: responses)
+
+    class _Client(AsyncWeatherHTTPClient):
+        def __init__(self, **kwargs):
+            super().__init__(base_url=f"http://127.0.0.1:{server.server_port}", **kwargs)
+            clients.append(self)
+
+    monkeypatch.setattr(async_weather, "AsyncWeatherHTTPClient", _Client)
+
+    async def run():
+        return await async_weather.main("London", "", "GB"), threading.get_ident()
+
+    try:
+        result, loop_thread = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert result.name == "London"
+    assert len(clients) == 1 and clients[0]._session.closed
+    assert len(cache_threads) == 4 and loop_thread not in cache_threads
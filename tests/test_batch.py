@@ -0,0 +1,54 @@
+"""
+Batch Refresh Tests
+===================
+Offline checks for weather.main_batch() and the batch.py command line, with
+weather.main() replaced by a stub.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch
+import weather
+
+
+def _fake_main(city_name, state_name="", country_code="", concurrent=None, deadline=None):
+    if city_name == "Atlantis":
+        return None
+    if city_name == "Broken":
+        raise RuntimeError("upstream exploded")
+    return weather.WeatherData(
+        name=city_name, main="Clear", description="clear sky", icon="01d",
+        temperature=20, feels_like=19, humidity=40, pressure=1015, wind_speed=3,
+        visibility=10000, uv_index=5, hourly_forecast=[], daily_forecast=[], alerts=[],
+    )
+
+
+def test_main_batch_isolates_failures(monkeypatch):
+    monkeypatch.setattr(weather, "main", _fake_main)
+
+    results = weather.main_batch([("London", "", "GB"), ("Atlantis",), ("Broken", "", "")], max_workers=2)
+
+    assert [r.location for r in results] == [("London", "", "GB"), ("Atlantis", "", ""), ("Broken", "", "")]
+    assert results[0].weather.name == "London" and results[0].error is None
+    assert results[1].weather is None and results[1].error == "Could not fetch weather data"
+    assert results[2].weather is None and "upstream exploded" in results[2].error
+
+
+def test_cli_writes_json_lines(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(weather, "main", _fake_main)
+    locations = tmp_path / "locations.txt"
+    locations.write_text("# watchlist\nLondon,,GB\n\nAtlantis\n")
+    output = tmp_path / "results.jsonl"
+
+    exit_code = batch.run([str(locations), "-o", str(output), "-w", "2"])
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert exit_code == 1
+    assert lines[0]["location"] == {"city": "London", "state": "", "country": "GB"}
+    assert lines[0]["weather"]["temperature"] == 20
+    assert lines[1]["weather"] is None
+    assert "cities/second" in capsys.readouterr().err
@@ -0,0 +1,54 @@
+"""
+Benchmark Suite Tests
+=====================
+Checks that tools/bench.py covers every Jinja filter and the hot paths,
+renders real dashboard pages from the fixtures without touching the
+network, and flags regressions against a baseline.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+import weather
+from tools import bench
+
+
+def test_suite_covers_every_filter_and_hot_path():
+    report = bench.run_suite(rounds=1, min_time=0)
+    names = set(report["results"])
+
+    app_filters = {name for name, func in app_module.app.jinja_env.filters.items()
+                   if getattr(func, "__module__", None) == "app"}
+    assert app_filters and {f"filter.{name}" for name in app_filters} <= names
+    assert {"forecast.get_forecast_data", "weather_data.asdict", "plot.generate_plot",
+            "page.index", "page.index_uncached"} <= names
+    assert report["schema"] == bench.SCHEMA_VERSION
+    assert all(result["min_us"] > 0 for result in report["results"].values())
+    json.dumps(report)
+
+
+def test_pages_render_from_fixtures(tmp_path):
+    get_client = weather.get_client
+    with bench.offline_app(str(tmp_path)) as app_module_patched:
+        benchmarks = bench.build_benchmarks(app_module_patched, str(tmp_path))
+        pages = [benchmarks[name]() for name in ("page.index", "page.index_uncached")]
+        forecast = benchmarks["forecast.get_forecast_data"]()
+
+    for page in pages:
+        body = page.get_data(as_text=True)
+        assert page.status_code == 200 and "London" in body and "Could not fetch" not in body
+    assert len(forecast[0]) == 8 and forecast[2] == 0.77
+    assert weather.get_client is get_client
+
+
+def test_compare_flags_slowdowns():
+    def report(**times):
+        return {"results": {name: {"min_us": value, "median_us": value} for name, value in times.items()}}
+
+    rows = bench.compare(report(parse=120.0, render=90.0, new=5.0), report(parse=100.0, render=100.0))
+    changes = {name: round(change, 3) for name, _, _, change in rows}
+    assert changes == {"parse": 0.2, "render": -0.1}
@@ -0,0 +1,77 @@
+"""
+Response Cache Backend Tests
+============================
+Offline checks for the shared SQLite response cache backend in
+cachestore.py: entries written by one worker are served to another, values
+survive serialization, expired entries are swept, and only one worker
+claims a stale entry's refresh.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import FRESH, ResponseCache
+from cachestore import SQLiteBackend, decode_value, encode_value
+from tools.bench_render import load_weather
+
+
+def _cache(path, **kwargs):
+    return ResponseCache(ttls={"current": 60, "uv": 60}, max_stale=60,
+                         backend=SQLiteBackend(str(path), max_entries=100), **kwargs)
+
+
+def test_weather_data_round_trips_compactly():
+    weather_data = load_weather()
+    blob = encode_value(weather_data)
+    assert decode_value(blob) == weather_data
+    assert blob[:1] == b"z"
+    assert decode_value(encode_value(3.5)) == 3.5
+
+
+def test_entries_are_shared_between_workers(tmp_path):
+    path = tmp_path / "weather_cache.sqlite3"
+    first, second = _cache(path), _cache(path)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"temp": 12}
+
+    assert first.get_or_fetch("current", 51.5073, -0.1277, fetch) == {"temp": 12}
+    value, state = second.lookup("current", 51.5071, -0.1281)
+    assert (value, state) == ({"temp": 12}, FRESH)
+    assert second.get_or_fetch("current", 51.5073, -0.1277, fetch) == {"temp": 12}
+    assert len(calls) == 1
+    assert second.expires_in("current", 51.5073, -0.1277) > 55
+    assert second.stats()["entries"] == 1
+
+
+def test_sweep_removes_expired_and_excess_entries(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "weather_cache.sqlite3"), max_entries=2)
+    now = time.time()
+    backend.set(("current", 1.0, 1.0), "expired", now - 200, now - 80)
+    for i in range(3):
+        backend.set(("uv", 2.0, float(i)), i, now - 10 + i, now + 100)
+
+    assert backend.sweep() == 2
+    assert backend.get(("current", 1.0, 1.0)) is None
+    assert backend.get(("uv", 2.0, 0.0)) is None
+    assert [value for _, value, _ in backend.entries()] == [1, 2]
+
+
+def test_refresh_is_claimed_by_one_worker(tmp_path):
+    path = str(tmp_path / "weather_cache.sqlite3")
+    first, second = SQLiteBackend(path, 100), SQLiteBackend(path, 100)
+    key = ("current", 1.0, 2.0)
+    now = time.time()
+    first.set(key, "stale", now - 90, now + 30)
+
+    assert first.claim_refresh(key, 30)
+    assert not second.claim_refresh(key, 30)
+    # Storing the refreshed value releases the lease
+    second.set(key, "fresh", now, now + 120)
+    assert second.claim_refresh(key, 30)
+    assert not first.claim_refresh(("current", 9.0, 9.0), 30)
@@ -0,0 +1,58 @@
+"""
+Columnar Forecast Tests
+=======================
+Checks that forecasts stored as ForecastSeries columns read exactly like
+the lists of dicts they replace: by index, when iterated, through
+dataclasses.asdict() and JSON, and after pickling.
+"""
+
+import copy
+import json
+import os
+import pickle
+import sys
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecast import ForecastSeries, daily_series, hourly_series
+from tools.bench_render import load_weather
+
+
+def test_series_reads_like_a_list_of_dicts():
+    rows = [
+        {"time": 1768132800, "temp": 7.96, "icon": "01d", "description": "clear sky",
+         "precipitation": 0.0, "humidity": 70, "time_label": "12:00"},
+        {"time": 1768143600, "temp": None, "icon": "04d", "description": "overcast clouds",
+         "precipitation": 70.0, "humidity": 75, "time_label": "15:00"},
+    ]
+    series = hourly_series(rows)
+    assert isinstance(series, ForecastSeries)
+    assert len(series) == 2 and series
+    assert series[0] == rows[0] and series[-1] == rows[1]
+    assert list(series) == rows and series == rows
+    assert series[1:] == rows[1:]
+    assert series.column("temp") == [7.96, None]
+    assert pickle.loads(pickle.dumps(series)) == rows
+
+
+def test_values_that_do_not_fit_keep_the_dicts():
+    rows = [{"time": None, "temp_max": 3.0}]
+    assert daily_series(rows) == rows
+    assert isinstance(daily_series(rows), list)
+
+
+def test_weather_data_is_compact_but_serializes_as_before():
+    weather_data = load_weather()
+    assert not hasattr(weather_data, "__dict__")
+    assert isinstance(weather_data.hourly_forecast, ForecastSeries)
+
+    data = asdict(weather_data)
+    assert isinstance(data["hourly_forecast"], list)
+    assert data["daily_forecast"][0]["date_label"] == "Sun, Jan 11"
+    assert json.loads(json.dumps(data))["hourly_forecast"][0]["time_label"] == "12:00"
+
+    copied = copy.copy(weather_data)
+    copied.uv_index = 9
+    assert weather_data.uv_index != 9
+    assert pickle.loads(pickle.dumps(weather_data)) == weather_data
@@ -0,0 +1,73 @@
+"""
+Streaming Forecast Parser Tests
+===============================
+Checks that forecaststream.py parses a forecast body fed in chunks of any
+size to exactly what parse_forecast() returns for the decoded body, that
+broken bodies are rejected, and that weather.get_forecast() streams the
+mock server's response.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import weather
+from forecaststream import parse_forecast_stream, slim_entry
+from http_client import WeatherHTTPClient
+from tools.mock_owm_server import load_fixtures, start_mock_server
+
+
+def _chunks(body, size):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def test_matches_parse_forecast_for_any_chunking():
+    forecast = load_fixtures()["forecast"]
+    expected = weather.parse_forecast(forecast)
+    body = json.dumps(forecast).encode()
+
+    assert parse_forecast_stream(_chunks(body, 8192)) == expected
+    # Chunk boundaries inside numbers, strings and multi-byte characters
+    assert parse_forecast_stream(_chunks(json.dumps(forecast, ensure_ascii=False).encode(), 7)) == expected
+    assert parse_forecast_stream([json.dumps(forecast, indent=2)]) == expected
+
+
+@pytest.mark.parametrize("body", [
+    b"",
+    b'{"list": [{"dt": 1768132800}',
+    b'{"list": [1, 2]}',
+    b'{"list": [{} {}]}',
+    b"[]",
+])
+def test_broken_bodies_are_rejected(body):
+    with pytest.raises(ValueError):
+        parse_forecast_stream(_chunks(body, 4))
+
+
+def test_slim_entry_keeps_only_used_fields():
+    entry = load_fixtures()["forecast"]["list"][0]
+    slim = slim_entry(entry)
+    assert set(slim) == {"dt", "pop", "main", "wind", "weather"}
+    assert set(slim["main"]) == {"temp", "humidity"}
+    assert set(slim["weather"][0]) == {"icon", "description"}
+    assert slim_entry({"dt": 1, "wind": {"deg": 90}}) == {"dt": 1, "wind": {}}
+
+
+def test_get_forecast_streams_the_response(monkeypatch):
+    server = start_mock_server()
+    client = WeatherHTTPClient(base_url=server.base_url)
+    monkeypatch.setattr(weather, "get_client", lambda: client)
+    try:
+        streamed = weather.get_forecast.__wrapped__(6.455, 3.3941, "key")
+        monkeypatch.setattr(weather, "FORECAST_STREAMING", False)
+        decoded = weather.get_forecast.__wrapped__(6.455, 3.3941, "key")
+    finally:
+        client.close()
+        server.shutdown()
+
+    assert streamed == decoded
+    assert len(streamed[0]) == 8
@@ -0,0 +1,81 @@
+"""
+Fragment Cache Tests
+====================
+Checks fragments.FragmentCache versioning and eviction, and that pages
+assembled from cached fragments track changes in the weather data.
+"""
+
+import os
+import sys
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+from fragments import FragmentCache, data_version
+from tools.bench_render import load_weather
+
+
+def test_reuses_until_version_changes():
+    cache = FragmentCache()
+    renders = []
+
+    def render(text):
+        return lambda: renders.append(text) or text
+
+    assert cache.get_or_render("london,,gb", "hourly", "v1", render("a")) == "a"
+    assert cache.get_or_render("london,,gb", "hourly", "v1", render("b")) == "a"
+    assert cache.get_or_render("london,,gb", "hourly", "v2", render("c")) == "c"
+    assert cache.get_or_render("paris,,fr", "hourly", "v2", render("d")) == "d"
+    assert renders == ["a", "c", "d"]
+    assert cache.stats() == {"hits": 1, "misses": 3, "invalidations": 1, "evictions": 0,
+                             "entries": 2, "bytes": 2}
+
+    cache.invalidate("london,,gb")
+    assert cache.get_or_render("london,,gb", "hourly", "v2", render("e")) == "e"
+
+
+def test_evicts_least_recently_used():
+    cache = FragmentCache(max_bytes=10)
+    cache.get_or_render("a", "daily", "v", lambda: "x" * 4)
+    cache.get_or_render("b", "daily", "v", lambda: "x" * 4)
+    cache.get_or_render("a", "daily", "v", lambda: "unused")
+    cache.get_or_render("c", "daily", "v", lambda: "x" * 4)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get_or_render("a", "daily", "v", lambda: "new") == "x" * 4
+    assert cache.get_or_render("b", "daily", "v", lambda: "new") == "new"
+
+
+def test_data_version_only_tracks_listed_fields():
+    weather = asdict(load_weather())
+    fields = ("hourly_forecast",)
+    assert data_version(weather, fields) == data_version(dict(weather, temperature=99), fields)
+    changed = dict(weather, hourly_forecast=[dict(weather["hourly_forecast"][0], temp=-40.0)])
+    assert data_version(weather, fields) != data_version(changed, fields)
+
+
+def render_page(weather, cache):
+    weather_dict = asdict(weather)
+    with app_module.app.test_request_context("/", method="POST"):
+        fragments = app_module.render_fragments("london,,gb", weather_dict)
+        return app_module.render_template("index.html", weather_data=weather_dict, fragments=fragments,
+                                          current_time=1768132800, timezone_offset=0, plot_url=None)
+
+
+def test_page_follows_refreshed_data(monkeypatch):
+    cache = FragmentCache()
+    monkeypatch.setattr(app_module, "get_fragment_cache", lambda: cache)
+    weather = load_weather()
+
+    first = render_page(weather, cache)
+    assert render_page(weather, cache) == first
+    assert "💨 Wind Speed" in first and "Sunrise" in first
+
+    weather.hourly_forecast = [dict(weather.hourly_forecast[0], temp=-40.0)]
+    refreshed = render_page(weather, cache)
+    assert "-40°C" in refreshed and "-40°C" not in first
+    assert cache.stats()["invalidations"] == 1
+
+    monkeypatch.setattr(app_module, "get_fragment_cache", lambda: None)
+    assert render_page(weather, None) == refreshed
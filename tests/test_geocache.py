@@ -0,0 +1,83 @@
+"""
+Geocoding Cache Tests
+=====================
+Offline checks for the SQLite-backed geocoding cache in geocache.py and its
+use by weather.get_lat_lon().
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geocache
+import weather
+
+
+class _Response:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class _Client:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def get(self, path, params=None, timeout=None):
+        self.calls += 1
+        return self.response
+
+
+def test_make_key_normalizes_case_and_whitespace():
+    assert geocache.make_key("  New   York ", "ny", "US") == "new york,ny,us"
+
+
+def test_preload_and_persistence(tmp_path):
+    city_list = tmp_path / "cities.csv"
+    city_list.write_text("city,state,country,lat,lon\nLondon,,GB,51.5073,-0.1277\n")
+    path = str(tmp_path / "geo.sqlite3")
+
+    cache = geocache.GeocodeCache(path=path, city_list=str(city_list))
+    assert cache.get("london", "", "gb") == (51.5073, -0.1277)
+    cache.set("Paris", "", "FR", 48.8589, 2.32)
+
+    reopened = geocache.GeocodeCache(path=path, city_list=None)
+    assert reopened.get("PARIS", "", "fr") == (48.8589, 2.32)
+    assert reopened.get("Atlantis") is None
+
+
+def test_negative_entries_expire(tmp_path):
+    cache = geocache.GeocodeCache(path=str(tmp_path / "geo.sqlite3"), negative_ttl=0, city_list=None)
+    cache.set_not_found("Lndon")
+    cache.negative_ttl = 60
+    assert cache.get("Lndon") == (None, None)
+    cache.negative_ttl = -1
+    assert cache.get("Lndon") is None
+
+
+def test_get_lat_lon_uses_cache(tmp_path, monkeypatch):
+    cache = geocache.GeocodeCache(path=str(tmp_path / "geo.sqlite3"), city_list=None)
+    monkeypatch.setattr(weather, "get_geocache", lambda: cache)
+
+    found = _Client(_Response(200, [{"lat": 6.455, "lon": 3.3941}]))
+    monkeypatch.setattr(weather, "get_client", lambda: found)
+    assert weather.get_lat_lon("Lagos", "", "NG", "key") == (6.455, 3.3941)
+    assert weather.get_lat_lon("lagos", "", "ng", "key") == (6.455, 3.3941)
+    assert found.calls == 1
+
+    missing = _Client(_Response(200, []))
+    monkeypatch.setattr(weather, "get_client", lambda: missing)
+    assert weather.get_lat_lon("Lagoss", "", "NG", "key") == (None, None)
+    assert weather.get_lat_lon("Lagoss", "", "NG", "key") == (None, None)
+    assert missing.calls == 1
+
+    failing = _Client(_Response(429, {}))
+    monkeypatch.setattr(weather, "get_client", lambda: failing)
+    assert weather.get_lat_lon("Abuja", "", "NG", "key") == (None, None)
+    assert weather.get_lat_lon("Abuja", "", "NG", "key") == (None, None)
+    assert failing.calls == 2
@@ -0,0 +1,167 @@
+"""
+HTTP Client Tests
+=================
+Offline checks for the pooled HTTP session layer in http_client.py and the
+retry / circuit breaker policies from resilience.py, using a throwaway
+keep-alive server on localhost.
+"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import WeatherHTTPClient, normalize_url
+from ratelimit import INTERACTIVE, RateLimiter, RateLimitExceeded, TokenBucket
+from resilience import CircuitOpenError, RetryPolicy
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Status codes to return before falling back to 200
+    failures = []
+
+    def do_GET(self):
+        status = self.failures.pop(0) if self.failures else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_normalize_url_upgrades_openweathermap_only():
+    assert normalize_url("http://api.openweathermap.org/geo/1.0/direct?q=x") == \
+        "https://api.openweathermap.org/geo/1.0/direct?q=x"
+    assert normalize_url("http://127.0.0.1:8080/data/2.5/weather") == \
+        "http://127.0.0.1:8080/data/2.5/weather"
+
+
+def test_connections_are_reused_across_calls():
+    server = _start_server()
+    try:
+        client = WeatherHTTPClient(base_url=f"http://127.0.0.1:{server.server_port}")
+        for path in ("/geo/1.0/direct", "/data/2.5/weather", "/data/2.5/forecast", "/data/2.5/uvi"):
+            assert client.get(path, params={"lat": 1, "lon": 2}).json() == {"ok": True}
+
+        stats = client.stats.snapshot()
+        assert stats["requests"] == 4
+        assert stats["new_connections"] == 1
+        assert stats["reused_connections"] == 3
+        client.close()
+    finally:
+        server.shutdown()
+
+
+def _fast_retries(retries=2):
+    return RetryPolicy(retries=retries, backoff_base=0.01, backoff_max=0.01)
+
+
+def test_transient_errors_are_retried():
+    server = _start_server()
+    _KeepAliveHandler.failures = [503, 502]
+    try:
+        client = WeatherHTTPClient(base_url=f"http://127.0.0.1:{server.server_port}",
+                                   retry_policy=_fast_retries())
+        assert client.get("/data/2.5/weather").status_code == 200
+        assert client.stats.snapshot()["requests"] == 3
+        assert client.breaker_states()["/data/2.5/weather"]["state"] == "closed"
+
+        # Client errors are final and do not count against the breaker
+        _KeepAliveHandler.failures = [401]
+        assert client.get("/data/2.5/weather").status_code == 401
+        assert client.stats.snapshot()["requests"] == 4
+        client.close()
+    finally:
+        _KeepAliveHandler.failures = []
+        server.shutdown()
+
+
+def test_circuit_opens_per_endpoint_and_recovers():
+    server = _start_server()
+    _KeepAliveHandler.failures = [500, 500]
+    try:
+        client = WeatherHTTPClient(base_url=f"http://127.0.0.1:{server.server_port}",
+                                   retry_policy=_fast_retries(retries=0))
+        breaker = client.breaker_for(client.url_for("/data/2.5/uvi"))
+        breaker.failure_threshold = 2
+        breaker.reset_timeout = 0.2
+
+        assert client.get("/data/2.5/uvi").status_code == 500
+        assert client.get("/data/2.5/uvi").status_code == 500
+        with pytest.raises(CircuitOpenError):
+            client.get("/data/2.5/uvi")
+        # Other endpoints are unaffected
+        assert client.get("/data/2.5/forecast").status_code == 200
+
+        time.sleep(0.25)
+        assert client.get("/data/2.5/uvi").status_code == 200
+        assert client.breaker_states()["/data/2.5/uvi"]["state"] == "closed"
+        client.close()
+    finally:
+        _KeepAliveHandler.failures = []
+        server.shutdown()
+
+
+def test_throttled_calls_do_not_trip_the_breaker():
+    server = _start_server()
+    try:
+        bucket = TokenBucket(rate=0.001, capacity=1)
+        client = WeatherHTTPClient(base_url=f"http://127.0.0.1:{server.server_port}",
+                                   limiter=RateLimiter(bucket, max_wait={INTERACTIVE: 0}))
+        breaker = client.breaker_for(client.url_for("/data/2.5/uvi"))
+        assert client.get("/data/2.5/uvi").status_code == 200
+        for _ in range(10):
+            with pytest.raises(RateLimitExceeded):
+                client.get("/data/2.5/uvi")
+        assert breaker.snapshot()["state"] == "closed"
+        assert breaker.snapshot()["failures"] == 0
+
+        # A throttled half-open trial hands its slot to the next call
+        breaker.failure_threshold = 1
+        breaker.reset_timeout = 0
+        breaker.record_failure()
+        with pytest.raises(RateLimitExceeded):
+            client.get("/data/2.5/uvi")
+        bucket._tokens = bucket.capacity
+        assert client.get("/data/2.5/uvi").status_code == 200
+        assert breaker.snapshot()["state"] == "closed"
+        assert client.stats.snapshot()["requests"] == 2
+        client.close()
+    finally:
+        server.shutdown()
+
+
+def test_breaker_trial_is_released_when_the_limiter_fails():
+    class _BrokenLimiter:
+        def acquire(self):
+            raise RuntimeError("limiter bug")
+
+    client = WeatherHTTPClient(base_url="http://127.0.0.1:9", limiter=_BrokenLimiter())
+    breaker = client.breaker_for(client.url_for("/data/2.5/uvi"))
+    breaker.failure_threshold = 1
+    breaker.reset_timeout = 0
+    breaker.record_failure()
+
+    with pytest.raises(RuntimeError):
+        client.get("/data/2.5/uvi")
+    # The next call is let through as the trial instead of failing fast
+    with pytest.raises(RuntimeError):
+        client.get("/data/2.5/uvi")
+    assert breaker.snapshot()["rejected"] == 0
+    client.close()
@@ -0,0 +1,100 @@
+"""
+Metrics Tests
+=============
+Checks the histograms and Prometheus output of metrics.py, that a lookup
+against the mock server records every stage and upstream call, and that
+the dashboard page and /metrics route report their own stages.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+import cache as cache_module
+import metrics
+import weather
+from http_client import WeatherHTTPClient
+from plotcache import PlotCache
+from tools.bench_render import load_weather
+from tools.mock_owm_server import start_mock_server
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _stage_counts():
+    return {labels[0]: series["count"] for labels, series in metrics.stage_seconds.snapshot().items()}
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_seconds", "Test durations", ("stage",), buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.01, 0.05, 3.0):
+        histogram.observe(("geocode",), seconds)
+
+    series = histogram.snapshot()[("geocode",)]
+    assert series["buckets"] == [2, 3, 4] and series["count"] == 4
+    assert series["sum"] == pytest.approx(3.065)
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP test_seconds Test durations", "# TYPE test_seconds histogram"]
+    assert 'test_seconds_bucket{stage="geocode",le="0.1"} 3' in lines
+    assert 'test_seconds_bucket{stage="geocode",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{stage="geocode"} 4' in lines
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_lookup_records_stages_and_upstream_calls(monkeypatch, concurrent):
+    server = start_mock_server()
+    client = WeatherHTTPClient(base_url=server.base_url)
+    monkeypatch.setattr(weather, "get_client", lambda: client)
+    monkeypatch.setattr(weather, "get_geocache", lambda: None)
+    monkeypatch.setattr(cache_module, "get_response_cache", lambda: None)
+    try:
+        weather_data = weather.main("Lagos", "", "NG", concurrent=concurrent)
+    finally:
+        client.close()
+        server.shutdown()
+
+    assert weather_data is not None and weather_data.hourly_forecast
+    assert set(_stage_counts()) >= {"geocode", "current", "forecast", "uv", "aggregation"}
+    upstream = {labels: series["count"] for labels, series in metrics.upstream_seconds.snapshot().items()}
+    assert upstream[("/geo/1.0/direct", "200")] == 1
+    assert all(status == "200" for _, status in upstream)
+
+
+def test_page_and_metrics_route(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, "get_weather_data", lambda *location: load_weather())
+    monkeypatch.setattr(app_module, "record_lookup", lambda *location: None)
+    monkeypatch.setattr(app_module, "get_plot_cache", lambda: PlotCache(str(tmp_path)))
+    client = app_module.app.test_client()
+
+    page = client.post("/", data={"city": "London", "state": "", "country": "GB"})
+    assert page.status_code == 200
+    assert {"plot", "template"} <= set(_stage_counts())
+
+    response = client.get("/metrics")
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'weather_stage_seconds_count{stage="template"} 1' in body
+    assert "# TYPE weather_cache_hit_ratio gauge" in body
+    assert 'weather_cache_requests_total{cache="fragment",result="miss"}' in body
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", False)
+    monkeypatch.setattr(app_module, "METRICS_ENABLED", False)
+    with metrics.span("geocode"):
+        pass
+    metrics.observe_upstream("/data/2.5/uvi", 200, 0.1)
+
+    assert metrics.stage_seconds.snapshot() == {}
+    assert metrics.upstream_seconds.snapshot() == {}
+    assert app_module.app.test_client().get("/metrics").status_code == 404
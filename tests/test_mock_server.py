@@ -0,0 +1,61 @@
+"""
+Mock Server Tests
+=================
+Checks that tools/mock_owm_server.py serves fixtures the real fetchers in
+weather.py can parse, and that fault injection is deterministic.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import weather
+from http_client import WeatherHTTPClient
+from resilience import RetryPolicy
+from tools.loadtest import percentile
+from tools.mock_owm_server import start_mock_server
+
+
+def test_fetchers_parse_mock_responses(monkeypatch):
+    server = start_mock_server()
+    client = WeatherHTTPClient(base_url=server.base_url)
+    monkeypatch.setattr(weather, "get_client", lambda: client)
+    monkeypatch.setattr(weather, "get_geocache", lambda: None)
+    try:
+        lat, lon = weather.get_lat_lon("Lagos", "", "NG", "key")
+        current = weather.get_current_weather.__wrapped__(lat, lon, "key")
+        hourly, daily = weather.get_forecast.__wrapped__(lat, lon, "key")
+        uv = weather.get_uv_index.__wrapped__(lat, lon, "key")
+        assert weather.get_lat_lon("Atlantis", "", "", "key") == (None, None)
+    finally:
+        client.close()
+        server.shutdown()
+
+    assert (lat, lon) == (6.455, 3.3941)
+    assert current.name == "Lagos" and current.timezone == "NG"
+    assert len(hourly) == 8 and len(daily) >= 5
+    assert uv == 0.77
+    assert server.requests == {"geo": 2, "weather": 1, "forecast": 1, "uvi": 1}
+
+
+def test_error_injection_is_seeded():
+    def statuses():
+        server = start_mock_server(error_rate=0.5, seed=7)
+        client = WeatherHTTPClient(base_url=server.base_url, retry_policy=RetryPolicy(retries=0))
+        try:
+            return [client.get("/data/2.5/uvi").status_code for _ in range(10)]
+        finally:
+            client.close()
+            server.shutdown()
+
+    first = statuses()
+    assert first == statuses()
+    assert set(first) == {200, 500}
+
+
+def test_percentile_nearest_rank():
+    samples = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
+    assert percentile(samples, 50) == 0.5
+    assert percentile(samples, 90) == 0.9
+    assert percentile(samples, 99) == 1.0
@@ -0,0 +1,202 @@
+"""
+Plot Cache Tests
+================
+Checks content addressing, hit/miss counting, LRU eviction and background
+rendering in plotcache.PlotCache using stub renderers instead of matplotlib.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from plotcache import PlotCache, plot_key
+from svgchart import write_svg
+
+HOURLY = [{"time": 1768132800, "temp": 7.5}, {"time": 1768143600, "temp": 8.1}]
+
+
+def make_render(calls, size=100):
+    def render(hourly_data, timezone_offset, path):
+        calls.append((len(hourly_data), timezone_offset))
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+    return render
+
+
+def test_same_data_reuses_image(tmp_path):
+    calls = []
+    cache = PlotCache(str(tmp_path))
+    first = cache.get_or_render(HOURLY, 0, make_render(calls))
+    again = cache.get_or_render([dict(h) for h in HOURLY], 0, make_render(calls))
+    other_zone = cache.get_or_render(HOURLY, 3600, make_render(calls))
+
+    assert first == again == f"{plot_key(HOURLY, 0)}.png"
+    assert other_zone != first
+    assert len(calls) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "rejected": 0, "failures": 0,
+                             "pending": 0, "files": 2, "bytes": 200}
+    assert sorted(os.listdir(tmp_path)) == sorted([first, other_zone])
+
+
+def test_evicts_least_recently_used(tmp_path):
+    calls = []
+    cache = PlotCache(str(tmp_path), max_bytes=250)
+    a = cache.get_or_render(HOURLY, 0, make_render(calls))
+    b = cache.get_or_render(HOURLY, 1, make_render(calls))
+    cache.get_or_render(HOURLY, 0, make_render(calls))  # touch a
+    c = cache.get_or_render(HOURLY, 2, make_render(calls))
+
+    assert sorted(os.listdir(tmp_path)) == sorted([a, c])
+    assert b not in os.listdir(tmp_path)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_index_survives_restart(tmp_path):
+    calls = []
+    name = PlotCache(str(tmp_path)).get_or_render(HOURLY, 0, make_render(calls))
+    restarted = PlotCache(str(tmp_path))
+    assert restarted.get_or_render(HOURLY, 0, make_render(calls)) == name
+    assert len(calls) == 1
+    assert restarted.stats()["bytes"] == 100
+
+
+def test_concurrent_misses_render_once(tmp_path):
+    calls = []
+    slow = make_render(calls)
+    cache = PlotCache(str(tmp_path))
+
+    def render(*args):
+        time.sleep(0.1)
+        slow(*args)
+
+    threads = [threading.Thread(target=cache.get_or_render, args=(HOURLY, 0, render)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+
+def test_failed_render_leaves_no_file(tmp_path):
+    def broken(hourly_data, timezone_offset, path):
+        raise RuntimeError("boom")
+
+    cache = PlotCache(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        cache.get_or_render(HOURLY, 0, broken)
+    assert os.listdir(tmp_path) == []
+
+
+def test_submit_returns_before_render_finishes(tmp_path):
+    release = threading.Event()
+    calls = []
+
+    def gated(hourly_data, timezone_offset, path):
+        release.wait(5)
+        make_render(calls)(hourly_data, timezone_offset, path)
+
+    cache = PlotCache(str(tmp_path))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        name = cache.submit(HOURLY, 0, gated, executor)
+        assert cache.submit(HOURLY, 0, gated, executor) == name
+        assert cache.is_pending(name)
+        assert not cache.wait(name, 0.05)
+        release.set()
+        assert cache.wait(name, 5)
+    assert len(calls) == 1
+    assert not cache.is_pending(name)
+    assert cache.get_or_render(HOURLY, 0, make_render(calls)) == name
+    assert len(calls) == 1
+
+
+def test_submit_queue_is_bounded(tmp_path):
+    release = threading.Event()
+    cache = PlotCache(str(tmp_path), max_pending=1)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert cache.submit(HOURLY, 0, lambda *args: release.wait(5), executor)
+        assert cache.submit(HOURLY, 1, make_render([]), executor) is None
+        release.set()
+    assert cache.stats()["rejected"] == 1
+
+
+def test_submit_in_process_pool(tmp_path):
+    cache = PlotCache(str(tmp_path))
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        name = cache.submit(HOURLY, 0, write_svg, executor, extension="svg")
+        assert cache.wait(name, 30)
+    with open(tmp_path / name, encoding="utf-8") as f:
+        assert f.read().startswith("<svg")
+
+
+def test_failed_background_render_is_counted(tmp_path):
+    def broken(hourly_data, timezone_offset, path):
+        raise RuntimeError("boom")
+
+    cache = PlotCache(str(tmp_path))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        name = cache.submit(HOURLY, 0, broken, executor)
+        assert not cache.wait(name, 5)
+    assert cache.stats()["failures"] == 1
+    assert os.listdir(tmp_path) == []
+
+
+def test_plot_route_waits_and_serves(tmp_path, monkeypatch):
+    import app as app_module
+
+    release = threading.Event()
+    cache = PlotCache(str(tmp_path))
+    monkeypatch.setattr(app_module, "get_plot_cache", lambda: cache)
+    monkeypatch.setattr(app_module, "PLOT_WAIT_TIMEOUT", 0.05)
+    client = app_module.app.test_client()
+
+    def gated(hourly_data, timezone_offset, path):
+        release.wait(5)
+        write_svg(hourly_data, timezone_offset, path)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        name = cache.submit(HOURLY, 0, gated, executor, extension="svg")
+        pending = client.get(f"/plots/{name}")
+        assert pending.status_code == 503 and pending.headers["Retry-After"] == "1"
+        release.set()
+        assert cache.wait(name, 5)
+
+    ready = client.get(f"/plots/{name}")
+    assert ready.status_code == 200
+    assert ready.mimetype == "image/svg+xml"
+    assert "max-age=31536000" in ready.headers["Cache-Control"]
+    assert client.get("/plots/" + "0" * 32 + ".svg").status_code == 404
+    assert client.get("/plots/..%2Fapp.py").status_code == 404
+
+
+def test_plot_route_waits_for_renders_queued_by_other_workers(tmp_path, monkeypatch):
+    import app as app_module
+
+    # Two workers share the directory; only the first one queued the render
+    owner, other = PlotCache(str(tmp_path)), PlotCache(str(tmp_path))
+    monkeypatch.setattr(app_module, "get_plot_cache", lambda: other)
+    monkeypatch.setattr(app_module, "PLOT_WAIT_TIMEOUT", 5)
+    client = app_module.app.test_client()
+
+    def slow(hourly_data, timezone_offset, path):
+        time.sleep(0.2)
+        write_svg(hourly_data, timezone_offset, path)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        name = owner.submit(HOURLY, 0, slow, executor, extension="svg")
+        assert other.is_pending(name)
+        response = client.get(f"/plots/{name}")
+    assert response.status_code == 200
+    assert response.mimetype == "image/svg+xml"
+    assert not other.is_pending(name)
+    assert os.listdir(tmp_path) == [name]
+
+    # Nobody is rendering this one: refused without waiting
+    start = time.monotonic()
+    assert client.get("/plots/" + "1" * 32 + ".png").status_code == 404
+    assert time.monotonic() - start < 1
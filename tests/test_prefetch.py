@@ -0,0 +1,83 @@
+"""
+Prefetch Tests
+==============
+Checks the space-saving heavy-hitters counter and that the prefetcher
+refreshes popular locations ahead of expiry within its upstream budget,
+using the local mock OpenWeatherMap server.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache as cache_module
+import prefetch
+import weather
+from cache import ResponseCache
+from http_client import WeatherHTTPClient
+from prefetch import Prefetcher, SpaceSaving
+from tools.mock_owm_server import start_mock_server
+
+
+def test_space_saving_keeps_heavy_hitters():
+    counter = SpaceSaving(capacity=10)
+    for i in range(1000):
+        counter.add("london" if i % 3 == 0 else "paris" if i % 5 == 0 else f"city-{i}")
+    top = [key for key, _ in counter.top(2)]
+    assert sorted(top) == ["london", "paris"]
+    assert len(counter) == 10
+
+    counter.decay()
+    assert counter.top(1)[0][1] > 100
+    assert len(counter) <= 10
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    server = start_mock_server()
+    client = WeatherHTTPClient(base_url=server.base_url)
+    response_cache = ResponseCache(ttls={"current": 600, "forecast": 1800, "uv": 3600})
+    monkeypatch.setattr(weather, "get_client", lambda: client)
+    monkeypatch.setattr(weather, "get_geocache", lambda: None)
+    monkeypatch.setattr(cache_module, "get_response_cache", lambda: response_cache)
+    monkeypatch.setattr(prefetch, "get_response_cache", lambda: response_cache)
+    yield server, response_cache
+    client.close()
+    server.shutdown()
+
+
+def test_refreshes_popular_locations_before_expiry(upstream):
+    server, response_cache = upstream
+    prefetcher = Prefetcher(top_n=2, lead_time=120, budget_per_minute=0)
+    for _ in range(3):
+        prefetcher.record("Lagos", "", "NG")
+    prefetcher.record("Paris", "", "FR")
+    prefetcher.record("Atlantis")
+
+    assert prefetcher.run_once() == 6
+    assert server.requests == {"geo": 2, "weather": 2, "forecast": 2, "uvi": 2}
+    assert response_cache.expires_in("current", 6.455, 3.3941) > 590
+
+    # Everything is fresh: nothing to do
+    prefetcher.record("Lagos", "", "NG")
+    assert prefetcher.run_once() == 0
+
+    # Entries inside the lead time are refreshed; coordinates are remembered
+    prefetcher.lead_time = 700
+    prefetcher.record("Lagos", "", "NG")
+    assert prefetcher.run_once() == 1
+    assert server.requests == {"geo": 2, "weather": 3, "forecast": 2, "uvi": 2}
+
+
+def test_budget_limits_upstream_calls(upstream):
+    server, _ = upstream
+    prefetcher = Prefetcher(top_n=5, budget_per_minute=2)
+    prefetcher.record("Lagos", "", "NG")
+    prefetcher.record("Paris", "", "FR")
+
+    assert prefetcher.run_once() == 2
+    assert prefetcher.stats()["skipped_budget"] == 4
+    assert sum(server.requests[name] for name in ("weather", "forecast", "uvi")) == 2
@@ -0,0 +1,87 @@
+"""
+Profiling Tests
+===============
+Checks the collapsed stacks produced by profiling.py (including pool
+threads that follow a request), pruning of the profile directory, and the
+X-Profile-Token / sampling triggers on the dashboard route.
+"""
+
+import contextvars
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+import profiling
+
+
+def _inner():
+    time.sleep(0.01)
+
+
+def _outer(pool):
+    _inner()
+    # Handed to a pool thread in a copy of the context, like weather.py's fan-out
+    pool.submit(contextvars.copy_context().run, _followed).result()
+
+
+def _followed():
+    with profiling.follow():
+        _inner()
+
+
+def _parse(text):
+    return {line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in text.splitlines()}
+
+
+def test_collapsed_stacks_include_followed_threads():
+    profiler = profiling.StackProfiler()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="test-pool") as pool:
+        profiler.run(_outer, pool)
+        # Outside a profiled request, following is a no-op
+        assert pool.submit(contextvars.copy_context().run, _followed).result() is None
+
+    stacks = _parse(profiler.collapsed())
+    sleep = [path for path in stacks if path.endswith("time.sleep")]
+    assert any(path.startswith("_outer (test_profiling.py") and "_inner (test_profiling.py" in path
+               for path in sleep)
+    assert any(path.startswith("[test-pool_0];") for path in sleep)
+    assert all(stacks[path] >= 9000 for path in sleep)
+    # Self times of the request thread add up to its wall-clock time
+    own = sum(us for path, us in stacks.items() if not path.startswith("["))
+    assert abs(own - profiler.elapsed * 1e6) < 0.2 * profiler.elapsed * 1e6
+
+
+def test_profile_directory_is_bounded(tmp_path):
+    profiler = profiling.StackProfiler()
+    profiler.run(_inner)
+    names = []
+    for _ in range(4):
+        names.append(profiling.save_profile(profiler, "index", directory=str(tmp_path), max_files=2))
+        time.sleep(0.01)
+
+    assert sorted(os.listdir(tmp_path)) == sorted(names[-2:])
+    assert names[-1].endswith(".collapsed") and "-index-" in names[-1]
+
+
+def test_index_is_profiled_on_request(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    client = app_module.app.test_client()
+
+    assert "X-Profile" not in client.get("/", headers={"X-Profile-Token": "wrong"}).headers
+    assert os.listdir(tmp_path) == []
+
+    response = client.get("/", headers={"X-Profile-Token": "s3cret"})
+    assert response.status_code == 200
+    stacks = (tmp_path / response.headers["X-Profile"]).read_text()
+    assert stacks.startswith("index (app.py:")
+    assert "render_template" in stacks
+
+    # Sampled requests are saved without telling the client
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 1.0)
+    assert "X-Profile" not in client.get("/").headers
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,119 @@
+"""
+Rate Limiter Tests
+==================
+Offline checks for the token bucket and priority queueing in ratelimit.py.
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import BACKGROUND, INTERACTIVE, RateLimiter, RateLimitExceeded, TokenBucket, priority
+
+
+def test_bucket_allows_burst_then_reports_wait():
+    bucket = TokenBucket(rate=1.0, capacity=3)
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take() > 0
+
+
+def test_shared_bucket_is_seen_by_every_instance(tmp_path):
+    path = str(tmp_path / "bucket.sqlite3")
+    first = TokenBucket(rate=0.001, capacity=2, path=path)
+    second = TokenBucket(rate=0.001, capacity=2, path=path)
+    assert first.take() == 0.0
+    assert second.take() == 0.0
+    assert first.take() > 0
+
+
+def test_queued_call_gives_up_at_deadline():
+    limiter = RateLimiter(TokenBucket(rate=0.001, capacity=1), max_wait={INTERACTIVE: 0.2})
+    limiter.acquire(INTERACTIVE)
+    start = time.monotonic()
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(INTERACTIVE)
+    assert 0.15 < time.monotonic() - start < 1.0
+    assert limiter.stats()["interactive"] == {"granted": 1, "queued": 1, "rejected": 1}
+
+
+def test_background_calls_leave_reserve_for_interactive():
+    limiter = RateLimiter(TokenBucket(rate=0.001, capacity=4), background_reserve=0.5,
+                          max_wait={BACKGROUND: 0.1, INTERACTIVE: 0.1})
+    with priority(BACKGROUND):
+        limiter.acquire()
+        limiter.acquire()
+        with pytest.raises(RateLimitExceeded):
+            limiter.acquire()
+    limiter.acquire()
+    limiter.acquire()
+
+
+def test_interactive_waiter_is_served_before_background():
+    limiter = RateLimiter(TokenBucket(rate=10.0, capacity=1), background_reserve=0,
+                          max_wait={INTERACTIVE: 2, BACKGROUND: 2})
+    limiter.acquire(INTERACTIVE)
+    order = []
+
+    def call(level, name):
+        limiter.acquire(level)
+        order.append(name)
+
+    interactive = threading.Thread(target=call, args=(INTERACTIVE, "interactive"))
+    background = threading.Thread(target=call, args=(BACKGROUND, "background"))
+    interactive.start()
+    time.sleep(0.01)
+    background.start()
+    interactive.join()
+    background.join()
+    assert order == ["interactive", "background"]
+
+
+def test_async_acquire_polls_shared_bucket_off_the_loop(tmp_path):
+    limiter = RateLimiter(TokenBucket(rate=0.001, capacity=1, path=str(tmp_path / "bucket.sqlite3")),
+                          max_wait={INTERACTIVE: 0})
+    loop_thread = threading.get_ident()
+    take = limiter.bucket.take
+    threads = []
+
+    def recording_take(floor=0.0):
+        threads.append(threading.get_ident())
+        return take(floor)
+
+    limiter.bucket.take = recording_take
+
+    async def run():
+        await limiter.acquire_async(INTERACTIVE)
+        with pytest.raises(RateLimitExceeded):
+            await limiter.acquire_async(INTERACTIVE)
+
+    asyncio.run(run())
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+def test_background_calls_can_use_a_one_token_bucket():
+    limiter = RateLimiter(TokenBucket(rate=0.001, capacity=1), max_wait={BACKGROUND: 0})
+    assert limiter.background_floor == 0
+    assert limiter.acquire(BACKGROUND) < 0.1
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire(BACKGROUND)
+    # Larger buckets keep the configured reserve
+    assert RateLimiter(TokenBucket(rate=1, capacity=20)).background_floor == 5
+    assert RateLimiter(TokenBucket(rate=1, capacity=2), background_reserve=0.75).background_floor == 1
+
+
+def test_unusable_shared_bucket_refuses_the_call(tmp_path):
+    bucket = TokenBucket(rate=1, capacity=1, path=str(tmp_path / "bucket.sqlite3"))
+
+    def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    bucket._connect = locked
+    with pytest.raises(RateLimitExceeded, match="database is locked"):
+        bucket.take()
@@ -0,0 +1,132 @@
+"""
+Response Cache Tests
+====================
+Offline checks for the TTL / stale-while-revalidate cache and single-flight
+coalescing in cache.py.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache as cache_module
+from cache import ResponseCache, SingleFlight, cached_endpoint
+
+
+class _Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {"value": self.calls}
+
+
+def test_fresh_entries_are_served_from_cache():
+    cache = ResponseCache(ttls={"uv": 60})
+    fetch = _Counter()
+
+    assert cache.get_or_fetch("uv", 51.5073, -0.1277, fetch) == {"value": 1}
+    # Nearby coordinates round to the same key
+    assert cache.get_or_fetch("uv", 51.5071, -0.1281, fetch) == {"value": 1}
+    assert fetch.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_stale_entries_are_served_while_refreshing():
+    cache = ResponseCache(ttls={"current": 0}, max_stale=60)
+    fetch = _Counter()
+
+    cache.get_or_fetch("current", 1.0, 2.0, fetch)
+    assert cache.get_or_fetch("current", 1.0, 2.0, fetch) == {"value": 1}
+
+    for _ in range(50):
+        if cache.stats()["refreshes"]:
+            break
+        time.sleep(0.01)
+    assert fetch.calls == 2
+    assert cache.get_or_fetch("current", 1.0, 2.0, fetch) == {"value": 2}
+
+
+def test_expired_entries_and_failures():
+    cache = ResponseCache(ttls={"forecast": 0}, max_stale=0)
+    fetch = _Counter()
+
+    cache.get_or_fetch("forecast", 1.0, 2.0, fetch)
+    assert cache.get_or_fetch("forecast", 1.0, 2.0, fetch) == {"value": 2}
+
+    assert cache.get_or_fetch("forecast", 3.0, 4.0, lambda: None) is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_returned_values_are_copies():
+    cache = ResponseCache(ttls={"current": 60})
+    first = cache.get_or_fetch("current", 1.0, 2.0, lambda: {"uv": 0})
+    first["uv"] = 5
+    assert cache.get_or_fetch("current", 1.0, 2.0, lambda: None) == {"uv": 0}
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: flight.do("london,,gb", slow), range(8)))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"executions": 1, "coalesced": 7, "in_flight": 0}
+
+
+def test_expired_entry_is_served_when_refetch_fails():
+    cache = ResponseCache(ttls={"current": 0}, max_stale=0)
+    cache.get_or_fetch("current", 1.0, 2.0, lambda: {"temp": 12})
+    assert cache.get_or_fetch("current", 1.0, 2.0, lambda: None) == {"temp": 12}
+    assert cache.stats()["expired_hits"] == 1
+
+
+def test_counters_are_exact_under_concurrency():
+    cache = ResponseCache(ttls={"uv": 60})
+    cache.store("uv", 1.0, 2.0, {"value": 1})
+
+    def lookups(_):
+        for _ in range(2000):
+            cache.lookup("uv", 1.0, 2.0)
+            cache.lookup("uv", 3.0, 4.0)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lookups, range(8)))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (16000, 16000)
+
+
+def test_nearby_coordinates_share_one_fetch(monkeypatch):
+    response_cache = ResponseCache(ttls={"uv": 60})
+    monkeypatch.setattr(cache_module, "get_response_cache", lambda: response_cache)
+    release = threading.Event()
+    calls = []
+
+    @cached_endpoint("uv")
+    def get_uv(lat, lon, api_key):
+        calls.append((lat, lon))
+        release.wait(5)
+        return {"value": 3}
+
+    # Both round to the same cache key (2 decimal places)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(get_uv, 51.50731, -0.12771, "key")
+        time.sleep(0.05)
+        second = pool.submit(get_uv, 51.50734, -0.12774, "key")
+        time.sleep(0.05)
+        release.set()
+        assert first.result() == second.result() == {"value": 3}
+    assert len(calls) == 1
@@ -0,0 +1,59 @@
+"""
+SVG Chart Tests
+===============
+Checks the structure of svgchart.render_svg() output and that the app no
+longer imports matplotlib unless the matplotlib backend is used.
+"""
+
+import os
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from svgchart import nice_ticks, render_svg
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SVG = "{http://www.w3.org/2000/svg}"
+HOURLY = [{"time": 1768132800 + i * 10800, "temp": t}
+          for i, t in enumerate([7.96, 9.7, 9.56, 6.1, 4.64, 2.5, 4.24, 7.3])]
+
+
+def test_chart_has_points_labels_and_local_times():
+    root = ET.fromstring(render_svg(HOURLY, 3600))
+    texts = [t.text for t in root.iter(f"{SVG}text")]
+
+    assert len(root.findall(f"{SVG}circle")) == len(HOURLY) + 1  # plus legend marker
+    assert "7.96" not in texts and "8.0°C" in texts and "2.5°C" in texts
+    assert [t for t in texts if ":" in t] == ["13:00", "16:00", "19:00", "22:00",
+                                              "01:00", "04:00", "07:00", "10:00"]
+    assert "Hourly Temperature Forecast (°C)" in texts
+
+
+def test_points_follow_temperatures():
+    root = ET.fromstring(render_svg(HOURLY, 0))
+    points = [tuple(map(float, p.split(","))) for p in root.find(f"{SVG}polyline").get("points").split()]
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    assert xs == sorted(xs)
+    assert ys.index(max(ys)) == 5  # coldest hour is lowest on screen
+    assert ys.index(min(ys)) == 1
+
+
+def test_single_point_and_flat_series():
+    ET.fromstring(render_svg(HOURLY[:1], 0))
+    ET.fromstring(render_svg([dict(h, temp=5) for h in HOURLY], 0))
+
+
+def test_nice_ticks():
+    assert nice_ticks(2.5, 9.7) == [2.0, 4.0, 6.0, 8.0, 10.0]
+    assert nice_ticks(-3.2, -1.1) == [-3.5, -3.0, -2.5, -2.0, -1.5, -1.0]
+    assert nice_ticks(5, 5) == [4.0, 4.5, 5.0, 5.5, 6.0]
+
+
+def test_app_import_does_not_load_matplotlib():
+    code = "import sys, app; print('matplotlib' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True,
+                            text=True, env=dict(os.environ, API_KEY="test"))
+    assert result.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,67 @@
+"""
+Time Formatting Tests
+=====================
+Checks that timefmt.format_local() matches the datetime arithmetic the
+template filters used before, and that parsed forecasts carry labels.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timefmt import add_forecast_labels, format_local
+from weather import parse_forecast
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "owm")
+
+
+def reference(timestamp, offset, fmt):
+    return (datetime.utcfromtimestamp(timestamp) + timedelta(seconds=offset)).strftime(fmt)
+
+
+def test_matches_datetime_formatting():
+    formats = ["%H:%M", "%a, %b %d", "%Y-%m-%d %H:%M", "%I:%M %p", "%A, %B %d, %Y at %I:%M %p"]
+    for offset in (-36000, -12600, 0, 3600, 19800, 45900):
+        for timestamp in (0, 1768132800, 1768148101, 1792296281):
+            for fmt in formats:
+                assert format_local(timestamp, offset, fmt) == reference(timestamp, offset, fmt)
+
+
+def test_forecast_entries_carry_labels():
+    with open(os.path.join(FIXTURE_DIR, "forecast.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    data["city"]["timezone"] = 19800
+    hourly, daily = parse_forecast(data)
+
+    assert [h["time_label"] for h in hourly] == [reference(h["time"], 19800, "%H:%M") for h in hourly]
+    assert [d["date_label"] for d in daily] == [reference(d["time"], 19800, "%a, %b %d") for d in daily]
+
+
+def test_entries_without_time_do_not_fail():
+    hourly = [{"time": 1768132800}, {"time": None}]
+    daily = [{"time": None}]
+    add_forecast_labels(hourly, daily, 3600)
+    assert [h["time_label"] for h in hourly] == ["13:00", "None"]
+    assert daily[0]["date_label"] == "None"
+
+
+def test_filters_use_location_time():
+    from app import app
+
+    filters = app.jinja_env.filters
+    assert filters["strftime"](1768132800, "%H:%M", 3600) == "13:00"
+    assert filters["strftime"](None, "%H:%M", 3600) == "None"
+    assert filters["location_time"](1768132800, -18000) == "07:00 AM"
+    assert filters["location_time"](0, 3600) == "N/A"
+    assert filters["format_date_long"](1768132800, 0) == "Sunday, January 11, 2026"
+
+
+def test_render_benchmark_compares_label_strategies():
+    from tools import bench_render
+
+    result = bench_render.run(["--iterations", "5"])
+    assert set(result["uncached_render_ms"]) == {"legacy_labels", "precomputed_labels"}
+    assert all(value > 0 for value in result["uncached_render_ms"].values())
@@ -0,0 +1,147 @@
+"""
+Startup Warmup Tests
+====================
+Checks that the response cache survives a snapshot round trip (dropping
+entries too old to serve), that warming from a location list fills the
+caches through the local mock OpenWeatherMap server, that the workers'
+snapshot parts are merged, that a forked worker keeps the warm entries but
+not the parent's refresh threads, and that gunicorn only warms up in a
+preloading master.
+"""
+
+import importlib.util
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache as cache_module
+import warmup
+import weather
+from cache import ResponseCache
+from http_client import WeatherHTTPClient
+from tools.mock_owm_server import start_mock_server
+
+TTLS = {"current": 600, "forecast": 1800, "uv": 3600}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    server = start_mock_server()
+    client = WeatherHTTPClient(base_url=server.base_url)
+    response_cache = ResponseCache(ttls=TTLS, max_stale=600)
+    monkeypatch.setattr(weather, "get_client", lambda: client)
+    monkeypatch.setattr(weather, "get_geocache", lambda: None)
+    monkeypatch.setattr(warmup, "get_geocache", lambda: None)
+    monkeypatch.setattr(cache_module, "get_response_cache", lambda: response_cache)
+    monkeypatch.setattr(warmup, "get_response_cache", lambda: response_cache)
+    yield server, response_cache, monkeypatch
+    client.close()
+    server.shutdown()
+
+
+def test_snapshot_round_trip(upstream, tmp_path):
+    server, response_cache, monkeypatch = upstream
+    assert weather.main("Lagos", "", "NG") is not None
+    path = str(tmp_path / "snapshot.pickle")
+    assert warmup.save_snapshot(path) == 3
+
+    restored = ResponseCache(ttls=TTLS, max_stale=600)
+    monkeypatch.setattr(cache_module, "get_response_cache", lambda: restored)
+    monkeypatch.setattr(warmup, "get_response_cache", lambda: restored)
+    assert warmup.load_snapshot(path) == 3
+    assert weather.main("Lagos", "", "NG").name == "Lagos"
+    assert server.requests == {"geo": 2, "weather": 1, "forecast": 1, "uvi": 1}
+
+    assert warmup.load_snapshot(str(tmp_path / "missing.pickle")) == 0
+    (tmp_path / "corrupt.pickle").write_bytes(b"not a pickle")
+    assert warmup.load_snapshot(str(tmp_path / "corrupt.pickle")) == 0
+
+
+def test_import_skips_entries_too_old_to_serve():
+    response_cache = ResponseCache(ttls=TTLS, max_stale=600)
+    now = time.time()
+    loaded = response_cache.import_entries([
+        (("current", 1.0, 2.0), "stale but servable", now - 900),
+        (("current", 3.0, 4.0), "expired", now - 1300),
+        (("uv", 1.0, 2.0), "fresh", now - 60),
+    ])
+    assert loaded == 2
+    assert response_cache.lookup("current", 1.0, 2.0)[1] == cache_module.STALE
+    assert response_cache.lookup("current", 3.0, 4.0) == (None, None)
+
+
+def test_warm_caches_from_location_list(upstream, tmp_path):
+    server, _, _ = upstream
+    locations = tmp_path / "warm.txt"
+    locations.write_text("# popular\nLagos,,NG\nParis,,FR\nAtlantis\n", encoding="utf-8")
+
+    stats = warmup.warm_caches(str(locations), snapshot_path="")
+    assert stats["locations"] == 3
+    assert stats["warmed"] == 2
+    assert server.requests["weather"] == 2
+
+    # Already warm: only the uncached geocoding lookups go upstream again
+    warmup.warm_caches(str(locations), snapshot_path="")
+    assert server.requests["weather"] == 2
+
+
+def test_worker_snapshots_are_merged(monkeypatch, tmp_path):
+    path = str(tmp_path / "snapshot.pickle")
+    now = time.time()
+    for pid, entries in ((101, [(("uv", 1.0, 2.0), "old", now - 60), (("uv", 3.0, 4.0), "only", now - 30)]),
+                         (102, [(("uv", 1.0, 2.0), "new", now - 10)])):
+        worker_cache = ResponseCache(ttls=TTLS)
+        worker_cache.import_entries(entries)
+        monkeypatch.setattr(warmup, "get_response_cache", lambda: worker_cache)
+        warmup.save_snapshot(f"{path}.worker-{pid}")
+
+    assert warmup.merge_snapshots(path) == 2
+    assert os.listdir(tmp_path) == ["snapshot.pickle"]
+    assert warmup.merge_snapshots(path) == 0
+
+    restored = ResponseCache(ttls=TTLS)
+    monkeypatch.setattr(warmup, "get_response_cache", lambda: restored)
+    assert warmup.load_snapshot(path) == 2
+    assert restored.lookup("uv", 1.0, 2.0)[0] == "new"
+    assert restored.lookup("uv", 3.0, 4.0)[0] == "only"
+
+
+def test_gunicorn_warms_up_only_when_preloading(monkeypatch):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", os.path.join(root, "gunicorn.conf.py"))
+    conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conf)
+    boots = []
+    monkeypatch.setattr(warmup, "boot", boots.append)
+
+    conf.on_starting(SimpleNamespace(cfg=SimpleNamespace(preload_app=False)))
+    assert boots == []
+    conf.on_starting(SimpleNamespace(cfg=SimpleNamespace(preload_app=True)))
+    assert len(boots) == 1 and boots[0] >= 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_worker_keeps_entries_but_not_threads(monkeypatch):
+    response_cache = ResponseCache(ttls=TTLS)
+    monkeypatch.setattr(cache_module, "_response_cache", response_cache)
+    response_cache.store("current", 1.0, 2.0, "warm")
+    response_cache._schedule_refresh(("current", 1.0, 2.0), lambda: "refreshed")
+    assert response_cache._executor is not None
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        ok = (response_cache._executor is None
+              and response_cache.lookup("current", 1.0, 2.0)[0] is not None)
+        os.write(write_fd, b"1" if ok else b"0")
+        os._exit(0)
+    os.close(write_fd)
+    result = os.read(read_fd, 1)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+    assert result == b"1"
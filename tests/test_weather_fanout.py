@@ -0,0 +1,84 @@
+"""
+Concurrent Fetch Tests
+======================
+Offline checks for weather.fetch_weather_concurrently(), the concurrent
+mode of weather.main() and its request coalescing, with the upstream
+fetchers replaced by stubs.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import weather
+
+
+def _current(lat, lon, api_key):
+    time.sleep(0.2)
+    return weather.WeatherData(
+        name="London", main="Clouds", description="overcast clouds", icon="04d",
+        temperature=12, feels_like=11, humidity=80, pressure=1012, wind_speed=4,
+        visibility=10000, uv_index=0, hourly_forecast=[], daily_forecast=[], alerts=[],
+    )
+
+
+def _forecast(lat, lon, api_key):
+    time.sleep(0.2)
+    return [{"time": 1, "temp": 12.0}], [{"time": 1, "temp_max": 13.0}]
+
+
+def _uv(lat, lon, api_key):
+    time.sleep(0.2)
+    return 3.5
+
+
+def _stub_fetchers(monkeypatch, uv=_uv):
+    monkeypatch.setattr(weather, "get_lat_lon", lambda *args: (51.5, -0.12))
+    monkeypatch.setattr(weather, "get_current_weather", _current)
+    monkeypatch.setattr(weather, "get_forecast", _forecast)
+    monkeypatch.setattr(weather, "get_uv_index", uv)
+
+
+def test_main_fetches_in_parallel(monkeypatch):
+    _stub_fetchers(monkeypatch)
+
+    start = time.perf_counter()
+    result = weather.main("London", "", "GB", concurrent=True)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert result.name == "London"
+    assert result.hourly_forecast == [{"time": 1, "temp": 12.0}]
+    assert result.daily_forecast == [{"time": 1, "temp_max": 13.0}]
+    assert result.uv_index == 3.5
+
+
+def test_deadline_drops_slow_optional_calls(monkeypatch):
+    def slow_uv(lat, lon, api_key):
+        time.sleep(1.0)
+        return 9.0
+
+    _stub_fetchers(monkeypatch, uv=slow_uv)
+
+    start = time.perf_counter()
+    result = weather.main("London", "", "GB", concurrent=True, deadline=0.5)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.9
+    assert result.name == "London"
+    assert result.uv_index == 0
+
+
+def test_concurrent_main_calls_are_coalesced(monkeypatch):
+    _stub_fetchers(monkeypatch)
+    before = weather.location_flight.stats()["coalesced"]
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda city: weather.main(city, "", "GB", concurrent=True),
+                                ["London", "london", " LONDON", "London ", "London"]))
+
+    assert all(result is results[0] for result in results)
+    assert weather.location_flight.stats()["coalesced"] - before == 4
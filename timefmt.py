@@ -0,0 +1,79 @@
+"""
+Local Time Formatting Module
+============================
+This module formats Unix timestamps in a location's local time (UTC plus
+the offset reported by OpenWeatherMap) for display.
+
+Formatting is memoized per (timestamp, offset, format): a forecast shows
+the same few dozen timestamps to every visitor until it is refreshed, so
+each label is computed once. Forecast entries also get their labels
+precomputed when the API response is parsed (see add_forecast_labels()),
+so rendering a cached page only substitutes strings.
+
+Functions:
+    - format_local(): Memoized local-time strftime
+    - add_forecast_labels(): Precompute display labels on forecast entries
+
+Configuration (environment variables):
+    - TIME_FORMAT_CACHE_SIZE: Memoized labels kept (default 8192)
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import functools
+import os
+import time
+
+TIME_FORMAT_CACHE_SIZE = int(os.getenv("TIME_FORMAT_CACHE_SIZE", "8192"))
+
+# Display formats used by templates/index.html
+HOUR_FORMAT = "%H:%M"
+DAY_FORMAT = "%a, %b %d"
+ALERT_FORMAT = "%Y-%m-%d %H:%M"
+
+
+@functools.lru_cache(maxsize=TIME_FORMAT_CACHE_SIZE)
+def format_local(timestamp, timezone_offset, format_string):
+    """
+    Format a Unix timestamp in the local time of a UTC offset.
+
+    Args:
+        timestamp (int): Unix timestamp (seconds since epoch)
+        timezone_offset (int): UTC offset in seconds
+        format_string (str): strftime format
+
+    Returns:
+        str: Formatted local date/time
+
+    Example:
+        >>> format_local(1768132800, 3600, "%H:%M")
+        '13:00'
+    """
+    return time.strftime(format_string, time.gmtime(timestamp + timezone_offset))
+
+
+def add_forecast_labels(hourly_forecast, daily_forecast, timezone_offset):
+    """
+    Add local-time display labels to parsed forecast entries in place.
+
+    Hourly entries get "time_label" (HH:MM) and daily entries get
+    "date_label" (e.g. "Mon, Jan 12"). An entry without a time gets
+    "None" rather than failing the whole page.
+
+    Args:
+        hourly_forecast (list): Hourly forecast dicts with "time"
+        daily_forecast (list): Daily forecast dicts with "time"
+        timezone_offset (int): UTC offset in seconds
+    """
+    for hour in hourly_forecast:
+        hour["time_label"] = _label(hour.get("time"), timezone_offset, HOUR_FORMAT)
+    for day in daily_forecast:
+        day["date_label"] = _label(day.get("time"), timezone_offset, DAY_FORMAT)
+
+
+def _label(timestamp, timezone_offset, format_string):
+    """Format an entry's timestamp; a missing one is shown as text, as the strftime filter did."""
+    if timestamp is None:
+        return str(timestamp)
+    return format_local(timestamp, timezone_offset, format_string)
@@ -0,0 +1,300 @@
+"""
+Benchmark Suite
+===============
+Times the hot paths of weather.py and app.py offline, on the recorded
+OpenWeatherMap fixtures in tests/fixtures/owm, and writes the results as
+JSON so runs can be compared between commits and regressions can fail CI.
+
+Benchmarks:
+    - forecast.*: get_forecast_data() (streamed forecast parse, daily
+      aggregation, UV), parse_forecast() on a decoded body, and the daily
+      rollup alone
+    - weather_data.*: WeatherData construction from a current weather
+      response, and asdict()
+    - filter.<name>: every Jinja filter registered by app.py
+    - plot.*: drawing the SVG chart, and generate_plot() for a chart that
+      is already stored
+    - page.*: a full POST / through the Flask test client, with the weather
+      already fetched (cache hit) and with weather.main() parsing the
+      fixtures (no response cache)
+
+Nothing touches the network: fetchers are served the fixture bodies by an
+in-process client, and charts go to a temporary directory. The page
+benchmarks run with warm fragment and chart caches, as on a busy server.
+
+Usage:
+    python tools/bench.py                        # print a table
+    python tools/bench.py --json bench.json      # save results
+    python tools/bench.py --compare bench.json   # exit 1 on regressions
+    python tools/bench.py --filter filter. --rounds 3
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from tools.bench_render import load_weather
+from tools.mock_owm_server import load_fixtures
+
+# Bumped when the JSON layout changes
+SCHEMA_VERSION = 1
+
+# Slowdown relative to the baseline that --compare reports as a regression.
+# The fastest round is compared: it is far less sensitive to other load on
+# the machine than the median.
+DEFAULT_THRESHOLD = 0.10
+
+# Coordinates of the fixture location
+LOCATION = (51.5073, -0.1277)
+
+# Arguments each app.py filter is benchmarked with; a filter missing here
+# makes the suite fail, so new filters get benchmarked too
+FILTER_ARGS = {
+    "strftime": (1768132800, "%a, %b %d", 3600),
+    "format_time": (1768132800, 3600),
+    "format_date_long": (1768132800, 3600),
+    "format_24h": (1768132800,),
+    "time_ago": (1768132800,),
+    "sunrise_sunset": (1768114800,),
+    "location_time": (1768132800, 3600),
+    "location_date_time": (1768132800, 3600),
+    "timezone_display": ("GB",),
+}
+
+
+class _FixtureClient:
+    """Stands in for WeatherHTTPClient, answering from the fixture bodies."""
+
+    def __init__(self, fixtures):
+        self.bodies = {
+            "/geo/1.0/direct": json.dumps(fixtures["geo"]).encode(),
+            "/data/2.5/weather": json.dumps(fixtures["weather"]).encode(),
+            "/data/2.5/forecast": json.dumps(fixtures["forecast"]).encode(),
+            "/data/2.5/uvi": json.dumps(fixtures["uvi"]).encode(),
+        }
+
+    def get(self, path, params=None, timeout=None, stream=False):
+        import requests
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.bodies[path]
+        # Serve iter_content() from the body already in memory
+        response._content_consumed = True
+        return response
+
+
+@contextlib.contextmanager
+def offline_app(directory):
+    """
+    Point the app at the fixtures: fixture client, no geocoding or response
+    cache, charts in ``directory``, no prefetching or page logging.
+    """
+    import app as app_module
+    import cache
+    import weather
+    from plotcache import PlotCache
+
+    client = _FixtureClient(load_fixtures())
+    plot_cache = PlotCache(directory)
+    patches = [
+        (weather, "get_client", lambda: client),
+        (weather, "get_geocache", lambda: None),
+        (weather, "FANOUT_ENABLED", False),
+        (cache, "get_response_cache", lambda: None),
+        (app_module, "get_plot_cache", lambda: plot_cache),
+        (app_module, "record_lookup", lambda *location: None),
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, value in patches:
+        setattr(module, name, value)
+    try:
+        # index() prints every WeatherData it fetches
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield app_module
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+
+
+def build_benchmarks(app_module, directory):
+    """
+    Return the benchmarks as a dict of name → zero-argument callable.
+
+    Raises:
+        KeyError: If an app.py filter has no entry in FILTER_ARGS
+    """
+    import weather
+    from aggregate import daily_forecast
+    from svgchart import write_svg
+
+    fixtures = load_fixtures()
+    weather_data = load_weather()
+    forecast = fixtures["forecast"]
+    hourly, offset = weather_data.hourly_forecast, weather_data.timezone_offset
+    page_client = app_module.app.test_client()
+    form = {"city": "London", "state": "", "country": "GB"}
+    svg_path = os.path.join(directory, "bench.svg")
+
+    fetch = app_module.get_weather_data
+
+    def page_cached():
+        app_module.get_weather_data = lambda *location: weather_data
+        try:
+            return page_client.post("/", data=form)
+        finally:
+            app_module.get_weather_data = fetch
+
+    benchmarks = {
+        "forecast.get_forecast_data": lambda: weather.get_forecast_data(*LOCATION, "benchmark"),
+        "forecast.parse": lambda: weather.parse_forecast(forecast),
+        "forecast.daily_rollup": lambda: daily_forecast(forecast["list"], forecast["city"]["timezone"]),
+        "weather_data.construct": lambda: weather.parse_current_weather(fixtures["weather"]),
+        "weather_data.asdict": lambda: asdict(weather_data),
+        "plot.render_svg": lambda: write_svg(hourly, offset, svg_path),
+        "plot.generate_plot": lambda: app_module.generate_plot(hourly, offset),
+        "page.index": page_cached,
+        "page.index_uncached": lambda: page_client.post("/", data=form),
+    }
+    for name, func in sorted(vars(app_module).items()):
+        if callable(func) and app_module.app.jinja_env.filters.get(name.removesuffix("_filter")) is func:
+            filter_name = name.removesuffix("_filter")
+            args = FILTER_ARGS[filter_name]
+            benchmarks[f"filter.{filter_name}"] = lambda func=func, args=args: func(*args)
+    return dict(sorted(benchmarks.items()))
+
+
+def measure(func, rounds=7, min_time=0.05):
+    """
+    Time ``func``: calibrate calls per round to last about ``min_time``
+    seconds, then run ``rounds`` rounds.
+
+    Returns:
+        dict: median_us, min_us, stdev_us (per call), calls_per_round, rounds
+    """
+    func()
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or calls >= 1_000_000:
+            break
+        calls = min(calls * 10, max(calls * 2, int(calls * min_time / max(elapsed, 1e-9)) + 1))
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        samples.append((time.perf_counter() - start) / calls * 1e6)
+    return {
+        "median_us": round(statistics.median(samples), 3),
+        "min_us": round(min(samples), 3),
+        "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "calls_per_round": calls,
+        "rounds": rounds,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(pattern=None, rounds=7, min_time=0.05):
+    """
+    Run the benchmarks whose name contains ``pattern`` (all by default).
+
+    Returns:
+        dict: {"schema", "commit", "python", "platform", "results"}, with
+              results mapping benchmark name → measure() output
+    """
+    os.environ.setdefault("API_KEY", "benchmark")
+    with tempfile.TemporaryDirectory() as directory, offline_app(directory) as app_module:
+        benchmarks = build_benchmarks(app_module, directory)
+        results = {name: measure(func, rounds, min_time)
+                   for name, func in benchmarks.items() if not pattern or pattern in name}
+    return {
+        "schema": SCHEMA_VERSION,
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(report, baseline):
+    """
+    Compare the fastest round of each benchmark with a baseline report.
+
+    Returns:
+        list: (name, baseline_us, current_us, change) for benchmarks present
+              in both, change being the relative slowdown (negative if faster)
+    """
+    rows = []
+    for name, result in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before and before["min_us"] > 0:
+            change = result["min_us"] / before["min_us"] - 1
+            rows.append((name, before["min_us"], result["min_us"], change))
+    return rows
+
+
+def run(argv=None):
+    """Parse arguments, run the suite, print (and save / compare) the results."""
+    parser = argparse.ArgumentParser(description="Benchmark weather.py and app.py hot paths offline.")
+    parser.add_argument("--filter", metavar="TEXT", help="only run benchmarks whose name contains TEXT")
+    parser.add_argument("--rounds", type=int, default=7, help="timed rounds per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per round")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown that counts as a regression (default 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.filter, args.rounds, args.min_time)
+    print(f"{'benchmark':32} {'median':>12} {'min':>12} {'stdev':>10}")
+    for name, result in report["results"].items():
+        print(f"{name:32} {result['median_us']:>9.2f} us {result['min_us']:>9.2f} us {result['stdev_us']:>7.2f} us")
+
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} (commit {baseline.get('commit')}):")
+        for name, before, after, change in compare(report, baseline):
+            flag = "  ❌ regression" if change > args.threshold else ""
+            print(f"{name:32} {before:>9.2f} → {after:>9.2f} us {change:>+8.1%}{flag}")
+            if change > args.threshold:
+                regressions.append(name)
+    return report, regressions
+
+
+if __name__ == "__main__":
+    sys.exit(1 if run()[1] else 0)
@@ -0,0 +1,175 @@
+"""
+Dashboard Render Benchmark
+==========================
+Times rendering templates/index.html for a cached forecast (no network, no
+chart), and the per-value time formatting the template relies on.
+
+The full page is also rendered without the fragment cache, once with the
+forecast labels precomputed by timefmt.add_forecast_labels() and once
+formatting them in the template on every render, as index.html did before,
+so the effect of precomputing them can be measured on the whole page.
+
+Usage:
+    python tools/bench_render.py --iterations 500
+    python tools/bench_render.py --json -
+
+The weather data is parsed from the recorded fixtures in tests/fixtures/owm,
+so results are comparable between runs and commits.
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from tools.mock_owm_server import load_fixtures
+
+# How the forecast partials printed their labels before they were
+# precomputed (current markup → markup formatting the label on each render)
+LEGACY_LABELS = {
+    "{{ hour.time_label }}": "{{ hour.time | legacy_strftime('%H:%M', weather_data.timezone_offset) }}",
+    "{{ day.date_label }}": "{{ day.time | legacy_strftime('%a, %b %d', weather_data.timezone_offset) }}",
+}
+
+
+def load_weather():
+    """Build the WeatherData the dashboard would show for the fixtures."""
+    from weather import parse_current_weather, parse_forecast
+
+    fixtures = load_fixtures()
+    weather_data = parse_current_weather(fixtures["weather"])
+    weather_data.hourly_forecast, weather_data.daily_forecast = parse_forecast(fixtures["forecast"])
+    weather_data.uv_index = fixtures["uvi"]["value"]
+    return weather_data
+
+
+def legacy_strftime(timestamp, format_string, timezone_offset):
+    """The per-call datetime formatting the template filters used to do."""
+    dt = datetime.utcfromtimestamp(timestamp) + timedelta(seconds=timezone_offset)
+    format_map = {
+        '%a, %b %d': '%a, %b %d',
+        '%H:%M': '%H:%M',
+        '%Y-%m-%d %H:%M': '%Y-%m-%d %H:%M'
+    }
+    return dt.strftime(format_map.get(format_string, format_string))
+
+
+def legacy_environment(env):
+    """Return an overlay of ``env`` whose templates format forecast labels per render."""
+    import jinja2
+
+    loader = env.loader
+
+    class LegacyLoader(jinja2.BaseLoader):
+        def get_source(self, environment, template):
+            source, filename, uptodate = loader.get_source(environment, template)
+            for current, legacy in LEGACY_LABELS.items():
+                source = source.replace(current, legacy)
+            return source, filename, uptodate
+
+    # Own template cache and filters, so the app's environment is untouched
+    legacy = env.overlay(loader=LegacyLoader(), cache_size=50)
+    legacy.filters = dict(env.filters, legacy_strftime=legacy_strftime)
+    return legacy
+
+
+def render_uncached(app, env, weather_dict, offset):
+    """Render index.html and its partials in ``env``, bypassing the fragment cache."""
+    from markupsafe import Markup
+    from app import DASHBOARD_FRAGMENTS
+
+    context = {"weather_data": weather_dict}
+    app.update_template_context(context)
+    fragments = {name: Markup(env.get_template(template).render(context))
+                 for name, (template, _) in DASHBOARD_FRAGMENTS.items()}
+    context.update(fragments=fragments, current_time=time.time(), timezone_offset=offset, plot_url=None)
+    return env.get_template("index.html").render(context)
+
+
+def time_per_call(fn, iterations):
+    """Return the median seconds per call over ``iterations`` calls (in 5 rounds)."""
+    rounds = []
+    per_round = max(1, iterations // 5)
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(per_round):
+            fn()
+        rounds.append((time.perf_counter() - start) / per_round)
+    return statistics.median(rounds)
+
+
+def run(argv=None):
+    """Parse arguments, run the benchmarks and print the report."""
+    parser = argparse.ArgumentParser(description="Benchmark dashboard template rendering.")
+    parser.add_argument("-n", "--iterations", type=int, default=500, help="renders per measurement")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("API_KEY", "benchmark")
+    from flask import render_template
+    from app import app, render_fragments
+
+    weather_data = load_weather()
+    offset = weather_data.timezone_offset
+    timestamps = [hour["time"] for hour in weather_data.hourly_forecast]
+
+    with app.test_request_context("/", method="POST"):
+        def render_page():
+            weather_dict = asdict(weather_data)
+            render_template("index.html", weather_data=weather_dict,
+                            fragments=render_fragments("london,,gb", weather_dict),
+                            current_time=time.time(), timezone_offset=offset, plot_url=None)
+
+        render_page()
+        page = time_per_call(render_page, args.iterations)
+
+        legacy_env = legacy_environment(app.jinja_env)
+        weather_dict = asdict(weather_data)
+        if render_uncached(app, legacy_env, weather_dict, offset) != \
+                render_uncached(app, app.jinja_env, weather_dict, offset):
+            raise RuntimeError("pages with per-render and precomputed labels differ")
+        page_legacy = time_per_call(lambda: render_uncached(app, legacy_env, asdict(weather_data), offset),
+                                    args.iterations)
+        page_labels = time_per_call(lambda: render_uncached(app, app.jinja_env, asdict(weather_data), offset),
+                                    args.iterations)
+
+    strftime_filter = app.jinja_env.filters["strftime"]
+    legacy = time_per_call(lambda: [legacy_strftime(ts, "%H:%M", offset) for ts in timestamps],
+                           args.iterations * 10)
+    current = time_per_call(lambda: [strftime_filter(ts, "%H:%M", offset) for ts in timestamps],
+                            args.iterations * 10)
+
+    result = {
+        "iterations": args.iterations,
+        "render_ms": round(page * 1000, 4),
+        "uncached_render_ms": {"legacy_labels": round(page_legacy * 1000, 4),
+                               "precomputed_labels": round(page_labels * 1000, 4)},
+        "format_8_times_us": {"legacy": round(legacy * 1e6, 3), "current": round(current * 1e6, 3)},
+    }
+    print(f"index.html render: {result['render_ms']:.3f} ms/page")
+    print(f"index.html render without fragment cache: "
+          f"labels formatted per render {result['uncached_render_ms']['legacy_labels']:.3f} ms, "
+          f"precomputed {result['uncached_render_ms']['precomputed_labels']:.3f} ms")
+    print(f"format 8 hourly times: legacy {result['format_8_times_us']['legacy']:.2f} us, "
+          f"current filter {result['format_8_times_us']['current']:.2f} us")
+
+    if args.json == "-":
+        print(json.dumps(result, indent=2))
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,168 @@
+"""
+Dashboard Load Test
+===================
+Drives the Flask ``index()`` route with concurrent POST requests against the
+local mock OpenWeatherMap server and reports throughput and latency
+percentiles. No API key or network access is needed.
+
+Usage:
+    python tools/loadtest.py --requests 500 --concurrency 16 --latency 0.05
+    python tools/loadtest.py --no-cache --error-rate 0.05 --json results.json
+
+The app is configured before import to talk to the mock server, keep its
+geocoding cache and rate-limit bucket in a temporary directory, and (with
+--no-cache) skip the response cache so every request reaches "upstream".
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from tools.mock_owm_server import CITY_LIST, start_mock_server
+
+
+def percentile(samples, pct):
+    """
+    Return the ``pct`` percentile of ``samples`` (nearest-rank method).
+
+    Example:
+        >>> percentile([1, 2, 3, 4], 50)
+        2
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def load_locations(city_list=CITY_LIST):
+    """Return (city, state, country) form payloads for every bundled city."""
+    with open(city_list, newline="", encoding="utf-8") as f:
+        return [{"city": row["city"], "state": row["state"], "country": row["country"]}
+                for row in csv.DictReader(f)]
+
+
+def configure_environment(base_url, workdir, use_cache):
+    """Point the app at the mock server; must run before importing app/weather."""
+    os.environ["OWM_BASE_URL"] = base_url
+    os.environ.setdefault("API_KEY", "loadtest")
+    os.environ["GEOCACHE_PATH"] = os.path.join(workdir, "geocache.sqlite3")
+    os.environ["RATE_LIMIT_PER_MINUTE"] = "0"
+    if not use_cache:
+        os.environ["WEATHER_CACHE"] = "0"
+
+
+def run_load(app, locations, total, concurrency):
+    """
+    Send ``total`` POST / requests from ``concurrency`` threads.
+
+    Returns:
+        tuple: (latencies in seconds, Counter of outcomes, wall time)
+    """
+    local = threading.local()
+    latencies = []
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def one(i):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        form = locations[i % len(locations)]
+        start = time.perf_counter()
+        try:
+            response = client.post("/", data=form)
+            outcome = "error page" if b"Could not fetch weather data" in response.data else str(response.status_code)
+        except Exception as e:
+            outcome = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            outcomes[outcome] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return latencies, outcomes, time.perf_counter() - start
+
+
+def summarize(latencies, outcomes, wall_time, settings):
+    """Build the machine-readable result dict."""
+    return {
+        "settings": settings,
+        "requests": len(latencies),
+        "wall_time_s": round(wall_time, 4),
+        "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p90": round(percentile(latencies, 90) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        },
+        "outcomes": dict(outcomes),
+    }
+
+
+def run(argv=None):
+    """Parse arguments, run the load test and print the report."""
+    parser = argparse.ArgumentParser(description="Load-test the dashboard against a mock OpenWeatherMap.")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="total POST / requests")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--warmup", type=int, default=10, help="requests sent before measuring")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock upstream base latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="mock upstream random extra latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream HTTP 500s")
+    parser.add_argument("--no-cache", action="store_true", help="disable the weather response cache")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    server = start_mock_server(latency=args.latency, jitter=args.jitter,
+                               error_rate=args.error_rate, seed=args.seed)
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(server.base_url, workdir, use_cache=not args.no_cache)
+        from app import app
+
+        locations = load_locations()
+        run_load(app, locations, args.warmup, args.concurrency)
+        latencies, outcomes, wall_time = run_load(app, locations, args.requests, args.concurrency)
+    server.shutdown()
+
+    settings = {key: value for key, value in vars(args).items() if key != "json"}
+    result = summarize(latencies, outcomes, wall_time, settings)
+    result["upstream_requests"] = dict(server.requests)
+
+    latency = result["latency_ms"]
+    print(f"{result['requests']} requests in {result['wall_time_s']:.2f}s "
+          f"→ {result['throughput_rps']:.1f} req/s (concurrency {args.concurrency})")
+    print(f"latency ms: mean {latency['mean']}  p50 {latency['p50']}  p90 {latency['p90']}  "
+          f"p99 {latency['p99']}  max {latency['max']}")
+    print(f"outcomes: {result['outcomes']}  upstream calls: {result['upstream_requests']}")
+
+    if args.json == "-":
+        print(json.dumps(result, indent=2))
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    run()
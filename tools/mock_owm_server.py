@@ -0,0 +1,261 @@
+"""
+Mock OpenWeatherMap Server
+==========================
+A local stand-in for the four OpenWeatherMap endpoints used by weather.py,
+serving recorded fixtures from tests/fixtures/owm so that performance can
+be measured offline and reproducibly.
+
+Endpoints:
+    - /geo/1.0/direct: Cities from data/cities.csv (plus the London fixture);
+      unknown cities return [] like the real API
+    - /data/2.5/weather: tests/fixtures/owm/weather.json
+    - /data/2.5/forecast: tests/fixtures/owm/forecast.json
+    - /data/2.5/uvi: tests/fixtures/owm/uvi.json
+
+Latency and failures can be injected per request; a fixed seed keeps runs
+deterministic.
+
+Usage:
+    python tools/mock_owm_server.py --port 8081 --latency 0.05 --jitter 0.02 \
+        --error-rate 0.01 --endpoint-latency forecast=0.2
+
+    # then point the app at it
+    OWM_BASE_URL=http://127.0.0.1:8081 python app.py
+
+From Python:
+    >>> from tools.mock_owm_server import start_mock_server
+    >>> server = start_mock_server(latency=0.02)
+    >>> server.base_url
+    'http://127.0.0.1:54321'
+    >>> server.shutdown()
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import argparse
+import copy
+import csv
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT_DIR, "tests", "fixtures", "owm")
+CITY_LIST = os.path.join(ROOT_DIR, "data", "cities.csv")
+
+# URL path → short endpoint name used for latency overrides and counters
+ENDPOINTS = {
+    "/geo/1.0/direct": "geo",
+    "/data/2.5/weather": "weather",
+    "/data/2.5/forecast": "forecast",
+    "/data/2.5/uvi": "uvi",
+}
+
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    """
+    Load the recorded API responses.
+
+    Returns:
+        dict: Endpoint name → decoded JSON fixture
+    """
+    fixtures = {}
+    for name in ENDPOINTS.values():
+        with open(os.path.join(fixture_dir, f"{name}.json"), encoding="utf-8") as f:
+            fixtures[name] = json.load(f)
+    return fixtures
+
+
+def load_cities(city_list=CITY_LIST):
+    """
+    Load the bundled city list used to answer geocoding queries.
+
+    Returns:
+        dict: Lowercase "city", "city,country" and "city,state,country"
+              queries → geocoding result dict
+    """
+    cities = {}
+    with open(city_list, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            result = {"name": row["city"], "lat": float(row["lat"]), "lon": float(row["lon"]),
+                      "country": row["country"], "state": row["state"]}
+            name, state, country = row["city"].lower(), row["state"].lower(), row["country"].lower()
+            cities.setdefault(name, result)
+            cities[f"{name},{country}"] = result
+            if state:
+                cities[f"{name},{state},{country}"] = result
+    return cities
+
+
+class MockOWMServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the fixtures and fault-injection settings.
+
+    Args:
+        address (tuple): (host, port) to bind; port 0 picks a free port
+        latency (float): Base delay added to every response, in seconds
+        jitter (float): Extra random delay, uniformly 0..jitter seconds
+        error_rate (float): Fraction of requests answered with HTTP 500
+        rate_limit_rate (float): Fraction answered with HTTP 429
+        endpoint_latency (dict, optional): Endpoint name → base delay,
+            overriding ``latency`` (e.g. {"forecast": 0.2})
+        seed (int): Random seed for jitter and error injection
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit_rate=0.0, endpoint_latency=None, seed=1234):
+        super().__init__(address, _MockHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.endpoint_latency = dict(endpoint_latency or {})
+        self.fixtures = load_fixtures()
+        self.cities = load_cities()
+        self.cities.setdefault("london", self.fixtures["geo"][0])
+        self.requests = {name: 0 for name in ENDPOINTS.values()}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def plan(self, endpoint):
+        """Decide (delay, status) for one request; thread-safe and seeded."""
+        with self._lock:
+            self.requests[endpoint] += 1
+            delay = self.endpoint_latency.get(endpoint, self.latency)
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+            roll = self._random.random()
+        if roll < self.error_rate:
+            return delay, 500
+        if roll < self.error_rate + self.rate_limit_rate:
+            return delay, 429
+        return delay, 200
+
+    def respond(self, endpoint, query):
+        """Build the JSON payload for a successful request."""
+        if endpoint == "geo":
+            location = ",".join(part.strip().lower() for part in query.get("q", [""])[0].split(","))
+            result = self.cities.get(location)
+            return [result] if result is not None else []
+
+        payload = copy.deepcopy(self.fixtures[endpoint])
+        city = self._city_at(query)
+        if city is not None and endpoint == "weather":
+            payload["name"] = city["name"]
+            payload["sys"]["country"] = city["country"]
+        elif city is not None and endpoint == "forecast":
+            payload["city"]["name"] = city["name"]
+            payload["city"]["country"] = city["country"]
+        return payload
+
+    def _city_at(self, query):
+        try:
+            lat, lon = float(query["lat"][0]), float(query["lon"][0])
+        except (KeyError, ValueError):
+            return None
+        for city in self.cities.values():
+            if abs(city["lat"] - lat) < 1e-6 and abs(city["lon"] - lon) < 1e-6:
+                return city
+        return None
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        endpoint = ENDPOINTS.get(parts.path)
+        if endpoint is None:
+            return self._send(404, {"cod": "404", "message": "Internal error"})
+
+        delay, status = self.server.plan(endpoint)
+        if delay > 0:
+            time.sleep(delay)
+        if status == 429:
+            return self._send(429, {"cod": 429, "message": "Your account is temporary blocked"},
+                              headers={"Retry-After": "1"})
+        if status != 200:
+            return self._send(status, {"cod": str(status), "message": "Internal error"})
+        return self._send(200, self.server.respond(endpoint, parse_qs(parts.query)))
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_mock_server(host="127.0.0.1", port=0, **settings):
+    """
+    Start a MockOWMServer on a background thread.
+
+    Accepts the same keyword settings as MockOWMServer. Call
+    ``server.shutdown()`` to stop it.
+
+    Returns:
+        MockOWMServer: The running server (see ``server.base_url``)
+    """
+    server = MockOWMServer((host, port), **settings)
+    threading.Thread(target=server.serve_forever, name="mock-owm", daemon=True).start()
+    return server
+
+
+def _parse_endpoint_latency(values):
+    latencies = {}
+    for value in values or []:
+        name, _, seconds = value.partition("=")
+        if name not in ENDPOINTS.values():
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}'")
+        latencies[name] = float(seconds)
+    return latencies
+
+
+def run(argv=None):
+    """Parse arguments and serve until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve recorded OpenWeatherMap fixtures locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="base delay per response (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay up to this (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of HTTP 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of HTTP 429 responses")
+    parser.add_argument("--endpoint-latency", action="append", metavar="NAME=SECONDS",
+                        help="per-endpoint base delay (geo, weather, forecast, uvi)")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    server = MockOWMServer((args.host, args.port), latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+                           endpoint_latency=_parse_endpoint_latency(args.endpoint_latency),
+                           seed=args.seed)
+    print(f"Mock OpenWeatherMap listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Requests served: {server.requests}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,201 @@
+"""
+Startup Warmup Module
+=====================
+This module fills the caches before the first request arrives, so a fresh
+deployment or restarted worker does not send every early visitor to the
+upstream API.
+
+At startup the geocoding cache is opened (loading the bundled city list on
+first run), the response cache is restored from the snapshot written at the
+previous shutdown, and the locations in WARM_LOCATIONS are fetched through
+the normal caches. Snapshot entries too old to be served are skipped.
+
+Under gunicorn (see gunicorn.conf.py) this runs once in the master after the
+app is preloaded, and the forked workers share the warm caches
+copy-on-write. On shutdown each worker saves its own snapshot part and the
+master merges the parts, keeping the newest copy of every entry. Import and
+warmup times are printed at startup and kept in ``boot_stats``.
+
+Functions:
+    - warm_caches(): Warm the geocoding and response caches
+    - save_snapshot(): Persist the response cache to disk
+    - load_snapshot(): Restore the response cache from disk
+    - merge_snapshots(): Combine per-worker snapshot parts into one
+    - boot(): Warm the caches and print the startup report
+
+Configuration (environment variables):
+    - WARM_LOCATIONS: File with one "city[,state[,country]]" per line to
+      fetch at startup (default "", no locations)
+    - CACHE_SNAPSHOT_PATH: Response cache snapshot file (default
+      "data/cache_snapshot.pickle"); set to an empty string to disable
+      snapshots. Unused with the sqlite response cache backend, which
+      persists by itself
+
+Author: Weather Dashboard Team
+Date: January 2026
+"""
+
+import glob
+import os
+import pickle
+import time
+
+from cache import get_response_cache
+from geocache import get_geocache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WARM_LOCATIONS = os.getenv("WARM_LOCATIONS", "")
+CACHE_SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH", os.path.join(BASE_DIR, "data", "cache_snapshot.pickle"))
+
+# Bumped when the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+# Startup timings and warmup counters of this process (filled in by boot())
+boot_stats = {}
+
+
+def save_snapshot(path=CACHE_SNAPSHOT_PATH):
+    """
+    Write the response cache to ``path`` (atomically replacing it).
+
+    Returns:
+        int: Entries written (0 if snapshots or the cache are disabled)
+    """
+    cache = get_response_cache()
+    # A shared (sqlite) cache backend persists by itself
+    if not path or cache is None or cache.backend.persistent:
+        return 0
+    entries = cache.export_entries()
+    _write_snapshot(path, entries)
+    return len(entries)
+
+
+def load_snapshot(path=CACHE_SNAPSHOT_PATH):
+    """
+    Restore response cache entries saved by save_snapshot().
+
+    The snapshot is only ever written by this application; a missing,
+    unreadable or outdated file is ignored.
+
+    Returns:
+        int: Entries loaded
+    """
+    cache = get_response_cache()
+    if not path or cache is None or cache.backend.persistent:
+        return 0
+    entries = _read_snapshot(path)
+    return cache.import_entries(entries) if entries else 0
+
+
+def merge_snapshots(path=CACHE_SNAPSHOT_PATH):
+    """
+    Merge the snapshot parts saved next to ``path`` ("<path>.worker-<pid>")
+    into ``path``, keeping the newest copy of each entry, and remove them.
+
+    Returns:
+        int: Entries written (0, leaving ``path`` untouched, if there are
+             no parts)
+    """
+    if not path:
+        return 0
+    parts = [part for part in glob.glob(f"{glob.escape(path)}.worker-*") if not part.endswith(".tmp")]
+    if not parts:
+        return 0
+    newest = {}
+    for part in parts:
+        for key, value, stored_at in _read_snapshot(part) or ():
+            if key not in newest or stored_at > newest[key][1]:
+                newest[key] = (value, stored_at)
+    entries = sorted(((key, value, stored_at) for key, (value, stored_at) in newest.items()),
+                     key=lambda entry: entry[2])
+    _write_snapshot(path, entries)
+    for part in parts:
+        os.remove(part)
+    return len(entries)
+
+
+def _write_snapshot(path, entries):
+    """Write snapshot entries to ``path``, atomically replacing it."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump({"version": SNAPSHOT_VERSION, "saved_at": time.time(), "entries": entries},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def _read_snapshot(path):
+    """Return the entries of a snapshot file, or None if it is missing, unreadable or outdated."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        print(f"❌ Error: Could not read cache snapshot {path}: {e!r}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot["entries"]
+
+
+def warm_caches(locations_path=WARM_LOCATIONS, snapshot_path=CACHE_SNAPSHOT_PATH):
+    """
+    Warm the geocoding and response caches.
+
+    Args:
+        locations_path (str): Location file to fetch ("" for none)
+        snapshot_path (str): Snapshot to restore ("" for none)
+
+    Returns:
+        dict: geocache_entries, snapshot_entries, locations, warmed
+              (locations with weather data), warm_ms
+    """
+    start = time.perf_counter()
+    geocache = get_geocache()
+    # Opening the database loads the bundled city list on first run
+    geocache_entries = geocache.stats()["entries"] if geocache is not None else 0
+    snapshot_entries = load_snapshot(snapshot_path)
+
+    locations = []
+    warmed = 0
+    if locations_path:
+        from batch import read_locations
+        from weather import main_batch
+
+        locations = read_locations(locations_path)
+        # Locations restored from the snapshot are cache hits here
+        warmed = sum(1 for result in main_batch(locations) if result.weather is not None)
+
+    return {
+        "geocache_entries": geocache_entries,
+        "snapshot_entries": snapshot_entries,
+        "locations": len(locations),
+        "warmed": warmed,
+        "warm_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def boot(load_seconds=None):
+    """
+    Warm the caches and print the startup report.
+
+    Args:
+        load_seconds (float, optional): Measured app import time to report
+
+    Returns:
+        dict: warm_caches() counters plus load_ms
+    """
+    stats = warm_caches()
+    if load_seconds is not None:
+        stats["load_ms"] = round(load_seconds * 1000, 1)
+    boot_stats.update(stats)
+
+    loaded = f"app loaded in {stats['load_ms']:.0f} ms, " if "load_ms" in stats else ""
+    print(f"⏱️  Boot: {loaded}caches warmed in {stats['warm_ms']:.0f} ms "
+          f"({stats['snapshot_entries']} snapshot entries, "
+          f"{stats['warmed']}/{stats['locations']} locations, "
+          f"{stats['geocache_entries']} geocoded places)")
+    return stats
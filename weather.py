@@ -5,10 +5,26 @@ This module handles all interactions with the OpenWeatherMap API to retrieve
 real-time weather data, forecasts, and related information.
 
 Functions:
+    - parse_current_weather(): Build WeatherData from a current weather response
+    - parse_forecast(): Build hourly/daily forecasts from a forecast response
+    - parse_forecasts(): Same for many responses, with one vectorized daily rollup
     - get_lat_lon(): Convert city name to coordinates
     - get_current_weather(): Fetch current weather conditions
-    - get_forecast_data(): Fetch hourly and daily forecasts
+    - get_forecast(): Fetch hourly and daily forecasts
+    - get_uv_index(): Fetch the UV index
+    - get_forecast_data(): Fetch forecasts plus UV index
+    - fetch_weather_concurrently(): Fetch current, forecast and UV in parallel
     - main(): Orchestrate all weather data collection
+    - main_batch(): Fetch weather for many locations concurrently
+    - coalescing_stats(): Counters for coalesced (single-flight) lookups
+    - circuit_breaker_states(): Circuit breaker state per upstream endpoint
+
+get_current_weather(), get_forecast() and get_uv_index() are served from the
+response cache in cache.py; call ``func.__wrapped__`` to bypass it. Upstream
+timeouts, retries and circuit breakers are handled by http_client.py; the
+fetchers report failures by returning None rather than raising. Each stage
+of a lookup (geocode, current, forecast, uv, aggregation) is timed by
+metrics.py.
 
 Author: Weather Dashboard Team
 Team Lead: Atitebi Johnson A.  | 2023/12872
@@ -18,24 +34,56 @@ Date: January 2026
 import requests
 from dotenv import load_dotenv
 import os
+import sys
+import time
 from dataclasses import dataclass
-from datetime import datetime, timezone, timedelta
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from http_client import get_client
+from geocache import get_geocache, make_key
+from cache import cached_endpoint, endpoint_flight, SingleFlight
+from ratelimit import BACKGROUND, priority
+from timefmt import add_forecast_labels
+from forecast import daily_series, hourly_series
+from aggregate import daily_forecasts
+from forecaststream import CHUNK_SIZE as STREAM_CHUNK_SIZE, FORECAST_STREAMING, parse_forecast_stream
+from metrics import span
+from profiling import follow as follow_profile
 
 # Load environment variables from .env file
 load_dotenv()
 api_key = os.getenv("API_KEY")
 
+# Parallel fetch settings for main(): current weather, forecast and UV index
+# are requested at the same time once coordinates are known
+FANOUT_ENABLED = os.getenv("WEATHER_CONCURRENT", "1") != "0"
+FANOUT_WORKERS = int(os.getenv("WEATHER_FANOUT_WORKERS", "12"))
+FANOUT_DEADLINE = float(os.getenv("WEATHER_DEADLINE", "15"))
+
+# Locations looked up at once by main_batch()
+BATCH_WORKERS = int(os.getenv("WEATHER_BATCH_WORKERS", "8"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Concurrent main() calls for the same normalized location share one lookup
+location_flight = SingleFlight()
+
 # ============================================================================
 # DATA STRUCTURES
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class WeatherData:
     """
     Data class to store all weather information for a location.
     
     This class represents a complete weather snapshot including current
-    conditions, forecasts, and various metrics.
+    conditions, forecasts, and various metrics. It is slotted (no per-object
+    __dict__) and its forecasts are ForecastSeries, since thousands of them
+    are kept in the response cache.
     
     Attributes:
         name (str): City/location name
@@ -49,8 +97,8 @@ class WeatherData:
         wind_speed (float): Wind speed in meters per second
         visibility (int): Visibility distance in meters
         uv_index (float): UV index value (0-11+)
-        hourly_forecast (list): List of dicts with hourly predictions (24 hours)
-        daily_forecast (list): List of dicts with daily predictions (5-7 days)
+        hourly_forecast (list): Hourly predictions (24 hours), a sequence of dicts
+        daily_forecast (list): Daily predictions (5-7 days), a sequence of dicts
         alerts (list): List of active weather alerts/warnings
         timezone (str): Timezone identifier for the location (e.g., "Europe/London")
         timezone_offset (int): UTC offset in seconds (e.g., 3600 for UTC+1)
@@ -78,6 +126,132 @@ class WeatherData:
     sunset: int = 0
     last_updated: int = 0
 
+@dataclass
+class BatchResult:
+    """
+    Outcome of one location in a main_batch() run.
+    
+    Attributes:
+        location (tuple): (city_name, state_name, country_code) as requested
+        weather (WeatherData): Weather data, or None if the lookup failed
+        error (str): Error message if the lookup failed, otherwise None
+        elapsed (float): Seconds spent on this location
+    """
+    location: tuple
+    weather: WeatherData = None
+    error: str = None
+    elapsed: float = 0.0
+
+# ============================================================================
+# RESPONSE PARSING
+# ============================================================================
+
+def parse_current_weather(data):
+    """
+    Build a WeatherData object from a Current Weather API response.
+    
+    Forecast fields, UV index and alerts are left empty; main() fills
+    them in from the other endpoints.
+    
+    Args:
+        data (dict): Decoded /data/2.5/weather JSON response
+    
+    Returns:
+        WeatherData: Object containing current weather information
+    """
+    # Create WeatherData object with API response data
+    weather_data = WeatherData(
+        name=data.get("name"),
+        # Shared with every other location in the same conditions
+        main=sys.intern(data["weather"][0]["main"]),
+        description=sys.intern(data["weather"][0]["description"]),
+        icon=sys.intern(data["weather"][0]["icon"]),
+        temperature=int(data["main"]["temp"]),
+        feels_like=int(data["main"].get("feels_like", 0)),
+        humidity=int(data["main"].get("humidity", 0)),
+        pressure=int(data["main"].get("pressure", 0)),
+        wind_speed=int(data.get("wind", {}).get("speed", 0)),
+        visibility=data.get("visibility", 0),
+        uv_index=0,  # Will be populated by get_forecast_data()
+        hourly_forecast=[],  # Will be populated by get_forecast_data()
+        daily_forecast=[],  # Will be populated by get_forecast_data()
+        alerts=[],  # Will be populated by get_forecast_data()
+        timezone=sys.intern(data.get("sys", {}).get("country", "UTC")),  # Country code from API
+        timezone_offset=data.get("timezone", 0),  # UTC offset in seconds from API
+        sunrise=data.get("sys", {}).get("sunrise", 0),  # Unix timestamp
+        sunset=data.get("sys", {}).get("sunset", 0),  # Unix timestamp
+        last_updated=int(datetime.now().timestamp())  # Current time
+    )
+    return weather_data
+
+def parse_forecast(data):
+    """
+    Build hourly and daily forecasts from a 5-Day Forecast API response.
+    
+    The first 8 three-hour entries form the 24-hour forecast. All entries
+    are grouped into calendar days in the location's local time, and each
+    day is summarised (min/max temperature, mean humidity, max wind and
+    precipitation chance) using the entry closest to local noon for its
+    icon and description.
+    
+    Entries also carry their local-time display labels ("time_label" on
+    hourly entries, "date_label" on daily ones), so they are formatted once
+    per cached forecast rather than on every page render.
+    
+    Both forecasts are returned as ForecastSeries (see forecast.py): compact
+    columns that read like lists of dicts.
+    
+    Args:
+        data (dict): Decoded /data/2.5/forecast JSON response
+    
+    Returns:
+        tuple: (hourly_forecast, daily_forecast)
+    """
+    return parse_forecasts([data])[0]
+
+def parse_forecasts(datas):
+    """
+    Build hourly and daily forecasts from several forecast responses.
+    
+    Same output as parse_forecast() for each response, but the daily
+    rollup of every city is computed in one vectorized pass, which is much
+    cheaper per city for batch refreshes.
+    
+    Args:
+        datas (list): Decoded /data/2.5/forecast JSON responses
+    
+    Returns:
+        list: (hourly_forecast, daily_forecast) tuples, one per response
+    """
+    # City timezone offsets (seconds) if available
+    offsets = [data.get('city', {}).get('timezone', 0) for data in datas]
+
+    # Build daily forecasts by aggregating 3-hour entries into calendar days
+    # (see aggregate.py; typically 5-6 days, no artificial limit)
+    with span("aggregation"):
+        dailies = daily_forecasts([(data.get('list', []), offset) for data, offset in zip(datas, offsets)])
+
+    results = []
+    for data, timezone_offset, daily_forecast in zip(datas, offsets, dailies):
+        # Get hourly forecast (next 24 hours - every 3 hours from API)
+        hourly_forecast = []
+        for i, item in enumerate(data.get("list", [])):
+            if i >= 8:  # 8 items * 3 hours = 24 hours
+                break
+            hourly_forecast.append({
+                "time": item.get("dt"),
+                "temp": item.get("main", {}).get("temp"),
+                "icon": item["weather"][0].get("icon"),
+                "description": item["weather"][0].get("description"),
+                "precipitation": item.get("pop", 0) * 100,
+                "humidity": item.get("main", {}).get("humidity", 0)
+            })
+
+        add_forecast_labels(hourly_forecast, daily_forecast, timezone_offset)
+        # Stored column-wise: cached forecasts are most of the cache's memory
+        results.append((hourly_series(hourly_forecast), daily_series(daily_forecast)))
+    return results
+
 # ============================================================================
 # API FUNCTIONS
 # ============================================================================
@@ -90,6 +264,9 @@ def get_lat_lon(city_name, state_code="", country_code="", api_key=None):
     into its corresponding latitude and longitude coordinates. These coordinates
     are then used to fetch weather data for that location.
     
+    Results (including "not found") are cached on disk by geocache.py, so
+    repeated lookups for the same location do not call the API.
+    
     API Endpoint: /geo/1.0/direct
     
     Args:
@@ -110,6 +287,13 @@ def get_lat_lon(city_name, state_code="", country_code="", api_key=None):
     if api_key is None:
         api_key = globals()['api_key']
     
+    # Serve from the persistent geocoding cache when possible
+    geocache = get_geocache()
+    if geocache is not None:
+        cached = geocache.get(city_name, state_code, country_code)
+        if cached is not None:
+            return cached
+    
     # Build location string based on provided parameters
     location = city_name
     if state_code:
@@ -117,11 +301,12 @@ def get_lat_lon(city_name, state_code="", country_code="", api_key=None):
     if country_code:
         location += f",{country_code}"
     
-    # Construct API URL with city information (using Geocoding API)
-    url = f"http://api.openweathermap.org/geo/1.0/direct?q={location}&appid={api_key}"
-    
-    # Make API request
-    response = requests.get(url)
+    # Make API request through the shared connection pool (Geocoding API)
+    try:
+        response = get_client().get("/geo/1.0/direct", params={"q": location, "appid": api_key})
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error: Geocoding request failed: {e}")
+        return None, None
     
     # Check if request was successful
     if response.status_code == 200:
@@ -131,11 +316,17 @@ def get_lat_lon(city_name, state_code="", country_code="", api_key=None):
             # Extract coordinates from first result
             lat = data[0]["lat"]
             lon = data[0]["lon"]
+            if geocache is not None:
+                geocache.set(city_name, state_code, country_code, lat, lon)
             return lat, lon
+        # Location does not exist - remember that so typos are not re-queried
+        if geocache is not None:
+            geocache.set_not_found(city_name, state_code, country_code)
     
     # Return None values if API call fails or no results found
     return None, None
 
+@cached_endpoint("current")
 def get_current_weather(lat, lon, api_key):
     """
     Fetch current weather conditions for a given location.
@@ -159,56 +350,104 @@ def get_current_weather(lat, lon, api_key):
         - Weather description and icon
         - Humidity, pressure, wind speed, visibility
     """
-    # Construct API URL with coordinates
-    url = f"http://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={api_key}&units=metric"
-    
-    # Make API request
-    response = requests.get(url)
+    # Make API request through the shared connection pool
+    try:
+        response = get_client().get("/data/2.5/weather", params={
+            "lat": lat, "lon": lon, "appid": api_key, "units": "metric"
+        })
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error: Current weather request failed: {e}")
+        return None
     
     # Check if request was successful
     if response.status_code == 200:
-        data = response.json()
-        
-        # Create WeatherData object with API response data
-        weather_data = WeatherData(
-            name=data.get("name"),
-            main=data["weather"][0]["main"],
-            description=data["weather"][0]["description"],
-            icon=data["weather"][0]["icon"],
-            temperature=int(data["main"]["temp"]),
-            feels_like=int(data["main"].get("feels_like", 0)),
-            humidity=int(data["main"].get("humidity", 0)),
-            pressure=int(data["main"].get("pressure", 0)),
-            wind_speed=int(data.get("wind", {}).get("speed", 0)),
-            visibility=data.get("visibility", 0),
-            uv_index=0,  # Will be populated by get_forecast_data()
-            hourly_forecast=[],  # Will be populated by get_forecast_data()
-            daily_forecast=[],  # Will be populated by get_forecast_data()
-            alerts=[],  # Will be populated by get_forecast_data()
-            timezone=data.get("sys", {}).get("country", "UTC"),  # Country code from API
-            timezone_offset=data.get("timezone", 0),  # UTC offset in seconds from API
-            sunrise=data.get("sys", {}).get("sunrise", 0),  # Unix timestamp
-            sunset=data.get("sys", {}).get("sunset", 0),  # Unix timestamp
-            last_updated=int(datetime.now().timestamp())  # Current time
-        )
-        return weather_data
+        return parse_current_weather(response.json())
     else:
         # Return None if API call fails
         return None
 
 #print(get_lat_lon("London", "10", "GB", api_key))
 
-def get_forecast_data(lat, lon, api_key):
+@cached_endpoint("forecast")
+def get_forecast(lat, lon, api_key):
     """
     Fetch hourly and daily forecast data using the 5-Day Forecast API.
 
     Uses OpenWeatherMap's 5-day/3-hour forecast API (available on free tier)
-    to retrieve weather predictions. Also fetches UV index from a separate
-    endpoint.
+    to retrieve weather predictions.
+
+    API Endpoint: /data/2.5/forecast (5-day forecast with 3-hour intervals)
+
+    Args:
+        lat (float): Latitude coordinate
+        lon (float): Longitude coordinate
+        api_key (str): OpenWeatherMap API key
+
+    Returns:
+        tuple: (hourly_forecast, daily_forecast), or None if the request fails
+               - hourly_forecast (list): 8 items × 3 hours = 24-hour forecast
+               - daily_forecast (list): Up to 5-6 daily forecasts (API limit)
+    """
+    # Use the 5-day/3-hour forecast API which is available on free tier
+    try:
+        response = get_client().get("/data/2.5/forecast", params={
+            "lat": lat, "lon": lon, "appid": api_key, "units": "metric"
+        }, stream=FORECAST_STREAMING)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error: Forecast request failed: {e}")
+        return None
+
+    with response:
+        if response.status_code != 200:
+            return None
+        if not FORECAST_STREAMING:
+            return parse_forecast(response.json())
+        # Parsed entry by entry while downloading; unused fields are dropped
+        try:
+            return parse_forecast_stream(response.iter_content(STREAM_CHUNK_SIZE))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"❌ Error: Forecast response could not be read: {e}")
+            return None
 
-    API Endpoints:
-        - /data/2.5/forecast (5-day forecast with 3-hour intervals)
-        - /data/2.5/uvi (UV index)
+@cached_endpoint("uv")
+def get_uv_index(lat, lon, api_key):
+    """
+    Fetch the UV index for a location.
+
+    API Endpoint: /data/2.5/uvi
+
+    Note: OpenWeatherMap free tier API returns the DAILY MAXIMUM UV index,
+    not the instantaneous UV at the request time. This is by design to show
+    users the worst-case UV exposure they should prepare for during the day.
+
+    Args:
+        lat (float): Latitude coordinate
+        lon (float): Longitude coordinate
+        api_key (str): OpenWeatherMap API key
+
+    Returns:
+        float: UV index value
+        None: If API request fails
+    """
+    # Include current timestamp to get actual current UV, not default noon value
+    current_timestamp = int(datetime.now().timestamp())
+    try:
+        uv_response = get_client().get("/data/2.5/uvi", params={
+            "lat": lat, "lon": lon, "dt": current_timestamp, "appid": api_key
+        })
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error: UV index request failed: {e}")
+        return None
+    if uv_response.status_code == 200:
+        return uv_response.json().get("value", 0)
+    return None
+
+def get_forecast_data(lat, lon, api_key):
+    """
+    Fetch hourly and daily forecasts plus the UV index for a location.
+
+    Combines get_forecast() and get_uv_index(); the UV index is only
+    requested when the forecast call succeeds.
 
     Args:
         lat (float): Latitude coordinate
@@ -222,115 +461,103 @@ def get_forecast_data(lat, lon, api_key):
                - uv_index (float): Current UV index value
                - alerts (list): Empty list (alerts not available on free tier)
     """
-    # Use the 5-day/3-hour forecast API which is available on free tier
-    url = f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={api_key}&units=metric"
-    response = requests.get(url)
+    with span("forecast"):
+        forecast = get_forecast(lat, lon, api_key)
+    if forecast is None:
+        return [], [], 0, []
+    hourly_forecast, daily_forecast = forecast
+    with span("uv"):
+        uv_index = get_uv_index(lat, lon, api_key)
+    return hourly_forecast, daily_forecast, uv_index if uv_index is not None else 0, []
 
-    if response.status_code == 200:
-        data = response.json()
+def fetch_weather_concurrently(lat, lon, api_key, deadline=None):
+    """
+    Fetch current weather, forecast and UV index in parallel.
 
-        # Extract city timezone offset (seconds) if available
-        timezone_offset = data.get('city', {}).get('timezone', 0)
+    The three requests only depend on the coordinates, so they are submitted
+    to a shared thread pool together and the WeatherData is assembled once
+    all of them complete. Latency becomes the slowest of the three calls
+    instead of their sum.
 
-        # Get hourly forecast (next 24 hours - every 3 hours from API)
-        hourly_forecast = []
-        for i, item in enumerate(data.get("list", [])):
-            if i >= 8:  # 8 items * 3 hours = 24 hours
-                break
-            hourly_forecast.append({
-                "time": item.get("dt"),
-                "temp": item.get("main", {}).get("temp"),
-                "icon": item["weather"][0].get("icon"),
-                "description": item["weather"][0].get("description"),
-                "precipitation": item.get("pop", 0) * 100,
-                "humidity": item.get("main", {}).get("humidity", 0)
-            })
+    Args:
+        lat (float): Latitude coordinate
+        lon (float): Longitude coordinate
+        api_key (str): OpenWeatherMap API key
+        deadline (float, optional): Overall time budget in seconds for all
+            three calls. Defaults to FANOUT_DEADLINE.
 
-        # Build daily forecast by aggregating 3-hour entries into calendar days
-        from collections import defaultdict
-        daily_buckets = defaultdict(list)
-
-        for item in data.get('list', []):
-            ts = item.get('dt')
-            # Convert to location-local date using timezone offset
-            utc_dt = datetime.fromtimestamp(ts, tz=timezone.utc).replace(tzinfo=None)
-            local_dt = utc_dt + timedelta(seconds=timezone_offset)
-            local_date = local_dt.date()
-            daily_buckets[local_date].append((local_dt, item))
-
-        # For each day, compute sensible aggregates
-        daily_forecast = []
-        for local_date in sorted(daily_buckets.keys()):
-            entries = daily_buckets[local_date]
-            temps = []
-            pops = []
-            humidities = []
-            wind_speeds = []
-            # pick a representative entry (closest to local noon if possible)
-            rep_entry = None
-            rep_dt = None
-            best_noon_diff = None
-
-            for local_dt, item in entries:
-                main = item.get('main', {})
-                # Collect all temperatures throughout the day
-                temps.append(main.get('temp', 0))
-                pops.append(item.get('pop', 0) * 100)
-                humidities.append(main.get('humidity', 0))
-                wind_speeds.append(item.get('wind', {}).get('speed', 0))
-
-                # prefer entry at 12:00 local time
-                noon = local_dt.replace(hour=12, minute=0, second=0, microsecond=0)
-                diff = abs((local_dt - noon).total_seconds())
-                if best_noon_diff is None or diff < best_noon_diff:
-                    best_noon_diff = diff
-                    rep_entry = item
-                    rep_dt = local_dt
-
-            # Fallback to first entry if none selected
-            if rep_entry is None:
-                rep_dt, rep_entry = entries[0]
-
-            # Build daily summary
-            try:
-                temp_max_val = max([t for t in temps if t is not None])
-            except ValueError:
-                temp_max_val = None
-            try:
-                temp_min_val = min([t for t in temps if t is not None])
-            except ValueError:
-                temp_min_val = None
-
-            daily_forecast.append({
-                "time": int(rep_dt.timestamp()),
-                "temp_max": temp_max_val,
-                "temp_min": temp_min_val,
-                "icon": rep_entry["weather"][0].get("icon"),
-                "description": rep_entry["weather"][0].get("description"),
-                "humidity": int(sum(humidities)/len(humidities)) if humidities else None,
-                "wind_speed": float(max(wind_speeds)) if wind_speeds else 0,
-                "precipitation": float(max(pops)) if pops else 0
-            })
+    Returns:
+        WeatherData: Complete weather information object
+        None: If current weather could not be fetched within the deadline
 
-            # No artificial limit - get all available days from API (typically 5-6 days)
-
-        # Get UV index (using separate UV API endpoint)
-        # Include current timestamp to get actual current UV, not default noon value
-        # Note: OpenWeatherMap free tier API returns the DAILY MAXIMUM UV index,
-        # not the instantaneous UV at the request time. This is by design to show
-        # users the worst-case UV exposure they should prepare for during the day.
-        uv_index = 0
-        current_timestamp = int(datetime.now().timestamp())
-        uv_url = f"https://api.openweathermap.org/data/2.5/uvi?lat={lat}&lon={lon}&dt={current_timestamp}&appid={api_key}"
-        uv_response = requests.get(uv_url)
-        if uv_response.status_code == 200:
-            uv_index = uv_response.json().get("value", 0)
-
-        return hourly_forecast, daily_forecast, uv_index, []
-    else:
-        return [], [], 0, []
+    Calls still running when the deadline passes are abandoned: a missing
+    forecast leaves empty forecast lists and a missing UV index leaves 0,
+    matching the sequential path's failure behaviour.
+    """
+    if deadline is None:
+        deadline = FANOUT_DEADLINE
+    executor = _get_executor()
+    # Run each call in a copy of the caller's context so its rate-limit
+    # priority carries over to the pool threads
+    current_future = executor.submit(contextvars.copy_context().run, _call_in_span, "current",
+                                     get_current_weather, lat, lon, api_key)
+    forecast_future = executor.submit(contextvars.copy_context().run, _call_in_span, "forecast",
+                                      get_forecast, lat, lon, api_key)
+    uv_future = executor.submit(contextvars.copy_context().run, _call_in_span, "uv",
+                                get_uv_index, lat, lon, api_key)
+    futures = (current_future, forecast_future, uv_future)
+
+    wait(futures, timeout=deadline)
+    for future in futures:
+        future.cancel()
+
+    weather_datas = _future_result(current_future)
+    if weather_datas is None:
+        return None
+
+    forecast = _future_result(forecast_future)
+    if forecast is not None:
+        weather_datas.hourly_forecast, weather_datas.daily_forecast = forecast
+    uv = _future_result(uv_future)
+    weather_datas.uv_index = uv if uv is not None else 0
+    weather_datas.alerts = []
+    return weather_datas
+
+def _call_in_span(stage, func, *args):
+    """Call ``func(*args)`` timed as ``stage`` (metrics.py), in the request's profile if it has one (profiling.py)."""
+    with span(stage), follow_profile():
+        return func(*args)
+
+def _future_result(future):
+    """Return a finished future's result, or None if it is pending or failed."""
+    if not future.done() or future.cancelled():
+        return None
+    if future.exception() is not None:
+        print(f"❌ Error: upstream request failed: {future.exception()}")
+        return None
+    return future.result()
+
+def _get_executor():
+    """Return the shared fan-out thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS,
+                                               thread_name_prefix="weather-fanout")
+    return _executor
+
+def _reset_after_fork():
+    """Drop the parent's fan-out pool in a forked child; its threads did not survive the fork."""
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+# A preloaded app (gunicorn --preload) may have used the pool before forking workers
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
 
-def main(city_name, state_name="", country_code=""):
+def main(city_name, state_name="", country_code="", concurrent=None, deadline=None):
     """
     Orchestrate the complete weather data collection process.
     
@@ -341,6 +568,10 @@ def main(city_name, state_name="", country_code=""):
         city_name (str): Name of the city to get weather for (required)
         state_name (str, optional): State/province code. Defaults to "".
         country_code (str, optional): Country code. Defaults to "".
+        concurrent (bool, optional): Fetch current weather, forecast and UV
+            in parallel. Defaults to FANOUT_ENABLED (env WEATHER_CONCURRENT).
+        deadline (float, optional): Overall time budget in seconds for the
+            parallel fetches. Defaults to FANOUT_DEADLINE.
     
     Returns:
         WeatherData: Complete weather information object
@@ -354,13 +585,31 @@ def main(city_name, state_name="", country_code=""):
         
         >>> # City, state, and country
         >>> weather = main("London", "10", "GB")
+    
+    Concurrent calls for the same normalized location are coalesced: one
+    lookup runs and every caller receives the same WeatherData.
     """
+    return location_flight.do(
+        make_key(city_name, state_name, country_code),
+        lambda: _fetch_weather(city_name, state_name, country_code, concurrent, deadline),
+    )
+
+def _fetch_weather(city_name, state_name, country_code, concurrent, deadline):
+    """Run one complete lookup for main(); see main() for the arguments."""
     # Step 1: Convert city name to coordinates
-    lat, lon = get_lat_lon(city_name, state_name, country_code, api_key)
+    with span("geocode"):
+        lat, lon = get_lat_lon(city_name, state_name, country_code, api_key)
     
     if lat is not None and lon is not None:
+        if concurrent is None:
+            concurrent = FANOUT_ENABLED
+        if concurrent:
+            # Steps 2-4 in parallel: current weather, forecast and UV index
+            return fetch_weather_concurrently(lat, lon, api_key, deadline)
+
         # Step 2: Fetch current weather
-        weather_datas = get_current_weather(lat, lon, api_key)
+        with span("current"):
+            weather_datas = get_current_weather(lat, lon, api_key)
         
         # Step 3: Fetch forecasts and UV index
         hourly, daily, uv, alerts = get_forecast_data(lat, lon, api_key)
@@ -380,6 +629,68 @@ def main(city_name, state_name="", country_code=""):
             print(f"   Hint: Try without state code '{state_name}'")
         return None
 
+def main_batch(locations, max_workers=BATCH_WORKERS, concurrent=None, deadline=None):
+    """
+    Fetch weather for many locations with bounded concurrency.
+    
+    Each location is looked up with main() on a worker thread. A failure
+    for one city (not found, upstream error, exception) is recorded on its
+    BatchResult and does not affect the others. Batch calls run at
+    background rate-limit priority so interactive page loads go first.
+    
+    Args:
+        locations (iterable): Location tuples (city[, state[, country]])
+        max_workers (int, optional): Maximum lookups in flight at once.
+            Defaults to BATCH_WORKERS (env WEATHER_BATCH_WORKERS).
+        concurrent (bool, optional): Passed through to main()
+        deadline (float, optional): Passed through to main()
+    
+    Returns:
+        list: BatchResult objects in the same order as ``locations``
+        
+    Example:
+        >>> results = main_batch([("London", "", "GB"), ("Lagos", "", "NG")])
+        >>> [r.weather.temperature for r in results if r.weather]
+        [12, 29]
+    """
+    def lookup(location):
+        city_name, state_name, country_code = (tuple(location) + ("", ""))[:3]
+        start = time.perf_counter()
+        try:
+            with priority(BACKGROUND):
+                weather_datas = main(city_name, state_name, country_code, concurrent, deadline)
+            error = None if weather_datas is not None else "Could not fetch weather data"
+        except Exception as e:
+            weather_datas, error = None, f"{type(e).__name__}: {e}"
+        return BatchResult(
+            location=(city_name, state_name, country_code),
+            weather=weather_datas,
+            error=error,
+            elapsed=time.perf_counter() - start,
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather-batch") as pool:
+        return list(pool.map(lookup, locations))
+
+def circuit_breaker_states():
+    """
+    Report the circuit breaker state of each upstream endpoint.
+
+    Returns:
+        dict: Endpoint path → {"state", "failures", "rejected", "open_for"}
+    """
+    return get_client().breaker_states()
+
+def coalescing_stats():
+    """
+    Report how many lookups were coalesced onto an in-flight request.
+
+    Returns:
+        dict: {"locations": {...}, "endpoints": {...}} with executions,
+              coalesced and in_flight counters for each level
+    """
+    return {"locations": location_flight.stats(), "endpoints": endpoint_flight.stats()}
+
 if __name__ == "__main__":
     """
     Test the weather data fetching when running this module directly.